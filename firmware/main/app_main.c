@@ -27,6 +27,14 @@ typedef struct {
     int64_t hold_until_ms;
 } alert_state_t;
 
+typedef struct {
+    /* Send interval commanded by the coordinator; 0 = every loop at TELEMETRY_RATE_HZ. */
+    uint32_t period_ms;
+    /* When the command lapses back to the default; 0 = no expiry. */
+    int64_t valid_until_ms;
+    int64_t next_send_ms;
+} tx_rate_t;
+
 static float wrap_deg(float angle) {
     while (angle > 180.0f) {
         angle -= 360.0f;
@@ -100,6 +108,29 @@ static uint8_t compute_quality_score_imu_only(const imu_sample_t *s) {
     return (uint8_t)(q + 0.5f);
 }
 
+static void apply_rate_control(tx_rate_t *tx, const fdw_rate_control_t *pkt, int64_t now_ms) {
+    const uint32_t loop_ms = 1000 / TELEMETRY_RATE_HZ;
+    uint32_t period_ms = 0;
+    if (pkt->rate_dhz != 0) {
+        period_ms = 10000u / pkt->rate_dhz;
+        if (period_ms <= loop_ms) {
+            /* The loop cannot send faster than it runs. */
+            period_ms = 0;
+        }
+    }
+    if (period_ms != tx->period_ms) {
+        uint32_t old_ms = tx->period_ms != 0 ? tx->period_ms : loop_ms;
+        uint32_t new_ms = period_ms != 0 ? period_ms : loop_ms;
+        if (new_ms < old_ms) {
+            /* A higher rate applies at once rather than after the current slow interval. */
+            tx->next_send_ms = now_ms;
+        }
+        tx->period_ms = period_ms;
+        ESP_LOGI(TAG, "Telemetry rate %s%.1f Hz", period_ms == 0 ? "default " : "", 1000.0f / (float)new_ms);
+    }
+    tx->valid_until_ms = pkt->valid_ms != 0 ? now_ms + pkt->valid_ms : 0;
+}
+
 static void alert_output_init(void) {
     gpio_config_t cfg = {
         .pin_bit_mask = (1ULL << ALERT_OUTPUT_PIN),
@@ -176,6 +207,7 @@ void app_main(void) {
 #endif
 
     alert_state_t alert = {0};
+    tx_rate_t tx = {0};
 
     int64_t last_loop_us = esp_timer_get_time();
     int64_t boot_ms = last_loop_us / 1000;
@@ -323,9 +355,18 @@ void app_main(void) {
             flags |= FLAG_MAG_CAL_ACTIVE;
         }
 
+        if (tx.period_ms != 0 && tx.valid_until_ms != 0 && now_ms >= tx.valid_until_ms) {
+            tx.period_ms = 0;
+            ESP_LOGI(TAG, "Rate command expired, back to %d Hz", TELEMETRY_RATE_HZ);
+        }
+        bool send_now = tx.period_ms == 0 || now_ms >= tx.next_send_ms;
+        if (send_now) {
+            tx.next_send_ms = now_ms + tx.period_ms;
+        }
+
         fdw_telemetry_t t = {
             .player_id = PLAYER_ID,
-            .seq = seq++,
+            .seq = seq,
             .timestamp_ms = (uint32_t)now_ms,
             .yaw_cd = deg_to_centideg(yaw_recentered),
             .pitch_cd = deg_to_centideg(pitch),
@@ -342,24 +383,38 @@ void app_main(void) {
             .gps_quality = GPS_ENABLED ? (uint8_t)GPS_QUALITY : 0,
         };
 
-        uint8_t out_buf[FDW_TELEMETRY_PACKET_SIZE] = {0};
-        size_t out_len = fdw_pack_telemetry(out_buf, sizeof(out_buf), &t);
-        if (out_len == FDW_TELEMETRY_PACKET_SIZE) {
-            (void)net_udp_send(out_buf, out_len);
+        if (send_now) {
+            uint8_t out_buf[FDW_TELEMETRY_PACKET_SIZE] = {0};
+            size_t out_len = fdw_pack_telemetry(out_buf, sizeof(out_buf), &t);
+            if (out_len == FDW_TELEMETRY_PACKET_SIZE) {
+                (void)net_udp_send(out_buf, out_len);
+                seq++;
+            }
         }
 
-        uint8_t in_buf[64] = {0};
-        int rx = net_udp_receive(in_buf, sizeof(in_buf), 0);
-        if (rx == FDW_ALERT_PACKET_SIZE) {
-            fdw_alert_t alert_pkt;
-            if (fdw_unpack_alert(in_buf, rx, &alert_pkt) && alert_pkt.player_id == PLAYER_ID) {
-                if (alert_pkt.alert_on) {
-                    alert.active = true;
-                    alert.intensity = alert_pkt.intensity;
-                    alert.hold_until_ms = now_ms + alert_pkt.hold_ms;
-                } else if (now_ms >= alert.hold_until_ms) {
-                    alert.active = false;
-                    alert.intensity = 0;
+        /* Alerts and rate commands can arrive in the same loop; read what is queued. */
+        for (int n = 0; n < 4; ++n) {
+            uint8_t in_buf[64] = {0};
+            int rx = net_udp_receive(in_buf, sizeof(in_buf), 0);
+            if (rx <= 0) {
+                break;
+            }
+            if (rx == FDW_ALERT_PACKET_SIZE) {
+                fdw_alert_t alert_pkt;
+                if (fdw_unpack_alert(in_buf, rx, &alert_pkt) && alert_pkt.player_id == PLAYER_ID) {
+                    if (alert_pkt.alert_on) {
+                        alert.active = true;
+                        alert.intensity = alert_pkt.intensity;
+                        alert.hold_until_ms = now_ms + alert_pkt.hold_ms;
+                    } else if (now_ms >= alert.hold_until_ms) {
+                        alert.active = false;
+                        alert.intensity = 0;
+                    }
+                }
+            } else if (rx == FDW_RATE_CONTROL_PACKET_SIZE) {
+                fdw_rate_control_t rate_pkt;
+                if (fdw_unpack_rate_control(in_buf, rx, &rate_pkt) && rate_pkt.player_id == PLAYER_ID) {
+                    apply_rate_control(&tx, &rate_pkt, now_ms);
                 }
             }
         }
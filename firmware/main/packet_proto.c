@@ -107,3 +107,26 @@ bool fdw_unpack_alert(const uint8_t *data, size_t len, fdw_alert_t *out) {
     out->hold_ms = read_u16_le(&data[7]);
     return true;
 }
+
+bool fdw_unpack_rate_control(const uint8_t *data, size_t len, fdw_rate_control_t *out) {
+    if (data == NULL || out == NULL || len != FDW_RATE_CONTROL_PACKET_SIZE) {
+        return false;
+    }
+    if (data[0] != FDW_MAGIC0 || data[1] != FDW_MAGIC1) {
+        return false;
+    }
+    if (data[2] != FDW_RATE_CONTROL_VERSION || data[3] != FDW_MSG_RATE_CONTROL) {
+        return false;
+    }
+
+    uint16_t expected_crc = read_u16_le(&data[len - 2]);
+    uint16_t actual_crc = fdw_crc16_ccitt(data, len - 2);
+    if (expected_crc != actual_crc) {
+        return false;
+    }
+
+    out->player_id = read_u16_le(&data[4]);
+    out->rate_dhz = read_u16_le(&data[6]);
+    out->valid_ms = read_u16_le(&data[8]);
+    return true;
+}
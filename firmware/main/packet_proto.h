@@ -7,12 +7,15 @@
 #define FDW_MAGIC0 0x46
 #define FDW_MAGIC1 0x44
 #define FDW_ALERT_VERSION 0x01
+#define FDW_RATE_CONTROL_VERSION 0x01
 #define FDW_TELEMETRY_VERSION 0x02
 #define FDW_MSG_TELEMETRY 0x01
 #define FDW_MSG_ALERT 0x02
+#define FDW_MSG_RATE_CONTROL 0x03
 
 #define FDW_TELEMETRY_PACKET_SIZE 45
 #define FDW_ALERT_PACKET_SIZE 11
+#define FDW_RATE_CONTROL_PACKET_SIZE 12
 
 typedef struct {
     uint8_t player_id;
@@ -40,6 +43,13 @@ typedef struct {
     uint16_t hold_ms;
 } fdw_alert_t;
 
+typedef struct {
+    uint16_t player_id;
+    uint16_t rate_dhz;
+    uint16_t valid_ms;
+} fdw_rate_control_t;
+
 uint16_t fdw_crc16_ccitt(const uint8_t *data, size_t len);
 size_t fdw_pack_telemetry(uint8_t *out, size_t cap, const fdw_telemetry_t *pkt);
 bool fdw_unpack_alert(const uint8_t *data, size_t len, fdw_alert_t *out);
+bool fdw_unpack_rate_control(const uint8_t *data, size_t len, fdw_rate_control_t *out);
@@ -63,12 +63,15 @@ static const uint32_t AUTO_RECENTER_DELAY_MS = 1500;
 static const uint8_t FDW_MAGIC0 = 0x46; // 'F'
 static const uint8_t FDW_MAGIC1 = 0x44; // 'D'
 static const uint8_t FDW_ALERT_VERSION = 0x01;
+static const uint8_t FDW_RATE_CONTROL_VERSION = 0x01;
 static const uint8_t FDW_TELEMETRY_VERSION = 0x02;
 static const uint8_t FDW_MSG_TELEMETRY = 0x01;
 static const uint8_t FDW_MSG_ALERT = 0x02;
+static const uint8_t FDW_MSG_RATE_CONTROL = 0x03;
 
 static const size_t FDW_TELEMETRY_SIZE = 45;
 static const size_t FDW_ALERT_SIZE = 11;
+static const size_t FDW_RATE_CONTROL_SIZE = 12;
 
 // GPS telemetry fields (WGS84): set quality > 0 when valid fix is available.
 static const int32_t GPS_LAT_E7 = 0;
@@ -120,6 +123,9 @@ static float gyro_bias_z_dps = 0.0f;
 static uint16_t seq = 0;
 static uint32_t last_imu_ms = 0;
 static uint32_t last_tx_ms = 0;
+// Send interval commanded by the coordinator (0 = TELEMETRY_RATE_HZ) and when it lapses (0 = never).
+static uint32_t commanded_period_ms = 0;
+static uint32_t commanded_until_ms = 0;
 
 static bool alert_on = false;
 static uint8_t alert_intensity = 0;
@@ -448,23 +454,11 @@ static void sendTelemetry() {
   udp.endPacket();
 }
 
-static void pollAlertPacket() {
-  int size = udp.parsePacket();
-  if (size <= 0) return;
-
-  uint8_t buf[64];
-  if ((size_t)size > sizeof(buf)) {
-    while (udp.available()) udp.read();
-    return;
-  }
-
-  int read_n = udp.read(buf, size);
-  if (read_n != size) return;
-  if ((size_t)size != FDW_ALERT_SIZE) return;
-
-  if (buf[0] != FDW_MAGIC0 || buf[1] != FDW_MAGIC1) return;
-  if (buf[2] != FDW_ALERT_VERSION || buf[3] != FDW_MSG_ALERT) return;
+static uint32_t txPeriodMs() {
+  return commanded_period_ms != 0 ? commanded_period_ms : (1000u / TELEMETRY_RATE_HZ);
+}
 
+static void handleAlertPacket(const uint8_t* buf) {
   uint16_t recv_crc = read_u16_le(&buf[FDW_ALERT_SIZE - 2]);
   uint16_t calc_crc = crc16_ccitt_false(buf, FDW_ALERT_SIZE - 2);
   if (recv_crc != calc_crc) return;
@@ -487,6 +481,56 @@ static void pollAlertPacket() {
   }
 }
 
+static void handleRateControlPacket(const uint8_t* buf) {
+  uint16_t recv_crc = read_u16_le(&buf[FDW_RATE_CONTROL_SIZE - 2]);
+  uint16_t calc_crc = crc16_ccitt_false(buf, FDW_RATE_CONTROL_SIZE - 2);
+  if (recv_crc != calc_crc) return;
+
+  uint16_t player_id = read_u16_le(&buf[4]);
+  uint16_t rate_dhz = read_u16_le(&buf[6]);
+  uint16_t valid_ms = read_u16_le(&buf[8]);
+  if (player_id != PLAYER_ID) return;
+
+  uint32_t now = millis();
+  uint32_t period_ms = rate_dhz != 0 ? (10000u / rate_dhz) : 0;
+  if (period_ms == 0 && rate_dhz != 0) period_ms = 1;
+  if (period_ms != commanded_period_ms) {
+    uint32_t old_ms = txPeriodMs();
+    commanded_period_ms = period_ms;
+    if (txPeriodMs() < old_ms) {
+      // A higher rate applies at once rather than after the current slow interval.
+      last_tx_ms = now - old_ms;
+    }
+    Serial.printf("telemetry rate %s%.1f Hz\n", period_ms == 0 ? "default " : "", 1000.0 / (double)txPeriodMs());
+  }
+  commanded_until_ms = valid_ms != 0 ? now + valid_ms : 0;
+}
+
+static void pollServerPackets() {
+  // Alerts and rate commands can arrive together; read what is queued.
+  for (int n = 0; n < 4; n++) {
+    int size = udp.parsePacket();
+    if (size <= 0) return;
+
+    uint8_t buf[64];
+    if ((size_t)size > sizeof(buf)) {
+      while (udp.available()) udp.read();
+      continue;
+    }
+
+    int read_n = udp.read(buf, size);
+    if (read_n != size) continue;
+    if (buf[0] != FDW_MAGIC0 || buf[1] != FDW_MAGIC1) continue;
+
+    if ((size_t)size == FDW_ALERT_SIZE && buf[2] == FDW_ALERT_VERSION && buf[3] == FDW_MSG_ALERT) {
+      handleAlertPacket(buf);
+    } else if ((size_t)size == FDW_RATE_CONTROL_SIZE && buf[2] == FDW_RATE_CONTROL_VERSION &&
+               buf[3] == FDW_MSG_RATE_CONTROL) {
+      handleRateControlPacket(buf);
+    }
+  }
+}
+
 static void updateAlertOutput() {
   uint32_t now = millis();
   if (alert_on && (int32_t)(now - alert_hold_until_ms) >= 0) {
@@ -538,13 +582,16 @@ void loop() {
   updateImu();
 
   uint32_t now = millis();
-  const uint32_t tx_period_ms = (1000u / TELEMETRY_RATE_HZ);
-  if ((now - last_tx_ms) >= tx_period_ms) {
+  if (commanded_period_ms != 0 && commanded_until_ms != 0 && (int32_t)(now - commanded_until_ms) >= 0) {
+    commanded_period_ms = 0;
+    Serial.printf("rate command expired, back to %u Hz\n", (unsigned)TELEMETRY_RATE_HZ);
+  }
+  if ((now - last_tx_ms) >= txPeriodMs()) {
     last_tx_ms = now;
     sendTelemetry();
   }
 
-  pollAlertPacket();
+  pollServerPackets();
   updateAlertOutput();
 
   static uint32_t last_log_ms = 0;
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+import csv
+from dataclasses import dataclass, field
+import io
+import json
+import logging
+import mmap
+from pathlib import Path
+from typing import Any, Collection, Iterator
+
+from .packet import PacketError, TelemetryPacket, decode_alert, decode_telemetry
+from .recfile import (
+    REC_ALERT,
+    REC_CONFIG,
+    REC_KEYFRAME,
+    REC_TELEMETRY,
+    SEGMENT_HEADER,
+    iter_records,
+    read_segment_header,
+)
+
+
+LOG = logging.getLogger("fdw.aar")
+
+DEFAULT_OFFLINE_TIMEOUT_MS = 2000
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = (
+    "t_ms",
+    "kind",
+    "player_id",
+    "seq",
+    "yaw_deg",
+    "pitch_deg",
+    "roll_deg",
+    "quality",
+    "x_m",
+    "y_m",
+    "pos_quality",
+    "battery_mv",
+    "flags",
+    "gps_lat_deg",
+    "gps_lon_deg",
+    "gps_alt_m",
+    "gps_quality",
+    "alert_on",
+    "alert_intensity",
+)
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def decode_record(rtype: int, payload: memoryview | bytes) -> Any:
+    """Decode a record payload for AarState.apply_decoded; None when it cannot be decoded.
+
+    Keyframes decode to a list of (rtype, player_id, t_us, decoded) tuples.
+    Record types AarState does not fold (events) decode to None.
+    """
+    try:
+        if rtype == REC_TELEMETRY:
+            return decode_telemetry(bytes(payload))
+        if rtype == REC_ALERT:
+            return decode_alert(bytes(payload))
+        if rtype == REC_CONFIG:
+            return json.loads(bytes(payload))
+    except (PacketError, ValueError):
+        return None
+    if rtype == REC_KEYFRAME:
+        return [
+            (inner_type, inner_pid, inner_t_us, decode_record(inner_type, inner))
+            for _offset, inner_type, inner_pid, inner_t_us, inner in iter_records(payload, 0)
+        ]
+    return None
+
+
+@dataclass(slots=True)
+class AarPlayer:
+    player_id: int
+    seq: int = 0
+    yaw_deg: float = 0.0
+    pitch_deg: float = 0.0
+    roll_deg: float = 0.0
+    quality: int = 0
+    x_m: float | None = None
+    y_m: float | None = None
+    pos_quality: int = 0
+    battery_mv: int = 0
+    gps_lat_deg: float | None = None
+    gps_lon_deg: float | None = None
+    gps_alt_m: float | None = None
+    gps_quality: int = 0
+    last_seen_us: int | None = None
+    alert_on: bool = False
+    alert_intensity: int = 0
+
+
+@dataclass(slots=True)
+class AarState:
+    """Match state folded from recorded telemetry, alert and config records."""
+
+    players: dict[int, AarPlayer] = field(default_factory=dict)
+    config: dict[str, Any] = field(default_factory=dict)
+    config_version: int | None = None
+    records_applied: int = 0
+    decode_errors: int = 0
+
+    def _player(self, player_id: int) -> AarPlayer:
+        player = self.players.get(player_id)
+        if player is None:
+            player = AarPlayer(player_id=player_id)
+            self.players[player_id] = player
+        return player
+
+    def apply(self, rtype: int, player_id: int, t_us: int, payload: memoryview) -> None:
+        self.apply_decoded(rtype, player_id, t_us, decode_record(rtype, payload))
+
+    def apply_decoded(self, rtype: int, player_id: int, t_us: int, decoded: Any) -> None:
+        """Fold a record already passed through decode_record (None means undecodable)."""
+        self.records_applied += 1
+        if rtype == REC_TELEMETRY:
+            if decoded is None:
+                self.decode_errors += 1
+                return
+            pkt: TelemetryPacket = decoded
+            player = self._player(pkt.player_id)
+            player.seq = pkt.seq
+            player.yaw_deg = pkt.yaw_deg
+            player.pitch_deg = pkt.pitch_deg
+            player.roll_deg = pkt.roll_deg
+            player.quality = pkt.quality
+            player.pos_quality = pkt.pos_quality
+            if pkt.pos_quality > 0:
+                player.x_m = pkt.pos_x_cm / 100.0
+                player.y_m = pkt.pos_y_cm / 100.0
+            player.battery_mv = pkt.battery_mv
+            player.gps_lat_deg = pkt.gps_lat_deg
+            player.gps_lon_deg = pkt.gps_lon_deg
+            player.gps_alt_m = pkt.gps_alt_m
+            player.gps_quality = pkt.gps_quality
+            player.last_seen_us = t_us
+        elif rtype == REC_ALERT:
+            if decoded is None:
+                self.decode_errors += 1
+                return
+            player = self._player(player_id)
+            player.alert_on = bool(decoded.alert_on)
+            player.alert_intensity = decoded.intensity
+        elif rtype == REC_CONFIG:
+            if decoded is None:
+                self.decode_errors += 1
+                return
+            self.config = decoded.get("config", {})
+            self.config_version = decoded.get("config_version")
+        elif rtype == REC_KEYFRAME:
+            for inner_type, inner_pid, inner_t_us, inner in decoded:
+                self.apply_decoded(inner_type, inner_pid, inner_t_us, inner)
+
+    def to_dict(self, t_us: int) -> dict[str, Any]:
+        timeout_ms = int(self.config.get("offline_timeout_ms", DEFAULT_OFFLINE_TIMEOUT_MS))
+        players = []
+        for player_id in sorted(self.players):
+            player = self.players[player_id]
+            ago_ms = None if player.last_seen_us is None else max(0, (t_us - player.last_seen_us) // 1000)
+            players.append(
+                {
+                    "id": player_id,
+                    "x_m": None if player.x_m is None else round(player.x_m, 3),
+                    "y_m": None if player.y_m is None else round(player.y_m, 3),
+                    "pos_quality": player.pos_quality,
+                    "yaw_deg": round(player.yaw_deg, 2),
+                    "pitch_deg": round(player.pitch_deg, 2),
+                    "roll_deg": round(player.roll_deg, 2),
+                    "quality": player.quality,
+                    "gps_lat_deg": player.gps_lat_deg,
+                    "gps_lon_deg": player.gps_lon_deg,
+                    "gps_alt_m": player.gps_alt_m,
+                    "gps_quality": player.gps_quality,
+                    "battery_mv": player.battery_mv,
+                    "seq": player.seq,
+                    "online": ago_ms is not None and ago_ms <= timeout_ms,
+                    "last_seen_ms_ago": ago_ms,
+                    "alert": player.alert_on,
+                    "alert_intensity": player.alert_intensity,
+                }
+            )
+        return {
+            "t_ms": t_us // 1000,
+            "config_version": self.config_version,
+            "config": self.config,
+            "players": players,
+        }
+
+
+class RecordingReader:
+    """Random access over a recorded session's segments through read-only mmaps.
+
+    Segments are mapped lazily and stay mapped until close(); record payloads
+    are memoryview slices of the mapping, so seeking copies nothing but the
+    records it actually decodes.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        segments: list[dict[str, Any]],
+        keyframes: list[tuple[int, int, int]] | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.segments = sorted(segments, key=lambda segment: segment["index"])
+        self.keyframes = sorted(tuple(keyframe) for keyframe in keyframes or [])
+        self._keyframe_times = [keyframe[0] for keyframe in self.keyframes]
+        self._positions = {segment["index"]: pos for pos, segment in enumerate(self.segments)}
+        self._maps: dict[int, mmap.mmap | None] = {}
+
+    @classmethod
+    def for_session(cls, session: dict[str, Any]) -> RecordingReader:
+        """Build a reader from a catalog entry (see SessionCatalog.get_session)."""
+        return cls(Path(session["output_dir"]), session["segments"], session.get("keyframes"))
+
+    def __enter__(self) -> RecordingReader:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for mapped in self._maps.values():
+            if mapped is not None:
+                mapped.close()
+        self._maps.clear()
+
+    def _map(self, segment_index: int) -> mmap.mmap | None:
+        if segment_index in self._maps:
+            return self._maps[segment_index]
+        segment = self.segments[self._positions[segment_index]]
+        mapped: mmap.mmap | None = None
+        with open(self.output_dir / segment["file"], "rb") as handle:
+            if handle.seek(0, 2) >= SEGMENT_HEADER.size:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                read_segment_header(mapped)
+        self._maps[segment_index] = mapped
+        return mapped
+
+    def iter_from(
+        self,
+        segment_index: int = 0,
+        offset: int = SEGMENT_HEADER.size,
+    ) -> Iterator[tuple[int, int, int, memoryview]]:
+        """Yield (rtype, player_id, t_us, payload) from a position onwards, across segments."""
+        start_pos = self._positions.get(segment_index)
+        if start_pos is None:
+            return
+        for segment in self.segments[start_pos:]:
+            mapped = self._map(segment["index"])
+            if mapped is None:
+                continue
+            start = offset if segment["index"] == segment_index else SEGMENT_HEADER.size
+            with memoryview(mapped) as view:
+                for _offset, rtype, player_id, t_us, payload in iter_records(view, start):
+                    yield rtype, player_id, t_us, payload
+                    payload.release()
+
+    def seek_position(self, t_us: int) -> tuple[int | None, int, int]:
+        """(keyframe t_us or None, segment index, offset) to start folding from for `t_us`."""
+        idx = bisect_right(self._keyframe_times, t_us) - 1
+        if idx < 0:
+            first = self.segments[0]["index"] if self.segments else 0
+            return None, first, SEGMENT_HEADER.size
+        keyframe_t_us, segment_index, offset = self.keyframes[idx]
+        return keyframe_t_us, segment_index, offset
+
+    def state_at(self, t_us: int) -> tuple[AarState, int | None]:
+        """Match state at `t_us`, folded from the nearest keyframe at or before it."""
+        keyframe_t_us, segment_index, offset = self.seek_position(t_us)
+        state = AarState()
+        records = self.iter_from(segment_index, offset)
+        try:
+            for rtype, player_id, record_t_us, payload in records:
+                if record_t_us > t_us:
+                    break
+                state.apply(rtype, player_id, record_t_us, payload)
+        finally:
+            records.close()
+        return state, keyframe_t_us
+
+
+def iter_export_rows(
+    reader: RecordingReader,
+    from_us: int = 0,
+    to_us: int | None = None,
+    players: Collection[int] | None = None,
+) -> Iterator[tuple[Any, ...]]:
+    """Telemetry and alert records in [from_us, to_us] as EXPORT_COLUMNS tuples."""
+    first = reader.segments[0]["index"] if reader.segments else 0
+    segment_index, offset = first, SEGMENT_HEADER.size
+    if from_us > 0:
+        # Keyframe offsets double as a coarse time index into the segments; only
+        # records written after a keyframe strictly before from_us can be skipped.
+        _keyframe_t_us, segment_index, offset = reader.seek_position(from_us - 1)
+    records = reader.iter_from(segment_index, offset)
+    try:
+        for rtype, player_id, t_us, payload in records:
+            if to_us is not None and t_us > to_us:
+                break
+            if t_us < from_us or (players is not None and player_id not in players):
+                continue
+            t_ms = round(t_us / 1000.0, 3)
+            if rtype == REC_TELEMETRY:
+                try:
+                    pkt = decode_telemetry(bytes(payload))
+                except PacketError:
+                    continue
+                has_pos = pkt.pos_quality > 0
+                yield (
+                    t_ms,
+                    "telemetry",
+                    pkt.player_id,
+                    pkt.seq,
+                    pkt.yaw_deg,
+                    pkt.pitch_deg,
+                    pkt.roll_deg,
+                    pkt.quality,
+                    pkt.pos_x_cm / 100.0 if has_pos else None,
+                    pkt.pos_y_cm / 100.0 if has_pos else None,
+                    pkt.pos_quality,
+                    pkt.battery_mv,
+                    pkt.flags,
+                    pkt.gps_lat_deg,
+                    pkt.gps_lon_deg,
+                    pkt.gps_alt_m,
+                    pkt.gps_quality,
+                    None,
+                    None,
+                )
+            elif rtype == REC_ALERT:
+                try:
+                    alert = decode_alert(bytes(payload))
+                except PacketError:
+                    continue
+                yield (t_ms, "alert", player_id, *([None] * 14), bool(alert.alert_on), alert.intensity)
+    finally:
+        records.close()
+
+
+def iter_export_chunks(
+    rows: Iterator[tuple[Any, ...]],
+    fmt: str,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Encode export rows as CSV (with header) or NDJSON in chunks of about `chunk_bytes`."""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_bytes:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    elif fmt == "ndjson":
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), separators=(",", ":")))
+            buffer.write("\n")
+            if buffer.tell() >= chunk_bytes:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    else:
+        raise ValueError(f"unsupported export format: {fmt}")
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from array import array
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+from .recfile import (
+    MANIFEST_NAME,
+    RECORD_HEADER,
+    REC_ALERT,
+    REC_CONFIG,
+    REC_TELEMETRY,
+    pack_record_into,
+    pack_segment_header,
+    segment_name,
+)
+
+
+LOG = logging.getLogger("fdw.blackbox")
+
+# Smallest record we expect (header plus an alert datagram); sizes the index.
+MIN_RECORD_BYTES = RECORD_HEADER.size + 10
+
+
+class BlackBoxRing:
+    """Always-on ring of the most recent raw datagrams, in recorder record format.
+
+    Records are packed into one preallocated bytearray at a virtual write
+    position; a record that would straddle the end of the buffer starts
+    over at offset 0 instead. A preallocated index ring holds the virtual
+    start of every record, so the oldest surviving record is the first one
+    whose start is still within `capacity` bytes of the head. record()
+    allocates nothing beyond the integers it computes.
+    """
+
+    def __init__(self, capacity_bytes: int) -> None:
+        self.capacity = capacity_bytes
+        self._buf = bytearray(capacity_bytes)
+        self._slots = max(1, capacity_bytes // MIN_RECORD_BYTES)
+        self._starts = array("q", bytes(8 * self._slots))
+        self._head = 0
+        self._count = 0
+        self._start_ns = time.monotonic_ns()
+        self.start_unix_ms = int(time.time() * 1000)
+
+    def elapsed_us(self) -> int:
+        return (time.monotonic_ns() - self._start_ns) // 1000
+
+    def record(self, rtype: int, player_id: int, payload: bytes, t_us: int | None = None) -> bool:
+        size = RECORD_HEADER.size + len(payload)
+        capacity = self.capacity
+        if size > capacity:
+            return False
+        if t_us is None:
+            t_us = (time.monotonic_ns() - self._start_ns) // 1000
+        head = self._head
+        pos = head % capacity
+        if pos + size > capacity:
+            head += capacity - pos
+            pos = 0
+        pack_record_into(self._buf, pos, rtype, player_id, t_us, payload)
+        self._starts[self._count % self._slots] = head
+        self._count += 1
+        self._head = head + size
+        return True
+
+    def _oldest_index(self, head: int, count: int) -> int:
+        """Index of the oldest record that has not been overwritten."""
+        first = max(0, count - self._slots)
+        floor = head - self.capacity
+        lo, hi = first, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._starts[mid % self._slots] < floor:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def freeze(self) -> tuple[bytes, list[int]]:
+        """Copy the ring and the physical offsets of surviving records, oldest first."""
+        head, count = self._head, self._count
+        oldest = self._oldest_index(head, count)
+        offsets = [self._starts[index % self._slots] % self.capacity for index in range(oldest, count)]
+        return bytes(self._buf), offsets
+
+    def stats(self) -> dict[str, Any]:
+        head, count = self._head, self._count
+        oldest = self._oldest_index(head, count)
+        span_s = 0.0
+        if count > oldest:
+            first_t_us = RECORD_HEADER.unpack_from(self._buf, self._starts[oldest % self._slots] % self.capacity)[4]
+            last_t_us = RECORD_HEADER.unpack_from(self._buf, self._starts[(count - 1) % self._slots] % self.capacity)[4]
+            span_s = (last_t_us - first_t_us) / 1_000_000
+        return {
+            "capacity_bytes": self.capacity,
+            "used_bytes": min(head, self.capacity),
+            "records": count - oldest,
+            "records_total": count,
+            "span_s": round(span_s, 3),
+        }
+
+
+def write_dump(
+    data: bytes,
+    offsets: list[int],
+    start_unix_ms: int,
+    output_dir: Path,
+    session_id: str,
+    config_json: str,
+    since_us: int | None = None,
+) -> dict[str, Any]:
+    """Write frozen ring contents as a one-segment recorder session; returns its manifest.
+
+    Timestamps are rebased so the session starts at the first dumped record,
+    which is preceded by the current config so replay and analysis see the
+    same parameters as the live coordinator.
+    """
+    records: list[tuple[int, int]] = []
+    for offset in offsets:
+        length, _rtype, _flags, _player_id, t_us = RECORD_HEADER.unpack_from(data, offset)
+        if since_us is None or t_us >= since_us:
+            records.append((offset, length))
+
+    base_us = RECORD_HEADER.unpack_from(data, records[0][0])[4] if records else 0
+    config_payload = config_json.encode("utf-8")
+    body = bytearray(RECORD_HEADER.size + len(config_payload) + sum(RECORD_HEADER.size + n for _, n in records))
+    end = pack_record_into(body, 0, REC_CONFIG, 0, 0, config_payload)
+    players: dict[int, int] = {}
+    telemetry_packets = alert_transitions = 0
+    last_t_us = 0
+    view = memoryview(data)
+    for offset, length in records:
+        _length, rtype, _flags, player_id, t_us = RECORD_HEADER.unpack_from(data, offset)
+        last_t_us = t_us - base_us
+        payload_start = offset + RECORD_HEADER.size
+        end = pack_record_into(body, end, rtype, player_id, last_t_us, view[payload_start : payload_start + length])
+        if rtype == REC_TELEMETRY:
+            telemetry_packets += 1
+            players[player_id] = players.get(player_id, 0) + 1
+        elif rtype == REC_ALERT:
+            alert_transitions += 1
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    session_start_unix_ms = start_unix_ms + base_us // 1000
+    segment_file = segment_name(0)
+    with open(output_dir / segment_file, "wb") as handle:
+        handle.write(pack_segment_header(session_start_unix_ms, 0))
+        handle.write(body)
+
+    manifest = {
+        "session_id": session_id,
+        "source": "blackbox",
+        "start_unix_ms": session_start_unix_ms,
+        "end_unix_ms": session_start_unix_ms + last_t_us // 1000,
+        "duration_ms": last_t_us // 1000,
+        "records": len(records) + 1,
+        "bytes": len(body),
+        "dropped_records": 0,
+        "telemetry_packets": telemetry_packets,
+        "alert_transitions": alert_transitions,
+        "config_changes": 1,
+        "players": {str(pid): count for pid, count in sorted(players.items())},
+        "segments": [
+            {"index": 0, "file": segment_file, "bytes": len(body), "first_t_us": 0, "last_t_us": last_t_us}
+        ],
+        "keyframes": [],
+    }
+    tmp_path = output_dir / (MANIFEST_NAME + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, output_dir / MANIFEST_NAME)
+    LOG.info("Black box dumped %d records (%.1f s) to %s", len(records), last_t_us / 1e6, output_dir)
+    return manifest
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any
+
+from .recfile import MANIFEST_NAME
+
+
+LOG = logging.getLogger("fdw.catalog")
+
+CATALOG_NAME = "catalog.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    output_dir TEXT NOT NULL,
+    start_unix_ms INTEGER NOT NULL,
+    end_unix_ms INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    records INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    dropped_records INTEGER NOT NULL,
+    telemetry_packets INTEGER NOT NULL,
+    alert_transitions INTEGER NOT NULL,
+    player_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_start ON sessions(start_unix_ms);
+CREATE INDEX IF NOT EXISTS sessions_by_alerts ON sessions(alert_transitions, start_unix_ms);
+
+CREATE TABLE IF NOT EXISTS session_players (
+    session_id TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    packets INTEGER NOT NULL,
+    PRIMARY KEY (session_id, player_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS session_players_by_player ON session_players(player_id, session_id);
+
+CREATE TABLE IF NOT EXISTS segments (
+    session_id TEXT NOT NULL,
+    segment_index INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    first_t_us INTEGER,
+    last_t_us INTEGER,
+    PRIMARY KEY (session_id, segment_index)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS keyframes (
+    session_id TEXT NOT NULL,
+    t_us INTEGER NOT NULL,
+    segment_index INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (session_id, t_us, segment_index, offset)
+) WITHOUT ROWID;
+"""
+
+MAX_PAGE_SIZE = 500
+
+
+class SessionCatalog:
+    """SQLite index of recorded sessions.
+
+    The recorder's writer thread adds a row set when a session closes, so
+    listing never has to open recording directories. Every call uses its own
+    short-lived connection, which keeps the catalog safe to use from the
+    writer thread and from executor threads alike.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    def add_session(self, manifest: dict[str, Any], output_dir: Path) -> None:
+        session_id = manifest["session_id"]
+        players = manifest.get("players", {})
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM session_players WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM segments WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM keyframes WHERE session_id = ?", (session_id,))
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO sessions (
+                        session_id, output_dir, start_unix_ms, end_unix_ms, duration_ms, records, bytes,
+                        dropped_records, telemetry_packets, alert_transitions, player_count
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        session_id,
+                        str(output_dir),
+                        int(manifest.get("start_unix_ms", 0)),
+                        int(manifest.get("end_unix_ms", 0)),
+                        int(manifest.get("duration_ms", 0)),
+                        int(manifest.get("records", 0)),
+                        int(manifest.get("bytes", 0)),
+                        int(manifest.get("dropped_records", 0)),
+                        int(manifest.get("telemetry_packets", 0)),
+                        int(manifest.get("alert_transitions", 0)),
+                        len(players),
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO session_players (session_id, player_id, packets) VALUES (?, ?, ?)",
+                    [(session_id, int(pid), int(count)) for pid, count in players.items()],
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO segments (session_id, segment_index, file, bytes, first_t_us, last_t_us)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            session_id,
+                            int(segment["index"]),
+                            segment["file"],
+                            int(segment["bytes"]),
+                            segment.get("first_t_us"),
+                            segment.get("last_t_us"),
+                        )
+                        for segment in manifest.get("segments", [])
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO keyframes (session_id, t_us, segment_index, offset) VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, int(t_us), int(segment_index), int(offset))
+                        for t_us, segment_index, offset in manifest.get("keyframes", [])
+                    ],
+                )
+        finally:
+            conn.close()
+
+    def import_missing(self, recordings_dir: Path) -> int:
+        """Index manifests of sessions recorded while the catalog was unavailable."""
+        if not recordings_dir.is_dir():
+            return 0
+        conn = self._connect()
+        try:
+            known = {row[0] for row in conn.execute("SELECT session_id FROM sessions")}
+        finally:
+            conn.close()
+
+        imported = 0
+        for manifest_path in recordings_dir.glob(f"*/{MANIFEST_NAME}"):
+            if manifest_path.parent.name in known:
+                continue
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                self.add_session(manifest, manifest_path.parent)
+            except (OSError, ValueError, KeyError):
+                LOG.warning("Skipping unreadable session manifest %s", manifest_path)
+                continue
+            imported += 1
+        return imported
+
+    def list_sessions(
+        self,
+        *,
+        since_unix_ms: int | None = None,
+        until_unix_ms: int | None = None,
+        player_id: int | None = None,
+        min_alerts: int | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if since_unix_ms is not None:
+            clauses.append("s.start_unix_ms >= ?")
+            params.append(since_unix_ms)
+        if until_unix_ms is not None:
+            clauses.append("s.start_unix_ms < ?")
+            params.append(until_unix_ms)
+        if min_alerts is not None:
+            clauses.append("s.alert_transitions >= ?")
+            params.append(min_alerts)
+        if player_id is not None:
+            clauses.append("s.session_id IN (SELECT session_id FROM session_players WHERE player_id = ?)")
+            params.append(player_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM sessions s {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT s.*, (
+                    SELECT group_concat(player_id) FROM session_players p WHERE p.session_id = s.session_id
+                ) AS player_ids
+                FROM sessions s {where}
+                ORDER BY s.start_unix_ms DESC
+                LIMIT ? OFFSET ?
+                """,
+                [*params, limit, offset],
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "sessions": [self._session_row(row) for row in rows],
+        }
+
+    def get_session(self, session_id: str) -> dict[str, Any] | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                """
+                SELECT s.*, (
+                    SELECT group_concat(player_id) FROM session_players p WHERE p.session_id = s.session_id
+                ) AS player_ids
+                FROM sessions s WHERE s.session_id = ?
+                """,
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            segments = conn.execute(
+                "SELECT * FROM segments WHERE session_id = ? ORDER BY segment_index",
+                (session_id,),
+            ).fetchall()
+            keyframes = conn.execute(
+                "SELECT t_us, segment_index, offset FROM keyframes WHERE session_id = ? ORDER BY t_us",
+                (session_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        session = self._session_row(row)
+        session["output_dir"] = row["output_dir"]
+        session["segments"] = [
+            {
+                "index": segment["segment_index"],
+                "file": segment["file"],
+                "bytes": segment["bytes"],
+                "first_t_us": segment["first_t_us"],
+                "last_t_us": segment["last_t_us"],
+            }
+            for segment in segments
+        ]
+        session["keyframes"] = [(kf["t_us"], kf["segment_index"], kf["offset"]) for kf in keyframes]
+        return session
+
+    @staticmethod
+    def _session_row(row: sqlite3.Row) -> dict[str, Any]:
+        player_ids = row["player_ids"]
+        return {
+            "session_id": row["session_id"],
+            "start_unix_ms": row["start_unix_ms"],
+            "end_unix_ms": row["end_unix_ms"],
+            "duration_ms": row["duration_ms"],
+            "telemetry_packets": row["telemetry_packets"],
+            "alert_transitions": row["alert_transitions"],
+            "dropped_records": row["dropped_records"],
+            "bytes": row["bytes"],
+            "player_ids": sorted(int(pid) for pid in player_ids.split(",")) if player_ids else [],
+        }
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import math
+import sys
+from typing import Any
+
+
+# Offset samples (receive time - node time) are reduced to one minimum per
+# window; the minima of the last CLOCK_WINDOWS windows are fitted with a line,
+# giving the offset along the fastest observed path and the node's drift.
+CLOCK_WINDOW_MS = 2000
+CLOCK_WINDOWS = 30
+# Upper bounds of the jitter histogram buckets, 0.25 ms to ~1 s in half-octaves.
+JITTER_BOUNDS_MS = tuple(0.25 * 2 ** (step / 2) for step in range(25))
+# Histogram counts are halved this often so quantiles follow recent traffic.
+JITTER_DECAY_SAMPLES = 1024
+# A node-side gap this many times the usual send interval is a firmware stall.
+STALL_FACTOR = 4.0
+MIN_STALL_MS = 100.0
+
+# world_state link fields of a player that has not sent telemetry.
+CLOCK_FIELDS_EMPTY: dict[str, Any] = {
+    "clock_offset_ms": None,
+    "clock_drift_ppm": None,
+    "latency_excess_ms": None,
+    "jitter_p50_ms": None,
+    "jitter_p95_ms": None,
+    "jitter_p99_ms": None,
+    "stalls": 0,
+}
+
+
+class NodeClock:
+    """Per-player node clock offset, drift and inter-arrival jitter, updated per packet.
+
+    `excess_ms` of the latest packet is how much longer it took than the
+    fastest path seen, so a sample's age at time t is
+    `t - receive time + excess_ms` relative to that path. Jitter is the
+    change in transit time between consecutive packets, kept in a decaying
+    log-spaced histogram for streaming quantiles. Node-side gaps much longer
+    than the usual send interval are counted as stalls rather than jitter.
+    """
+
+    __slots__ = (
+        "_window_start",
+        "_window_min",
+        "_window_min_node",
+        "_min_node",
+        "_min_offset",
+        "_windows",
+        "_intercept",
+        "_slope",
+        "_ref_node",
+        "_prev_node",
+        "_prev_recv",
+        "_interval_ms",
+        "_hist",
+        "_hist_samples",
+        "excess_ms",
+        "stalls",
+        "samples",
+    )
+
+    def __init__(self) -> None:
+        self._min_node = array("d", bytes(8 * CLOCK_WINDOWS))
+        self._min_offset = array("d", bytes(8 * CLOCK_WINDOWS))
+        self._hist = array("d", bytes(8 * (len(JITTER_BOUNDS_MS) + 1)))
+        self._hist_samples = 0
+        self.stalls = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._window_start: int | None = None
+        self._window_min = math.inf
+        self._window_min_node = 0
+        self._windows = 0
+        self._intercept: float | None = None
+        self._slope = 0.0
+        self._ref_node = 0
+        self._prev_node: int | None = None
+        self._prev_recv = 0
+        self._interval_ms = 0.0
+        self.excess_ms = 0.0
+        self.samples = 0
+
+    def offset_at(self, node_ms: float) -> float | None:
+        """Estimated server time minus node time at `node_ms`, along the fastest path."""
+        if self._intercept is None:
+            return None if self._window_min == math.inf else self._window_min
+        return self._intercept + self._slope * (node_ms - self._ref_node)
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self) + sum(sys.getsizeof(buf) for buf in (self._min_node, self._min_offset, self._hist))
+
+    def observe(self, recv_ms: int, node_ms: int) -> None:
+        prev_node = self._prev_node
+        if prev_node is not None and node_ms < prev_node:
+            self.reset()  # node restarted
+            prev_node = None
+        offset = recv_ms - node_ms
+        self.samples += 1
+
+        if self._window_start is None:
+            self._window_start = node_ms
+        elif node_ms - self._window_start >= CLOCK_WINDOW_MS:
+            self._close_window()
+            self._window_start = node_ms
+        if offset < self._window_min:
+            self._window_min = offset
+            self._window_min_node = node_ms
+
+        estimate = self.offset_at(node_ms)
+        self.excess_ms = max(0.0, offset - estimate) if estimate is not None else 0.0
+
+        if prev_node is not None:
+            node_dt = node_ms - prev_node
+            interval = self._interval_ms
+            if interval > 0.0 and node_dt > max(MIN_STALL_MS, STALL_FACTOR * interval):
+                self.stalls += 1
+            else:
+                jitter = abs((recv_ms - self._prev_recv) - node_dt)
+                hist = self._hist
+                hist[bisect_left(JITTER_BOUNDS_MS, jitter)] += 1.0
+                self._hist_samples += 1
+                if self._hist_samples >= JITTER_DECAY_SAMPLES:
+                    for index in range(len(hist)):
+                        hist[index] *= 0.5
+                    self._hist_samples = 0
+                self._interval_ms = node_dt if interval <= 0.0 else interval + (node_dt - interval) * 0.05
+        self._prev_node = node_ms
+        self._prev_recv = recv_ms
+
+    def _close_window(self) -> None:
+        slot = self._windows % CLOCK_WINDOWS
+        self._min_node[slot] = self._window_min_node
+        self._min_offset[slot] = self._window_min
+        self._windows += 1
+        self._window_min = math.inf
+        self._fit()
+
+    def _fit(self) -> None:
+        count = min(self._windows, CLOCK_WINDOWS)
+        xs, ys = self._min_node, self._min_offset
+        ref = xs[(self._windows - 1) % CLOCK_WINDOWS]
+        mean_x = sum(xs[index] - ref for index in range(count)) / count
+        mean_y = sum(ys[index] for index in range(count)) / count
+        var = sum((xs[index] - ref - mean_x) ** 2 for index in range(count))
+        slope = 0.0
+        if var > 0.0:
+            slope = sum((xs[index] - ref - mean_x) * (ys[index] - mean_y) for index in range(count)) / var
+        self._ref_node = int(ref)
+        self._slope = slope
+        self._intercept = mean_y - slope * mean_x
+        # The fit runs through the minima; shift it down onto their lower envelope.
+        self._intercept -= max(
+            0.0,
+            max(self._intercept + slope * (xs[index] - ref) - ys[index] for index in range(count)),
+        )
+
+    @property
+    def last_node_ms(self) -> int | None:
+        return self._prev_node
+
+    @property
+    def drift_ppm(self) -> float:
+        return self._slope * 1e6
+
+    def jitter_quantile(self, q: float) -> float | None:
+        hist = self._hist
+        total = sum(hist)
+        if total <= 0.0:
+            return None
+        target = q * total
+        cumulative = 0.0
+        for index, count in enumerate(hist):
+            cumulative += count
+            if cumulative >= target:
+                upper = JITTER_BOUNDS_MS[index] if index < len(JITTER_BOUNDS_MS) else JITTER_BOUNDS_MS[-1] * 2
+                lower = JITTER_BOUNDS_MS[index - 1] if index > 0 else 0.0
+                within = (target - (cumulative - count)) / count if count > 0 else 1.0
+                return lower + (upper - lower) * within
+        return JITTER_BOUNDS_MS[-1]
+
+    def to_dict(self) -> dict[str, Any]:
+        offset = None if self._prev_node is None else self.offset_at(self._prev_node)
+        p50, p95, p99 = (self.jitter_quantile(q) for q in (0.5, 0.95, 0.99))
+        return {
+            "clock_offset_ms": None if offset is None else round(offset, 1),
+            "clock_drift_ppm": round(self.drift_ppm, 1),
+            "latency_excess_ms": round(self.excess_ms, 1),
+            "jitter_p50_ms": None if p50 is None else round(p50, 2),
+            "jitter_p95_ms": None if p95 is None else round(p95, 2),
+            "jitter_p99_ms": None if p99 is None else round(p99, 2),
+            "stalls": self.stalls,
+        }
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
+import json
+from typing import Any
+
+from .packet import MAX_PLAYER_ID
+from .zones import normalize_zones
 
 
 @dataclass
 class CoordinatorConfig:
     arena_width_m: float = 50.0
     arena_height_m: float = 30.0
+    # Geodetic position of arena (0, 0) and the angle of the arena +x axis
+    # counter-clockwise from east. GPS fixes are ignored while no origin is set.
+    arena_origin_lat_deg: float | None = None
+    arena_origin_lon_deg: float | None = None
+    arena_origin_alt_m: float = 0.0
+    arena_rotation_deg: float = 0.0
 
     tick_hz: float = 20.0
     ws_hz: float = 10.0
@@ -16,9 +27,37 @@ class CoordinatorConfig:
     cone_half_angle_deg: float = 6.0
     quality_threshold: int = 35
     pos_quality_threshold: int = 50
+    # GPS fixes at or above this quality position a player when it has no usable UWB fix.
+    gps_quality_threshold: int = 50
     offline_timeout_ms: int = 2000
+    # Real players offline this long are dropped together with their history and
+    # sim state; 0 keeps them forever. Telemetry for new ids is ignored at max_players.
+    player_ttl_ms: int = 600_000
+    max_players: int = 4096
 
     alert_hold_ms: int = 250
+    # Polygon zones in arena metres where warnings are suppressed or capped at
+    # zone_downgrade_intensity; see server/zones.py for the format.
+    zones: list[dict[str, Any]] = field(default_factory=list)
+    zone_downgrade_intensity: int = 80
+    # Feed alert logic from per-player Kalman filters predicted to the tick time
+    # instead of the last raw sample; predictions stop this long after a measurement.
+    alert_filter: bool = False
+    alert_filter_max_predict_ms: int = 250
+    # Command each node's telemetry rate from how close it is to someone's cone:
+    # engaged players get rate_max_hz, players near others rate_near_hz, isolated
+    # ones rate_min_hz. Rates only drop after rate_hold_ms at the lower tier.
+    rate_control: bool = False
+    rate_max_hz: float = 20.0
+    rate_near_hz: float = 10.0
+    rate_min_hz: float = 4.0
+    rate_hold_ms: int = 3000
+    # Angle beyond the cone edge within which a player still counts as engaged.
+    rate_engage_margin_deg: float = 30.0
+
+    # Thresholds for server-side events.
+    seq_drop_burst: int = 10
+    low_battery_mv: int = 3400
 
     use_sim_positions: bool = True
     sim_players_emulate_real: bool = False
@@ -29,26 +68,116 @@ class CoordinatorConfig:
 
     default_player_ids: tuple[int, ...] = (1, 2)
     trail_seconds: float = 8.0
+    # Telemetry samples kept per player for interpolation and /api/players/{id}/history.
+    history_samples: int = 1200
+
+    slow_tick_log: bool = False
+
+    recordings_dir: str = "/tmp/aar"
+    recording_segment_mb: float = 64.0
+    recording_segment_s: float = 300.0
+    recording_keyframe_s: float = 10.0
+    # Always-on ring of recent raw datagrams; 0 disables it.
+    blackbox_mb: float = 16.0
+    # Decoded recording blocks shared by /ws/aar playback clients, bounded by recorded size.
+    aar_cache_mb: float = 64.0
+
+    def __post_init__(self) -> None:
+        # Bumped on every effective change so clients can skip unchanged configs.
+        self._version = 1
+        self.zones = normalize_zones(self.zones)
+        self._cached_dict: dict | None = None
+        self._cached_json: str | None = None
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        if self._cached_dict is None:
+            self._cached_dict = asdict(self)
+        return dict(self._cached_dict)
+
+    def to_json(self) -> str:
+        if self._cached_json is None:
+            self._cached_json = json.dumps(self.to_dict(), separators=(",", ":"))
+        return self._cached_json
+
+    def _set(self, name: str, value: Any) -> bool:
+        if getattr(self, name) == value:
+            return False
+        setattr(self, name, value)
+        return True
 
-    def apply_updates(self, updates: dict) -> None:
+    def apply_updates(self, updates: dict) -> bool:
+        """Clamp and apply known keys; returns whether anything changed.
+
+        Every value is parsed before any is assigned, so an update that raises
+        ValueError or TypeError leaves the config, its version and caches untouched.
+        """
+        parsed: dict[str, Any] = {}
         if "max_range_m" in updates:
-            self.max_range_m = max(1.0, min(float(updates["max_range_m"]), 200.0))
+            parsed["max_range_m"] = max(1.0, min(float(updates["max_range_m"]), 200.0))
         if "cone_half_angle_deg" in updates:
-            self.cone_half_angle_deg = max(1.0, min(float(updates["cone_half_angle_deg"]), 90.0))
+            parsed["cone_half_angle_deg"] = max(1.0, min(float(updates["cone_half_angle_deg"]), 90.0))
         if "quality_threshold" in updates:
-            self.quality_threshold = max(0, min(int(updates["quality_threshold"]), 100))
+            parsed["quality_threshold"] = max(0, min(int(updates["quality_threshold"]), 100))
         if "sim_speed_mps" in updates:
-            self.sim_speed_mps = max(0.0, min(float(updates["sim_speed_mps"]), 5.0))
+            parsed["sim_speed_mps"] = max(0.0, min(float(updates["sim_speed_mps"]), 5.0))
         if "use_sim_positions" in updates:
-            self.use_sim_positions = bool(updates["use_sim_positions"])
+            parsed["use_sim_positions"] = bool(updates["use_sim_positions"])
         if "sim_players_emulate_real" in updates:
-            self.sim_players_emulate_real = bool(updates["sim_players_emulate_real"])
+            parsed["sim_players_emulate_real"] = bool(updates["sim_players_emulate_real"])
         if "arena_width_m" in updates:
-            self.arena_width_m = max(5.0, min(float(updates["arena_width_m"]), 1000.0))
+            parsed["arena_width_m"] = max(5.0, min(float(updates["arena_width_m"]), 1000.0))
         if "arena_height_m" in updates:
-            self.arena_height_m = max(5.0, min(float(updates["arena_height_m"]), 1000.0))
+            parsed["arena_height_m"] = max(5.0, min(float(updates["arena_height_m"]), 1000.0))
+        if "arena_origin_lat_deg" in updates:
+            value = updates["arena_origin_lat_deg"]
+            lat = None if value is None else max(-90.0, min(float(value), 90.0))
+            parsed["arena_origin_lat_deg"] = lat
+        if "arena_origin_lon_deg" in updates:
+            value = updates["arena_origin_lon_deg"]
+            lon = None if value is None else max(-180.0, min(float(value), 180.0))
+            parsed["arena_origin_lon_deg"] = lon
+        if "arena_origin_alt_m" in updates:
+            parsed["arena_origin_alt_m"] = max(-500.0, min(float(updates["arena_origin_alt_m"]), 9000.0))
+        if "arena_rotation_deg" in updates:
+            parsed["arena_rotation_deg"] = float(updates["arena_rotation_deg"]) % 360.0
+        if "gps_quality_threshold" in updates:
+            parsed["gps_quality_threshold"] = max(0, min(int(updates["gps_quality_threshold"]), 100))
+        if "offline_timeout_ms" in updates:
+            parsed["offline_timeout_ms"] = max(100, min(int(updates["offline_timeout_ms"]), 600_000))
+        if "player_ttl_ms" in updates:
+            parsed["player_ttl_ms"] = max(0, min(int(updates["player_ttl_ms"]), 86_400_000))
+        if "max_players" in updates:
+            parsed["max_players"] = max(1, min(int(updates["max_players"]), MAX_PLAYER_ID))
         if "sim_paused" in updates:
-            self.sim_paused = bool(updates["sim_paused"])
+            parsed["sim_paused"] = bool(updates["sim_paused"])
+        if "zones" in updates:
+            parsed["zones"] = normalize_zones(updates["zones"])
+        if "zone_downgrade_intensity" in updates:
+            parsed["zone_downgrade_intensity"] = max(0, min(int(updates["zone_downgrade_intensity"]), 255))
+        if "alert_filter" in updates:
+            parsed["alert_filter"] = bool(updates["alert_filter"])
+        if "rate_control" in updates:
+            parsed["rate_control"] = bool(updates["rate_control"])
+        for name in ("rate_max_hz", "rate_near_hz", "rate_min_hz"):
+            if name in updates:
+                parsed[name] = max(1.0, min(float(updates[name]), 100.0))
+        if "rate_hold_ms" in updates:
+            parsed["rate_hold_ms"] = max(0, min(int(updates["rate_hold_ms"]), 60_000))
+        if "rate_engage_margin_deg" in updates:
+            margin_deg = max(0.0, min(float(updates["rate_engage_margin_deg"]), 180.0))
+            parsed["rate_engage_margin_deg"] = margin_deg
+        if "slow_tick_log" in updates:
+            parsed["slow_tick_log"] = bool(updates["slow_tick_log"])
+
+        changed = False
+        for name, value in parsed.items():
+            changed |= self._set(name, value)
+        if changed:
+            self._version += 1
+            self._cached_dict = None
+            self._cached_json = None
+        return changed
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import heapq
+import sys
+from typing import Hashable
+
+
+class DeadlineQueue:
+    """Deadlines keyed by id, in a min-heap with lazy re-arming.
+
+    arm() only records the new deadline when it is not earlier than the one
+    already queued, so refreshing a timeout on every packet is a dict store.
+    When a queued entry comes due with a later deadline recorded it is pushed
+    again, once per timeout period at most. expire() therefore touches only
+    entries that are due, not every key.
+    """
+
+    __slots__ = ("_heap", "_due", "_queued")
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[int, Hashable]] = []
+        # Current deadline per key.
+        self._due: dict[Hashable, int] = {}
+        # Earliest heap entry per key; heap entries that do not match are stale.
+        self._queued: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    @property
+    def nbytes(self) -> int:
+        """Container sizes plus one (deadline, key) tuple per heap entry, stale ones included."""
+        heap = self._heap
+        entry = sys.getsizeof(heap[0]) if heap else 0
+        return sys.getsizeof(heap) + len(heap) * entry + sys.getsizeof(self._due) + sys.getsizeof(self._queued)
+
+    def arm(self, key: Hashable, deadline_ms: int) -> None:
+        self._due[key] = deadline_ms
+        queued = self._queued.get(key)
+        if queued is None or deadline_ms < queued:
+            self._queued[key] = deadline_ms
+            heapq.heappush(self._heap, (deadline_ms, key))
+
+    def cancel(self, key: Hashable) -> None:
+        self._due.pop(key, None)
+
+    def deadline(self, key: Hashable) -> int | None:
+        return self._due.get(key)
+
+    def expire(self, now_ms: int) -> list[Hashable]:
+        """Keys whose deadline is at or before `now_ms`, in deadline order; they are disarmed."""
+        heap, due, queued = self._heap, self._due, self._queued
+        expired: list[Hashable] = []
+        while heap and heap[0][0] <= now_ms:
+            deadline_ms, key = heapq.heappop(heap)
+            if queued.get(key) != deadline_ms:
+                continue
+            del queued[key]
+            current = due.get(key)
+            if current is None:
+                continue
+            if current > now_ms:
+                queued[key] = current
+                heapq.heappush(heap, (current, key))
+                continue
+            del due[key]
+            expired.append(key)
+        return expired
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+import json
+import sys
+import time
+from typing import Any, Callable
+
+
+EVENT_ALERT_ON = "alert_on"
+EVENT_ALERT_OFF = "alert_off"
+EVENT_PLAYER_ONLINE = "player_online"
+EVENT_PLAYER_OFFLINE = "player_offline"
+EVENT_PLAYER_EVICTED = "player_evicted"
+EVENT_SEQ_DROP_BURST = "seq_drop_burst"
+EVENT_LOW_BATTERY = "low_battery"
+EVENT_CONFIG_CHANGED = "config_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class ServerEvent:
+    id: int
+    ts_ms: int
+    level: str
+    event: str
+    player_id: int | None
+    reason: str | None
+    details: Any
+    # Serialized once at emit time; frames and /api/events splice it in.
+    text: str
+
+
+class EventLog:
+    """Bounded ring of typed server events with monotonically increasing ids.
+
+    `ts_ms` is wall-clock time so clients can display it directly. Listeners
+    are called synchronously for every emitted event.
+    """
+
+    def __init__(self, capacity: int = 2048, clock: Callable[[], float] = time.time) -> None:
+        self._events: deque[ServerEvent] = deque(maxlen=capacity)
+        self._clock = clock
+        self.last_id = 0
+        self.listeners: list[Callable[[ServerEvent], None]] = []
+
+    @property
+    def first_id(self) -> int:
+        """Oldest id still held; last_id + 1 when the ring is empty."""
+        return self._events[0].id if self._events else self.last_id + 1
+
+    def memory_stats(self) -> dict[str, int]:
+        """Events held and their size in bytes: the event records and their serialized text."""
+        events = self._events
+        nbytes = sys.getsizeof(events) + sum(sys.getsizeof(item) + sys.getsizeof(item.text) for item in events)
+        return {"count": len(events), "bytes": nbytes}
+
+    def emit(
+        self,
+        event: str,
+        level: str = "info",
+        player_id: int | None = None,
+        reason: str | None = None,
+        details: Any = None,
+    ) -> ServerEvent:
+        self.last_id += 1
+        ts_ms = int(self._clock() * 1000)
+        payload = {"id": self.last_id, "ts_ms": ts_ms, "level": level, "event": event}
+        if player_id is not None:
+            payload["player_id"] = player_id
+        if reason is not None:
+            payload["reason"] = reason
+        if details is not None:
+            payload["details"] = details
+        item = ServerEvent(
+            id=self.last_id,
+            ts_ms=ts_ms,
+            level=level,
+            event=event,
+            player_id=player_id,
+            reason=reason,
+            details=details,
+            text=json.dumps(payload, separators=(",", ":")),
+        )
+        self._events.append(item)
+        for listener in self.listeners:
+            listener(item)
+        return item
+
+    def after(self, event_id: int, limit: int | None = None) -> list[ServerEvent]:
+        """Events with id > event_id, oldest first; ids are contiguous so this is a slice."""
+        start = max(0, event_id + 1 - self.first_id)
+        stop = None if limit is None else start + max(0, limit)
+        return list(islice(self._events, start, stop))
+
+    def json_after(self, event_id: int, limit: int | None = None) -> str:
+        return "[" + ",".join(item.text for item in self.after(event_id, limit)) + "]"
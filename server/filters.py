@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+
+from .slots import PlayerSlots
+
+
+# Constant-velocity models driven by white-noise acceleration. Position noise
+# is the same on both axes, so x and y share one 2x2 covariance per player.
+POS_ACCEL_NOISE_MPS2 = 1.5
+POS_MEAS_NOISE_M = 0.35
+YAW_ACCEL_NOISE_DPS2 = 150.0
+YAW_MEAS_NOISE_DEG = 2.5
+# A track silent for longer than this is restarted from its next measurement.
+RESET_AFTER_MS = 2000
+
+# State columns.
+X, VX, Y, VY, YAW, YAW_RATE = range(6)
+
+
+def _wrap_deg(angle: float) -> float:
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def _predict_cov(cov: list[float], dt: float, q: float) -> tuple[float, float, float]:
+    """P = F P F^T + Q for F = [[1, dt], [0, 1]] on a symmetric (p00, p01, p11) covariance."""
+    p00, p01, p11 = cov
+    return (
+        p00 + dt * (2.0 * p01 + dt * p11) + q * dt**3 / 3.0,
+        p01 + dt * p11 + q * dt**2 / 2.0,
+        p11 + q * dt,
+    )
+
+
+def _gain(cov: tuple[float, float, float], r: float) -> tuple[float, float, tuple[float, float, float]]:
+    """Kalman gain for a position-only measurement and the updated covariance."""
+    p00, p01, p11 = cov
+    s = p00 + r
+    k0, k1 = p00 / s, p01 / s
+    return k0, k1, ((1.0 - k0) * p00, (1.0 - k0) * p01, p11 - k1 * p01)
+
+
+_BANK_ARRAYS = ("state", "pos_cov", "yaw_cov", "pos_t_ms", "yaw_t_ms", "has_pos")
+
+
+class KalmanBank:
+    """Per-player constant-velocity position and yaw-rate filters in dense NumPy arrays.
+
+    update() folds one measurement into one player's row as telemetry
+    arrives. predict() extrapolates every row to a common time in one
+    vectorized pass, which is what the alert tick consumes.
+    """
+
+    def __init__(self, capacity: int = 32) -> None:
+        self.slots = PlayerSlots()
+        self.state = np.zeros((capacity, 6))
+        self.pos_cov = np.zeros((capacity, 3))
+        self.yaw_cov = np.zeros((capacity, 3))
+        self.pos_t_ms = np.zeros(capacity)
+        self.yaw_t_ms = np.zeros(capacity)
+        self.has_pos = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in _BANK_ARRAYS)
+
+    def _row(self, player_id: int) -> int:
+        row = self.slots.index(player_id)
+        if row is not None:
+            return row
+        row = self.slots.add(player_id)
+        if row == len(self.state):
+            for name in _BANK_ARRAYS:
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.state[row] = 0.0
+        self.has_pos[row] = False
+        self.yaw_t_ms[row] = -math.inf
+        self.pos_t_ms[row] = -math.inf
+        return row
+
+    def remove(self, player_id: int) -> None:
+        """Drop a player's row, moving the last row into its place to keep the arrays dense."""
+        removed = self.slots.remove(player_id)
+        if removed is None or removed[1] is None:
+            return
+        row, last = removed[0], len(self.slots)
+        for array in (self.state, self.pos_cov, self.yaw_cov, self.pos_t_ms, self.yaw_t_ms, self.has_pos):
+            array[row] = array[last]
+
+    def update(self, player_id: int, now_ms: float, yaw_deg: float, position: tuple[float, float] | None) -> None:
+        row = self._row(player_id)
+        state = self.state[row].tolist()
+
+        # Latency-compensated sample times can arrive slightly out of order.
+        dt = max(0.0, (now_ms - self.yaw_t_ms[row]) / 1000.0)
+        if dt * 1000.0 > RESET_AFTER_MS:
+            state[YAW], state[YAW_RATE] = yaw_deg % 360.0, 0.0
+            self.yaw_cov[row] = (YAW_MEAS_NOISE_DEG**2, 0.0, 90.0**2)
+        else:
+            cov = _predict_cov(self.yaw_cov[row].tolist(), dt, YAW_ACCEL_NOISE_DPS2**2)
+            predicted = state[YAW] + state[YAW_RATE] * dt
+            k0, k1, cov = _gain(cov, YAW_MEAS_NOISE_DEG**2)
+            innovation = _wrap_deg(yaw_deg - predicted)
+            state[YAW] = (predicted + k0 * innovation) % 360.0
+            state[YAW_RATE] += k1 * innovation
+            self.yaw_cov[row] = cov
+        self.yaw_t_ms[row] = now_ms
+
+        if position is not None:
+            dt = max(0.0, (now_ms - self.pos_t_ms[row]) / 1000.0)
+            if not self.has_pos[row] or dt * 1000.0 > RESET_AFTER_MS:
+                state[X], state[VX], state[Y], state[VY] = position[0], 0.0, position[1], 0.0
+                self.pos_cov[row] = (POS_MEAS_NOISE_M**2, 0.0, 2.0**2)
+                self.has_pos[row] = True
+            else:
+                cov = _predict_cov(self.pos_cov[row].tolist(), dt, POS_ACCEL_NOISE_MPS2**2)
+                k0, k1, cov = _gain(cov, POS_MEAS_NOISE_M**2)
+                for pos, vel, measured in ((X, VX, position[0]), (Y, VY, position[1])):
+                    predicted = state[pos] + state[vel] * dt
+                    innovation = measured - predicted
+                    state[pos] = predicted + k0 * innovation
+                    state[vel] += k1 * innovation
+                self.pos_cov[row] = cov
+            self.pos_t_ms[row] = now_ms
+        self.state[row] = state
+
+    def predict(self, now_ms: int, max_horizon_ms: int) -> dict[int, tuple[float, float, float, bool]]:
+        """{player_id: (x_m, y_m, yaw_deg, has_position)} extrapolated to `now_ms` for every row.
+
+        Extrapolation stops `max_horizon_ms` after a row's last measurement so
+        stale tracks do not drift away.
+        """
+        n = len(self.slots)
+        if n == 0:
+            return {}
+        state = self.state[:n]
+        horizon_s = max_horizon_ms / 1000.0
+        pos_dt = np.clip((now_ms - self.pos_t_ms[:n]) / 1000.0, 0.0, horizon_s)
+        yaw_dt = np.clip((now_ms - self.yaw_t_ms[:n]) / 1000.0, 0.0, horizon_s)
+        x = state[:, X] + state[:, VX] * pos_dt
+        y = state[:, Y] + state[:, VY] * pos_dt
+        yaw = np.mod(state[:, YAW] + state[:, YAW_RATE] * yaw_dt, 360.0)
+        return dict(zip(self.slots.ids, zip(x.tolist(), y.tolist(), yaw.tolist(), self.has_pos[:n].tolist())))
+
+    def diagnostics(self, now_ms: int, max_horizon_ms: int) -> dict[int, dict[str, Any]]:
+        """Filtered values per player at `now_ms`, with velocities and 1-sigma uncertainties."""
+        out: dict[int, dict[str, Any]] = {}
+        for player_id, (x_m, y_m, yaw_deg, has_pos) in self.predict(now_ms, max_horizon_ms).items():
+            row = self.slots.index(player_id)
+            state = self.state[row].tolist()
+            pos_var, yaw_var = float(self.pos_cov[row, 0]), float(self.yaw_cov[row, 0])
+            out[player_id] = {
+                "x_m": round(x_m, 3) if has_pos else None,
+                "y_m": round(y_m, 3) if has_pos else None,
+                "vx_mps": round(state[VX], 3) if has_pos else None,
+                "vy_mps": round(state[VY], 3) if has_pos else None,
+                "yaw_deg": round(yaw_deg, 2),
+                "yaw_rate_dps": round(state[YAW_RATE], 2),
+                "pos_sigma_m": round(math.sqrt(max(0.0, pos_var)), 3) if has_pos else None,
+                "yaw_sigma_deg": round(math.sqrt(max(0.0, yaw_var)), 2),
+            }
+        return out
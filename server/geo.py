@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+# WGS84 ellipsoid.
+WGS84_A_M = 6378137.0
+WGS84_F = 1.0 / 298.257223563
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+
+
+def geodetic_to_ecef(
+    lat_deg: np.ndarray, lon_deg: np.ndarray, alt_m: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    n = WGS84_A_M / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+    return (
+        (n + alt_m) * cos_lat * np.cos(lon),
+        (n + alt_m) * cos_lat * np.sin(lon),
+        (n * (1.0 - WGS84_E2) + alt_m) * sin_lat,
+    )
+
+
+class EnuProjection:
+    """WGS84 fixes to arena metres through the local tangent plane at the arena origin.
+
+    The origin is the geodetic position of arena (0, 0). `rotation_deg` is
+    the angle of the arena +x axis counter-clockwise from east, so 0 puts +x
+    east and +y north. The origin's ECEF position and the combined ENU and
+    arena rotation are computed once; project() is a vectorized pass over
+    any number of fixes.
+    """
+
+    __slots__ = ("origin", "rotation_deg", "_origin_ecef", "_matrix")
+
+    def __init__(self, lat_deg: float, lon_deg: float, alt_m: float = 0.0, rotation_deg: float = 0.0) -> None:
+        self.origin = (lat_deg, lon_deg, alt_m)
+        self.rotation_deg = rotation_deg
+        self._origin_ecef = np.array(geodetic_to_ecef(np.float64(lat_deg), np.float64(lon_deg), np.float64(alt_m)))
+        lat, lon = math.radians(lat_deg), math.radians(lon_deg)
+        east = np.array([-math.sin(lon), math.cos(lon), 0.0])
+        north = np.array([-math.sin(lat) * math.cos(lon), -math.sin(lat) * math.sin(lon), math.cos(lat)])
+        rot = math.radians(rotation_deg)
+        cos_r, sin_r = math.cos(rot), math.sin(rot)
+        self._matrix = np.stack([cos_r * east + sin_r * north, -sin_r * east + cos_r * north])
+
+    def project(
+        self, lat_deg: np.ndarray, lon_deg: np.ndarray, alt_m: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Arena (x, y) in metres for arrays of fixes."""
+        ecef = np.stack(geodetic_to_ecef(lat_deg, lon_deg, alt_m))
+        xy = self._matrix @ (ecef - self._origin_ecef[:, None])
+        return xy[0], xy[1]
+
+    def project_one(self, lat_deg: float, lon_deg: float, alt_m: float | None = None) -> tuple[float, float]:
+        x, y = self.project(
+            np.array([lat_deg]),
+            np.array([lon_deg]),
+            np.array([self.origin[2] if alt_m is None else alt_m]),
+        )
+        return float(x[0]), float(y[0])
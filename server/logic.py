@@ -69,3 +69,12 @@ def evaluate_targets(
             best_intensity = max(best_intensity, _intensity(d, dyaw, max_range_m, cone_half_rad))
 
     return TargetEval(inside_on=inside_on, inside_off=inside_off, best_intensity=best_intensity)
+
+
+def merge_evals(full: TargetEval, capped: TargetEval, max_capped_intensity: int) -> TargetEval:
+    """Combine evaluations of two target groups, limiting the intensity the second can contribute."""
+    return TargetEval(
+        inside_on=full.inside_on or capped.inside_on,
+        inside_off=full.inside_off or capped.inside_off,
+        best_intensity=max(full.best_intensity, min(capped.best_intensity, max_capped_intensity)),
+    )
@@ -6,20 +6,53 @@ from dataclasses import dataclass
 import json
 import logging
 from pathlib import Path
+import sqlite3
 import time
-from typing import Any
+from typing import Any, Callable
+import uuid
 
 from aiohttp import WSMsgType, web
 
+from .aar import EXPORT_FORMATS, RecordingReader, iter_export_chunks, iter_export_rows
+from .blackbox import BlackBoxRing, write_dump
+from .catalog import CATALOG_NAME, SessionCatalog
 from .config import CoordinatorConfig
-from .logic import evaluate_targets
-from .packet import AlertPacket, PacketError, decode_telemetry, encode_alert
-from .state import PlayerRegistry
+from .events import EVENT_CONFIG_CHANGED, EventLog, ServerEvent
+from .logic import TargetEval, evaluate_targets, merge_evals
+from .metrics import LoopStats, RuntimeMetrics
+from .packet import (
+    ALERT_VERSION,
+    ALERT_VERSION_V3,
+    MSG_BULK,
+    TELEMETRY_VERSION_V3,
+    AlertPacket,
+    PacketError,
+    RateControlPacket,
+    decode_bulk,
+    decode_telemetry,
+    encode_alert,
+    encode_rate_control,
+)
+from .ratecontrol import RATE_VALID_MS, RateController
+from .recfile import ANALYSIS_NAME, MANIFEST_NAME, REC_ALERT, REC_CONFIG, REC_EVENT, REC_TELEMETRY
+from .playback import AarPlayback, BlockCache
+from .recorder import SessionRecorder
+from .series import SERIES_RESOLUTIONS
+from .replay import ReplayEngine, VirtualClock, parse_speed
+from .snapshot import SnapshotStore, WorldSnapshot
+from .static_assets import VITE_ASSETS_DIR, StaticAsset, StaticAssetCache
+from .state import DIRTY_POSITION, HISTORY_CLOCKS, PlayerRegistry
 from .world_sim import WorldSimulator
+from .zones import ZONE_DOWNGRADE, ZONE_SUPPRESS, ZoneIndex
 
 
 LOG = logging.getLogger("fdw.server")
 SERVER_VERSION = "1.1.0"
+LONG_POLL_DEFAULT_S = 25.0
+LONG_POLL_MAX_S = 60.0
+EVENTS_PAGE_DEFAULT = 500
+# Inner packet errors listed in a bulk ingest response; the rest are only counted.
+BULK_ERRORS_REPORTED = 16
 
 
 @dataclass(slots=True)
@@ -47,9 +80,15 @@ class TelemetryProtocol(asyncio.DatagramProtocol):
         LOG.warning("UDP error: %s", exc)
 
 
+def monotonic_ms() -> int:
+    return int(time.monotonic() * 1000)
+
+
 class MatchCoordinator:
-    def __init__(self, config: CoordinatorConfig) -> None:
+    def __init__(self, config: CoordinatorConfig, clock: Callable[[], int] = monotonic_ms) -> None:
         self.config = config
+        # Replays drive an isolated coordinator from a virtual clock.
+        self._clock = clock
         self.world = WorldSimulator(
             arena_width_m=config.arena_width_m,
             arena_height_m=config.arena_height_m,
@@ -59,16 +98,42 @@ class MatchCoordinator:
             steering_noise=config.sim_noise,
             trail_seconds=config.trail_seconds,
         )
-        self.state = PlayerRegistry(config=config, world=self.world)
+        self.events = EventLog()
+        self.events.listeners.append(self._record_event)
+        self.state = PlayerRegistry(config=config, world=self.world, events=self.events)
+        self.zones = ZoneIndex(config.zones)
+        self.rate_control = RateController()
         self.udp_transport: asyncio.DatagramTransport | None = None
         self.ws_clients: set[web.WebSocketResponse] = set()
         self.tasks: list[asyncio.Task] = []
         self.recording = RecordingState()
+        self.recorder: SessionRecorder | None = None
+        self.catalog = SessionCatalog(Path(config.recordings_dir) / CATALOG_NAME)
+        self.replay: ReplayEngine | None = None
+        self.aar_blocks = BlockCache(int(config.aar_cache_mb * 1024 * 1024))
+        self.aar_clients: set[web.WebSocketResponse] = set()
+        self.blackbox = BlackBoxRing(int(config.blackbox_mb * 1024 * 1024)) if config.blackbox_mb > 0 else None
         self.server_started_ms = self.now_ms()
-
-    @staticmethod
-    def now_ms() -> int:
-        return int(time.monotonic() * 1000)
+        # Distinguishes ETags issued by different server runs.
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.snapshots = SnapshotStore(self.instance_id)
+        self.metrics = RuntimeMetrics()
+        self.legacy_assets: StaticAssetCache | None = None
+        self.app_assets: StaticAssetCache | None = None
+        self._config_message: tuple[int, str] | None = None
+        self._sent_config_version = 0
+        # Last event id carried by a published snapshot; each frame carries the events after it.
+        self._snapshot_event_id = 0
+        # What the latest snapshot was built from, and a counter bumped whenever that changes.
+        self._snapshot_key: tuple[Any, ...] | None = None
+        self._snapshot_content_version = 0
+
+    def now_ms(self) -> int:
+        return self._clock()
+
+    def _record_event(self, event: ServerEvent) -> None:
+        if self.recorder is not None:
+            self.recorder.record(REC_EVENT, event.player_id or 0, event.text.encode("utf-8"))
 
     def recording_payload(self) -> dict[str, Any]:
         return {
@@ -85,54 +150,142 @@ class MatchCoordinator:
                 "recording": self.recording_payload(),
             }
 
-        session_id = f"REC-{now_ms}"
-        output_dir = f"/tmp/aar/{session_id}"
+        session_id = f"REC-{int(time.time() * 1000)}"
+        output_dir = Path(self.config.recordings_dir) / session_id
+        self.recorder = SessionRecorder(
+            output_dir=output_dir,
+            session_id=session_id,
+            segment_max_bytes=int(self.config.recording_segment_mb * 1024 * 1024),
+            segment_max_s=self.config.recording_segment_s,
+            keyframe_interval_s=self.config.recording_keyframe_s,
+            catalog=self.catalog,
+        )
+        self.recorder.record(REC_CONFIG, 0, self.config_message_json().encode("utf-8"))
         self.recording.active = True
         self.recording.session_id = session_id
         self.recording.start_ts_ms = now_ms
-        self.recording.output_dir = output_dir
+        self.recording.output_dir = str(output_dir)
+        LOG.info("Recording %s started in %s", session_id, output_dir)
         return {
             "ok": True,
             "recording": self.recording_payload(),
         }
 
-    def stop_recording(self) -> dict[str, Any]:
-        if not self.recording.active:
+    async def stop_recording(self) -> dict[str, Any]:
+        recorder = self.recorder
+        if not self.recording.active or recorder is None:
             return {
                 "ok": True,
                 "recording": self.recording_payload(),
                 "files": [],
             }
 
-        output_dir = self.recording.output_dir
-        session_id = self.recording.session_id
-        files = []
-        if output_dir is not None:
-            files = [
-                f"{output_dir}/world_state.jsonl",
-                f"{output_dir}/events.jsonl",
-            ]
-
+        # Detach first so the ingest path stops recording before the final flush.
+        self.recorder = None
         self.recording.active = False
         self.recording.session_id = None
         self.recording.start_ts_ms = None
         self.recording.output_dir = None
+
+        loop = asyncio.get_running_loop()
+        manifest = await loop.run_in_executor(None, recorder.close)
+        files = recorder.files()
+        files.append(str(recorder.output_dir / MANIFEST_NAME))
+        LOG.info(
+            "Recording %s stopped: %s records, %s dropped",
+            recorder.session_id,
+            manifest.get("records"),
+            manifest.get("dropped_records"),
+        )
         return {
             "ok": True,
             "recording": self.recording_payload(),
             "files": files,
-            "session_id": session_id,
+            "session_id": recorder.session_id,
+            "summary": manifest,
         }
 
-    def world_state_payload(self, now_ms: int) -> dict[str, Any]:
-        message = self.state.world_state_message(now_ms)
-        message["schema_version"] = 1
-        message["server_time_ms"] = now_ms
-        message["obstacles"] = []
-        message["events"] = []
-        message["recording"] = self.recording_payload()
-        message["server_version"] = SERVER_VERSION
-        return message
+    def publish_snapshot(self, now_ms: int | None = None) -> WorldSnapshot:
+        """Build the next world_state snapshot from the registry's cached player fragments.
+
+        Every call publishes a new generation, since the frame's clock and age
+        fields move on each tick. The world ETag only changes with what the
+        frame was built from (fragments, player set, events, config, arena and
+        recording), so conditional GETs on an idle world still answer 304.
+        """
+        if now_ms is None:
+            now_ms = self.now_ms()
+        self.state.refresh_fragments()
+        recording = self.recording_payload()
+        key = (
+            self.state.fragments_version,
+            self.events.last_id,
+            self.config.version,
+            self.world.arena_width_m,
+            self.world.arena_height_m,
+            tuple(recording.values()),
+        )
+        if key != self._snapshot_key:
+            self._snapshot_key = key
+            self._snapshot_content_version += 1
+        message = self.state.world_state_envelope(now_ms)
+        message.update(
+            {
+                "schema_version": 1,
+                "server_time_ms": now_ms,
+                "obstacles": [],
+                "recording": recording,
+                "server_version": SERVER_VERSION,
+                "generation": self.snapshots.generation + 1,
+                "last_event_id": self.events.last_id,
+            }
+        )
+        head = json.dumps(message, separators=(",", ":"))
+        events = self.events.json_after(self._snapshot_event_id)
+        self._snapshot_event_id = self.events.last_id
+        fragments = self.state.player_fragments_json(now_ms)
+        by_id = dict(zip(self.state.sorted_player_ids(), fragments))
+        online = sum(1 for player in self.state.players.values() if player.online)
+        text = f'{head[:-1]},"events":{events},"players":[{",".join(fragments)}]}}'
+        return self.snapshots.publish(
+            now_ms, text, online, by_id, self.state.fragment_versions(), self._snapshot_content_version
+        )
+
+    def current_snapshot(self) -> WorldSnapshot:
+        return self.snapshots.latest or self.publish_snapshot()
+
+    def config_message_json(self) -> str:
+        version = self.config.version
+        if self._config_message is None or self._config_message[0] != version:
+            text = f'{{"type":"config","config_version":{version},"config":{self.config.to_json()}}}'
+            self._config_message = (version, text)
+        return self._config_message[1]
+
+    def apply_config_updates(self, updates: dict[str, Any]) -> bool:
+        before = self.config.to_dict()
+        if not self.config.apply_updates(updates):
+            return False
+        after = self.config.to_dict()
+        self.events.emit(
+            EVENT_CONFIG_CHANGED,
+            details={
+                "config_version": self.config.version,
+                "keys": sorted(key for key in updates if key in after and before[key] != after[key]),
+            },
+        )
+        self.world.configure(
+            arena_width_m=self.config.arena_width_m,
+            arena_height_m=self.config.arena_height_m,
+            speed_mps=self.config.sim_speed_mps,
+        )
+        self.world.set_paused(self.config.sim_paused)
+        if before["zones"] != after["zones"]:
+            self.zones = ZoneIndex(self.config.zones)
+        self.state.mark_all_dirty(DIRTY_POSITION)
+        self.metrics.set_slow_tick_log(self.config.slow_tick_log)
+        if self.recorder is not None:
+            self.recorder.record(REC_CONFIG, 0, self.config_message_json().encode("utf-8"))
+        return True
 
     def add_sim_player(self) -> int | None:
         return self.state.add_sim_player()
@@ -142,85 +295,205 @@ class MatchCoordinator:
 
     def handle_udp_packet(self, data: bytes, addr: tuple[str, int]) -> None:
         now_ms = self.now_ms()
+        if len(data) > 3 and data[3] == MSG_BULK:
+            try:
+                self.ingest_bulk(data, addr, now_ms)
+            except PacketError as exc:
+                LOG.warning("Drop bulk frame from %s: %s", addr, exc)
+            return
         try:
             pkt = decode_telemetry(data)
         except PacketError as exc:
             LOG.warning("Drop packet from %s: %s", addr, exc)
             return
 
-        self.state.ingest_telemetry(pkt, addr, now_ms)
-        self.world.ensure_player(pkt.player_id)
+        if self.recorder is not None:
+            self.recorder.record(REC_TELEMETRY, pkt.player_id, data)
+        if self.blackbox is not None:
+            self.blackbox.record(REC_TELEMETRY, pkt.player_id, data)
+        if self.state.ingest_telemetry(pkt, addr, now_ms):
+            self.world.ensure_player(pkt.player_id)
+
+    def ingest_bulk(self, data: bytes, addr: tuple[str, int] | None, now_ms: int) -> dict[str, Any]:
+        """Decode a gateway container frame and apply its telemetry in one registry pass.
+
+        Raises PacketError when the frame itself is malformed. Inner packets
+        that fail their own checks are dropped and reported individually.
+        """
+        frame = decode_bulk(data)
+        packets = []
+        errors: list[dict[str, Any]] = []
+        for index, raw in enumerate(frame.packets):
+            try:
+                pkt = decode_telemetry(raw)
+            except PacketError as exc:
+                errors.append({"index": index, "message": str(exc)})
+                continue
+            packets.append(pkt)
+            if self.recorder is not None:
+                self.recorder.record(REC_TELEMETRY, pkt.player_id, raw)
+            if self.blackbox is not None:
+                self.blackbox.record(REC_TELEMETRY, pkt.player_id, raw)
+        accepted = self.state.ingest_batch(packets, addr, now_ms)
+        if errors:
+            LOG.warning(
+                "Bulk frame from gateway %s: dropped %s of %s packets", frame.gateway_id, len(errors), len(frame.packets)
+            )
+        return {
+            "gateway_id": frame.gateway_id,
+            "packets": len(frame.packets),
+            "accepted": accepted,
+            "rejected": len(packets) - accepted,
+            "invalid": len(errors),
+            "errors": errors[:BULK_ERRORS_REPORTED],
+        }
 
     async def simulation_loop(self) -> None:
         interval = 1.0 / self.config.world_update_hz
+        stats = self._loop_stats("simulation_loop", self.config.world_update_hz)
         last = time.monotonic()
+        configured_version = 0
         while True:
+            stats.begin()
             now = time.monotonic()
             dt = now - last
             last = now
 
-            self.world.configure(
-                arena_width_m=self.config.arena_width_m,
-                arena_height_m=self.config.arena_height_m,
-                speed_mps=self.config.sim_speed_mps,
-                update_hz=self.config.world_update_hz,
-                boundary_behavior=self.config.boundary_behavior,
-                steering_noise=self.config.sim_noise,
-            )
-            self.world.set_paused(self.config.sim_paused)
+            if configured_version != self.config.version:
+                configured_version = self.config.version
+                self.world.configure(
+                    arena_width_m=self.config.arena_width_m,
+                    arena_height_m=self.config.arena_height_m,
+                    speed_mps=self.config.sim_speed_mps,
+                    update_hz=self.config.world_update_hz,
+                    boundary_behavior=self.config.boundary_behavior,
+                    steering_noise=self.config.sim_noise,
+                )
+                self.world.set_paused(self.config.sim_paused)
+                stats.phase("configure")
             self.world.step(dt)
+            stats.phase("world_step")
             self.state.update_online_flags(self.now_ms())
+            stats.phase("online_flags")
+            if self.recorder is not None:
+                self.recorder.poll()
 
-            elapsed = time.monotonic() - now
+            elapsed = stats.end()
             await asyncio.sleep(max(0.0, interval - elapsed))
 
     async def alert_loop(self) -> None:
         interval = 1.0 / self.config.tick_hz
+        stats = self._loop_stats("alert_loop", self.config.tick_hz)
         while True:
-            started = time.monotonic()
-            self._run_alert_tick(self.now_ms())
-            elapsed = time.monotonic() - started
+            stats.begin()
+            self._run_alert_tick(self.now_ms(), stats)
+            elapsed = stats.end()
             await asyncio.sleep(max(0.0, interval - elapsed))
 
-    def _run_alert_tick(self, now_ms: int) -> None:
-        logic_players = self.state.build_logic_players()
+    def _run_alert_tick(self, now_ms: int, stats: LoopStats | None = None) -> int:
+        """Evaluate every player's cone, then release expired alert holds; returns the number of alert transitions."""
+        transitions = 0
+        logic_players = self.state.build_logic_players(now_ms)
+        # Zone bits of players standing in a suppress or downgrade zone.
+        zone_bits: dict[int, int] = {}
+        if len(self.zones):
+            for player_id, logic_player in logic_players.items():
+                if logic_player.position is not None:
+                    bits = self.zones.classify(*logic_player.position)
+                    if bits:
+                        zone_bits[player_id] = bits
+        if stats is not None:
+            stats.phase("build_logic")
 
         for src_id, src in logic_players.items():
             player = self.state.players[src_id]
-            if src.position is None or not src.online or src.quality < self.config.quality_threshold:
-                self.state.update_alert_hysteresis(
+            src_bits = zone_bits.get(src_id, 0)
+            if (
+                src.position is None
+                or not src.online
+                or src.quality < self.config.quality_threshold
+                or src_bits & ZONE_SUPPRESS
+            ):
+                # Out of the cone check; hysteresis only has work if an alert is still on.
+                changed = player.alert_on and self.state.update_alert_hysteresis(
                     player_id=src_id,
                     now_ms=now_ms,
                     inside_on=False,
                     inside_off=False,
                     intensity=0,
                 )
-                self._send_alert(player)
+                transitions += changed
+                self._send_alert(player, changed)
                 continue
 
-            target_positions = [
-                other.position
-                for other_id, other in logic_players.items()
-                if other_id != src_id and other.position is not None
-            ]
-            inside = evaluate_targets(
-                src_pos=src.position,
-                src_yaw_deg=src.yaw_deg,
-                target_positions=target_positions,
-                max_range_m=self.config.max_range_m,
-                cone_half_angle_deg=self.config.cone_half_angle_deg,
-            )
-            self.state.update_alert_hysteresis(
+            if zone_bits:
+                inside = self._evaluate_zoned(src_id, src, logic_players, zone_bits)
+            else:
+                target_positions = [
+                    other.position
+                    for other_id, other in logic_players.items()
+                    if other_id != src_id and other.position is not None
+                ]
+                inside = evaluate_targets(
+                    src_pos=src.position,
+                    src_yaw_deg=src.yaw_deg,
+                    target_positions=target_positions,
+                    max_range_m=self.config.max_range_m,
+                    cone_half_angle_deg=self.config.cone_half_angle_deg,
+                )
+            changed = self.state.update_alert_hysteresis(
                 player_id=src_id,
                 now_ms=now_ms,
                 inside_on=inside.inside_on,
                 inside_off=inside.inside_off,
                 intensity=inside.best_intensity,
             )
-            self._send_alert(player)
+            transitions += changed
+            self._send_alert(player, changed)
+
+        for player_id in self.state.expire_alert_holds(now_ms):
+            transitions += 1
+            self._send_alert(self.state.players[player_id], True)
+
+        if self.config.rate_control:
+            for player_id in self.rate_control.update(now_ms, logic_players, self.config):
+                self._send_rate(player_id, self.rate_control.nodes[player_id].rate_hz)
+        elif self.rate_control.nodes:
+            for player_id in self.rate_control.release():
+                self._send_rate(player_id, 0.0)
+
+        if stats is not None:
+            stats.phase("evaluate_send")
+        return transitions
+
+    def _evaluate_zoned(self, src_id: int, src, logic_players: dict, zone_bits: dict[int, int]) -> TargetEval:
+        """Cone check with targets in suppress zones masked and downgrade zones capped in intensity."""
+        full: list[tuple[float, float]] = []
+        capped: list[tuple[float, float]] = []
+        for other_id, other in logic_players.items():
+            if other_id == src_id or other.position is None:
+                continue
+            bits = zone_bits.get(other_id, 0)
+            if bits & ZONE_SUPPRESS:
+                continue
+            (capped if bits & ZONE_DOWNGRADE else full).append(other.position)
+        if zone_bits.get(src_id, 0) & ZONE_DOWNGRADE:
+            full, capped = [], full + capped
+        results = [
+            evaluate_targets(
+                src_pos=src.position,
+                src_yaw_deg=src.yaw_deg,
+                target_positions=targets,
+                max_range_m=self.config.max_range_m,
+                cone_half_angle_deg=self.config.cone_half_angle_deg,
+            )
+            for targets in (full, capped)
+        ]
+        return merge_evals(results[0], results[1], self.config.zone_downgrade_intensity)
 
-    def _send_alert(self, player) -> None:
-        if self.udp_transport is None or player.addr is None:
+    def _send_alert(self, player, changed: bool = False) -> None:
+        can_send = self.udp_transport is not None and player.addr is not None
+        if not can_send and not (changed and (self.recorder is not None or self.blackbox is not None)):
             return
         payload = encode_alert(
             AlertPacket(
@@ -228,27 +501,53 @@ class MatchCoordinator:
                 alert_on=1 if player.alert_on else 0,
                 intensity=player.alert_intensity,
                 hold_ms=self.config.alert_hold_ms,
+                version=ALERT_VERSION_V3 if player.protocol_version >= TELEMETRY_VERSION_V3 else ALERT_VERSION,
             )
         )
+        if changed and self.recorder is not None:
+            self.recorder.record(REC_ALERT, player.player_id, payload)
+        if changed and self.blackbox is not None:
+            self.blackbox.record(REC_ALERT, player.player_id, payload)
+        if can_send:
+            self.udp_transport.sendto(payload, player.addr)
+
+    def _send_rate(self, player_id: int, rate_hz: float) -> None:
+        player = self.state.players.get(player_id)
+        if self.udp_transport is None or player is None or player.addr is None:
+            return
+        payload = encode_rate_control(RateControlPacket(player_id=player_id, rate_hz=rate_hz, valid_ms=RATE_VALID_MS))
         self.udp_transport.sendto(payload, player.addr)
 
     async def ws_broadcast_loop(self) -> None:
         interval = 1.0 / self.config.ws_hz
+        stats = self._loop_stats("ws_broadcast_loop", self.config.ws_hz)
         while True:
-            started = time.monotonic()
-            await self.broadcast_world_state()
-            elapsed = time.monotonic() - started
+            stats.begin()
+            snapshot = self.publish_snapshot()
+            stats.phase("snapshot")
+            await self._send_snapshot(snapshot)
+            stats.phase("send")
+            elapsed = stats.end()
             await asyncio.sleep(max(0.0, interval - elapsed))
 
+    def _loop_stats(self, name: str, target_hz: float) -> LoopStats:
+        stats = self.metrics.loop(name, target_hz)
+        stats.slow_tick_log = self.config.slow_tick_log
+        return stats
+
     async def broadcast_world_state(self) -> None:
+        await self._send_snapshot(self.publish_snapshot())
+
+    async def _send_snapshot(self, snapshot: WorldSnapshot) -> None:
         if not self.ws_clients:
             return
-        now_ms = self.now_ms()
-        message = self.world_state_payload(now_ms)
+        if self._sent_config_version != self.config.version:
+            await self.broadcast_config()
+        message = snapshot.text
         disconnected: list[web.WebSocketResponse] = []
         for ws in self.ws_clients:
             try:
-                await ws.send_json(message)
+                await ws.send_str(message)
             except Exception:
                 disconnected.append(ws)
         for ws in disconnected:
@@ -257,11 +556,12 @@ class MatchCoordinator:
     async def broadcast_config(self) -> None:
         if not self.ws_clients:
             return
-        payload = {"type": "config", "config": self.config.to_dict()}
+        self._sent_config_version = self.config.version
+        payload = self.config_message_json()
         disconnected: list[web.WebSocketResponse] = []
         for ws in self.ws_clients:
             try:
-                await ws.send_json(payload)
+                await ws.send_str(payload)
             except Exception:
                 disconnected.append(ws)
         for ws in disconnected:
@@ -272,8 +572,8 @@ class MatchCoordinator:
         await ws.prepare(request)
         self.ws_clients.add(ws)
 
-        await ws.send_json({"type": "config", "config": self.config.to_dict()})
-        await ws.send_json(self.world_state_payload(self.now_ms()))
+        await ws.send_str(self.config_message_json())
+        await ws.send_str(self.current_snapshot().text)
 
         async for msg in ws:
             if msg.type == WSMsgType.TEXT:
@@ -284,6 +584,64 @@ class MatchCoordinator:
         self.ws_clients.discard(ws)
         return ws
 
+    async def aar_ws_handler(self, request: web.Request) -> web.StreamResponse:
+        """Stream one recorded session to one client with its own cursor, speed and pause state."""
+        session_id = request.match_info["session_id"]
+        query = request.query
+        try:
+            start_ms = max(0, int(query.get("t", 0)))
+            speed = parse_speed(query.get("speed", 1.0)) or 1.0
+        except ValueError as exc:
+            return web.json_response({"status": "error", "message": f"bad t or speed: {exc}"}, status=400)
+        paused = query.get("paused", "0") not in ("0", "false", "")
+
+        loop = asyncio.get_running_loop()
+        try:
+            session = await loop.run_in_executor(None, self.catalog.get_session, session_id)
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Session catalog query failed: %s", exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
+        if session is None:
+            return web.json_response({"status": "not_found", "message": f"no recorded session {session_id}"}, status=404)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.aar_clients.add(ws)
+        playback = AarPlayback(session, self.aar_blocks, speed=speed, paused=paused)
+        ticker: asyncio.Task | None = None
+        try:
+            await playback.seek(start_ms * 1000)
+            await ws.send_str(playback.frame_json())
+            ticker = asyncio.create_task(self._aar_playback_loop(ws, playback))
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    try:
+                        await playback.command(json.loads(msg.data))
+                    except (ValueError, AttributeError) as exc:
+                        await ws.send_json({"type": "error", "message": str(exc)})
+                        continue
+                    await ws.send_str(playback.frame_json())
+                elif msg.type == WSMsgType.ERROR:
+                    LOG.warning("AAR WebSocket error: %s", ws.exception())
+        except (OSError, ValueError) as exc:
+            LOG.warning("AAR playback of %s failed: %s", session_id, exc)
+            await ws.close(message=str(exc).encode("utf-8")[:120])
+        finally:
+            if ticker is not None:
+                ticker.cancel()
+                await asyncio.gather(ticker, return_exceptions=True)
+            self.aar_clients.discard(ws)
+        return ws
+
+    async def _aar_playback_loop(self, ws: web.WebSocketResponse, playback: AarPlayback) -> None:
+        interval = 1.0 / self.config.ws_hz
+        while not ws.closed:
+            await asyncio.sleep(interval)
+            if playback.paused:
+                continue
+            await playback.advance()
+            await ws.send_str(playback.frame_json())
+
     async def handle_ws_message(self, raw: str) -> None:
         try:
             payload = json.loads(raw)
@@ -294,13 +652,13 @@ class MatchCoordinator:
         msg_type = payload.get("type")
         if msg_type == "set_config":
             updates = payload.get("values", {})
-            self.config.apply_updates(updates)
-            self.world.configure(
-                arena_width_m=self.config.arena_width_m,
-                arena_height_m=self.config.arena_height_m,
-                speed_mps=self.config.sim_speed_mps,
-            )
-            await self.broadcast_config()
+            try:
+                changed = self.apply_config_updates(updates)
+            except (TypeError, ValueError) as exc:
+                LOG.warning("Rejected set_config: %s", exc)
+                return
+            if changed:
+                await self.broadcast_config()
             return
 
         if msg_type == "action":
@@ -310,20 +668,17 @@ class MatchCoordinator:
             elif action == "reset_world":
                 self.world.reset()
             elif action == "pause_sim":
-                self.config.sim_paused = True
-                self.world.set_paused(True)
+                self.apply_config_updates({"sim_paused": True})
             elif action == "resume_sim":
-                self.config.sim_paused = False
-                self.world.set_paused(False)
+                self.apply_config_updates({"sim_paused": False})
             elif action == "start_recording":
                 self.start_recording(self.now_ms())
             elif action == "stop_recording":
-                self.stop_recording()
+                await self.stop_recording()
             elif action == "add_sim_player":
                 self.add_sim_player()
             elif action == "remove_sim_player":
                 self.remove_sim_player()
-            await self.broadcast_config()
             await self.broadcast_world_state()
             return
 
@@ -333,28 +688,42 @@ class MatchCoordinator:
     def web_root() -> Path:
         return Path(__file__).parent / "web"
 
-    def frontend_index_path(self) -> Path:
+    def load_static_assets(self) -> None:
+        """Read and precompress the frontend bundles once, at startup."""
         web_root = self.web_root()
-        app_index = web_root / "app" / "index.html"
-        if app_index.exists():
-            return app_index
-        return web_root / "index.html"
+        app_root = web_root / "app"
+        self.legacy_assets = StaticAssetCache(web_root, exclude=("app",))
+        self.app_assets = StaticAssetCache(app_root, hashed_dir=VITE_ASSETS_DIR) if app_root.exists() else None
 
-    async def index_handler(self, _: web.Request) -> web.FileResponse:
-        return web.FileResponse(self.frontend_index_path())
+    def frontend_index_asset(self) -> StaticAsset | None:
+        if self.app_assets is not None:
+            app_index = self.app_assets.get("index.html")
+            if app_index is not None:
+                return app_index
+        if self.legacy_assets is None:
+            return None
+        return self.legacy_assets.get("index.html")
 
-    async def console_handler(self, _: web.Request) -> web.FileResponse:
-        return web.FileResponse(self.frontend_index_path())
+    def _serve_asset(self, request: web.Request, asset: StaticAsset | None) -> web.Response:
+        if asset is None:
+            raise web.HTTPNotFound()
+        return StaticAssetCache.respond(request, asset)
 
-    async def aar_handler(self, _: web.Request) -> web.FileResponse:
-        return web.FileResponse(self.frontend_index_path())
+    async def index_handler(self, request: web.Request) -> web.Response:
+        return self._serve_asset(request, self.frontend_index_asset())
 
-    async def about_handler(self, _: web.Request) -> web.FileResponse:
-        return web.FileResponse(self.frontend_index_path())
+    async def console_handler(self, request: web.Request) -> web.Response:
+        return self._serve_asset(request, self.frontend_index_asset())
 
-    async def view3d_handler(self, _: web.Request) -> web.FileResponse:
-        web_root = self.web_root()
-        return web.FileResponse(web_root / "view3d.html")
+    async def aar_handler(self, request: web.Request) -> web.Response:
+        return self._serve_asset(request, self.frontend_index_asset())
+
+    async def about_handler(self, request: web.Request) -> web.Response:
+        return self._serve_asset(request, self.frontend_index_asset())
+
+    async def view3d_handler(self, request: web.Request) -> web.Response:
+        asset = None if self.legacy_assets is None else self.legacy_assets.get("view3d.html")
+        return self._serve_asset(request, asset)
 
     async def api_health_handler(self, _: web.Request) -> web.Response:
         payload = {
@@ -366,58 +735,542 @@ class MatchCoordinator:
 
     async def api_status_handler(self, _: web.Request) -> web.Response:
         now_ms = self.now_ms()
-        world_state = self.world_state_payload(now_ms)
-        players = world_state.get("players", [])
-        online = sum(1 for player in players if player.get("online"))
+        snapshot = self.current_snapshot()
         payload = {
             "status": "ok",
             "system": "ok",
             "version": SERVER_VERSION,
             "uptime_ms": max(0, now_ms - self.server_started_ms),
-            "players_online": online,
-            "players_total": len(players),
+            "players_online": snapshot.players_online,
+            "players_total": snapshot.players_total,
+            "generation": snapshot.generation,
             "ws_clients": len(self.ws_clients),
             "recording": self.recording_payload(),
-            "config": self.config.to_dict(),
+            "config_version": self.config.version,
+            "runtime": self.metrics.to_dict(),
+            "blackbox": None if self.blackbox is None else self.blackbox.stats(),
+            "aar_playback": {"clients": len(self.aar_clients), "cache": self.aar_blocks.stats()},
+            "memory": self.memory_payload(),
+            "rate_control": self.rate_control.stats(self.config),
         }
         return web.json_response(payload)
 
+    def memory_payload(self) -> dict[str, Any]:
+        subsystems: dict[str, dict[str, int]] = self.state.memory_stats()
+        subsystems["events"] = self.events.memory_stats()
+        if self.blackbox is not None:
+            subsystems["blackbox"] = {"count": self.blackbox.stats()["records"], "bytes": self.blackbox.capacity}
+        cache = self.aar_blocks.stats()
+        subsystems["aar_cache"] = {"count": cache["blocks"], "bytes": cache["bytes"]}
+        return {
+            "total_bytes": sum(item["bytes"] for item in subsystems.values()),
+            "subsystems": subsystems,
+            "max_players": self.config.max_players,
+            "player_ttl_ms": self.config.player_ttl_ms,
+            "players_evicted": self.state.evicted_total,
+            "telemetry_rejected": self.state.rejected_packets,
+        }
+
+    async def api_metrics_handler(self, _: web.Request) -> web.Response:
+        snapshot = self.current_snapshot()
+        lines = self.metrics.prometheus_lines()
+        lines.extend(
+            [
+                "# TYPE fdw_players_online gauge",
+                f"fdw_players_online {snapshot.players_online}",
+                "# TYPE fdw_players_total gauge",
+                f"fdw_players_total {snapshot.players_total}",
+                "# TYPE fdw_ws_clients gauge",
+                f"fdw_ws_clients {len(self.ws_clients)}",
+                "# TYPE fdw_world_generation counter",
+                f"fdw_world_generation {snapshot.generation}",
+                "# TYPE fdw_uptime_ms gauge",
+                f"fdw_uptime_ms {max(0, self.now_ms() - self.server_started_ms)}",
+                "# TYPE fdw_players_evicted_total counter",
+                f"fdw_players_evicted_total {self.state.evicted_total}",
+                "# TYPE fdw_telemetry_rejected_total counter",
+                f"fdw_telemetry_rejected_total {self.state.rejected_packets}",
+            ]
+        )
+        lines.extend(self._node_clock_metric_lines())
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain", charset="utf-8")
+
+    def _node_clock_metric_lines(self) -> list[str]:
+        clocks = sorted(self.state.clocks.items())
+        lines = ["# TYPE fdw_node_clock_offset_ms gauge"]
+        for player_id, clock in clocks:
+            offset = clock.offset_at(clock.last_node_ms) if clock.last_node_ms is not None else None
+            if offset is not None:
+                lines.append(f'fdw_node_clock_offset_ms{{player="{player_id}"}} {offset:.1f}')
+        lines.append("# TYPE fdw_node_clock_drift_ppm gauge")
+        lines.extend(f'fdw_node_clock_drift_ppm{{player="{pid}"}} {clock.drift_ppm:.1f}' for pid, clock in clocks)
+        lines.append("# TYPE fdw_node_latency_excess_ms gauge")
+        lines.extend(f'fdw_node_latency_excess_ms{{player="{pid}"}} {clock.excess_ms:.1f}' for pid, clock in clocks)
+        lines.append("# TYPE fdw_node_jitter_ms gauge")
+        for player_id, clock in clocks:
+            for quantile in (0.5, 0.95, 0.99):
+                value = clock.jitter_quantile(quantile)
+                if value is not None:
+                    lines.append(f'fdw_node_jitter_ms{{player="{player_id}",quantile="{quantile}"}} {value:.2f}')
+        lines.append("# TYPE fdw_node_stalls_total counter")
+        lines.extend(f'fdw_node_stalls_total{{player="{pid}"}} {clock.stalls}' for pid, clock in clocks)
+        return lines
+
+    async def api_config_handler(self, request: web.Request) -> web.Response:
+        etag = f'"cfg-{self.instance_id}-{self.config.version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(
+            text=self.config_message_json(),
+            content_type="application/json",
+            headers=headers,
+        )
+
+    async def _await_snapshot(self, request: web.Request) -> WorldSnapshot | None:
+        """Resolve the snapshot for a conditional GET, honoring `?after_generation=` long-polls."""
+        snapshot = self.current_snapshot()
+        after_raw = request.query.get("after_generation")
+        if after_raw is None:
+            return snapshot
+        try:
+            after = int(after_raw)
+            timeout_s = float(request.query.get("timeout_s", LONG_POLL_DEFAULT_S))
+        except ValueError:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"status": "error", "message": "after_generation and timeout_s must be numeric"}),
+                content_type="application/json",
+            ) from None
+        if snapshot.generation > after:
+            return snapshot
+        return await self.snapshots.wait_after(after, max(0.0, min(timeout_s, LONG_POLL_MAX_S)))
+
+    @staticmethod
+    def _snapshot_headers(snapshot: WorldSnapshot, etag: str) -> dict[str, str]:
+        return {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "X-World-Generation": str(snapshot.generation),
+        }
+
+    def _snapshot_response(
+        self,
+        request: web.Request,
+        snapshot: WorldSnapshot | None,
+        body: bytes,
+        player_id: int | None = None,
+    ) -> web.Response:
+        """Serve the world, or one player's entry of it, with that resource's own ETag."""
+        if snapshot is None:
+            # Long-poll timed out without a newer generation.
+            snapshot = self.current_snapshot()
+            body = b""
+            status = 304
+        else:
+            status = 200
+        etag = snapshot.etag if player_id is None else self.snapshots.player_etag(snapshot, player_id)
+        headers = self._snapshot_headers(snapshot, etag)
+        if status == 304 or request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def api_world_handler(self, request: web.Request) -> web.Response:
+        snapshot = await self._await_snapshot(request)
+        return self._snapshot_response(request, snapshot, b"" if snapshot is None else snapshot.body)
+
+    async def api_player_handler(self, request: web.Request) -> web.Response:
+        try:
+            player_id = int(request.match_info["player_id"])
+        except ValueError:
+            player_id = -1
+        if player_id not in self.current_snapshot().player_fragments:
+            return web.json_response(
+                {"status": "not_found", "message": f"player {request.match_info['player_id']} is not registered"},
+                status=404,
+            )
+        snapshot = await self._await_snapshot(request)
+        fragment = "" if snapshot is None else snapshot.player_fragments.get(player_id, "null")
+        return self._snapshot_response(request, snapshot, fragment.encode("utf-8"), player_id)
+
+    async def api_player_series_handler(self, request: web.Request) -> web.Response:
+        try:
+            player_id = int(request.match_info["player_id"])
+            resolution_s = int(request.query.get("resolution", 1))
+            since_ms = int(request.query["from"]) if "from" in request.query else None
+        except ValueError:
+            return web.json_response(
+                {"status": "error", "message": "player id, resolution and from must be integers"},
+                status=400,
+            )
+        widths = [width for width, _capacity in SERIES_RESOLUTIONS]
+        if resolution_s not in widths:
+            return web.json_response({"status": "error", "message": f"resolution must be one of {widths}"}, status=400)
+        series = self.state.series.get(player_id)
+        if series is None:
+            return web.json_response(
+                {"status": "not_found", "message": f"no telemetry received from player {player_id}"},
+                status=404,
+            )
+        now_ms = self.now_ms()
+        series.advance(now_ms)
+        payload = {
+            "status": "ok",
+            "player_id": player_id,
+            "server_time_ms": now_ms,
+            "resolution_s": resolution_s,
+            **series.to_dict(resolution_s, since_ms),
+        }
+        return web.json_response(payload)
+
+    async def api_player_history_handler(self, request: web.Request) -> web.Response:
+        query = request.query
+        clock = query.get("clock", "server")
+        try:
+            player_id = int(request.match_info["player_id"])
+            from_ms = int(query["from"]) if "from" in query else None
+            to_ms = int(query["to"]) if "to" in query else None
+            at_ms = float(query["at"]) if "at" in query else None
+        except ValueError:
+            return web.json_response(
+                {"status": "error", "message": "player id, from, to and at must be numbers"},
+                status=400,
+            )
+        if clock not in HISTORY_CLOCKS:
+            return web.json_response({"status": "error", "message": "clock must be server or node"}, status=400)
+        history = self.state.history.get(player_id)
+        if history is None:
+            return web.json_response(
+                {"status": "not_found", "message": f"no telemetry received from player {player_id}"},
+                status=404,
+            )
+        payload: dict[str, Any] = {
+            "status": "ok",
+            "player_id": player_id,
+            "server_time_ms": self.now_ms(),
+            "clock": clock,
+            "capacity": history.capacity,
+        }
+        if at_ms is not None:
+            payload["sample"] = history.interpolate(at_ms, clock)
+        else:
+            payload.update(history.window(from_ms, to_ms, clock))
+        return web.json_response(payload)
+
+    async def api_filters_handler(self, _: web.Request) -> web.Response:
+        now_ms = self.now_ms()
+        horizon_ms = self.config.alert_filter_max_predict_ms
+        filtered = self.state.filters.diagnostics(now_ms, horizon_ms)
+        players = []
+        for player_id, estimate in sorted(filtered.items()):
+            player = self.state.players.get(player_id)
+            if player is None:
+                continue
+            players.append(
+                {
+                    "id": player_id,
+                    "raw": {
+                        "x_m": player.real_x_m,
+                        "y_m": player.real_y_m,
+                        "yaw_deg": player.yaw_deg,
+                        "age_ms": None if player.last_seen_ms is None else max(0, now_ms - player.last_seen_ms),
+                    },
+                    "filtered": estimate,
+                }
+            )
+        payload = {
+            "status": "ok",
+            "enabled": self.config.alert_filter,
+            "server_time_ms": now_ms,
+            "max_predict_ms": horizon_ms,
+            "players": players,
+        }
+        return web.json_response(payload)
+
+    async def api_events_handler(self, request: web.Request) -> web.Response:
+        try:
+            after = int(request.query.get("after", 0))
+            limit = int(request.query.get("limit", EVENTS_PAGE_DEFAULT))
+        except ValueError:
+            return web.json_response({"status": "error", "message": "after and limit must be integers"}, status=400)
+        events = self.events
+        limit = max(1, min(limit, EVENTS_PAGE_DEFAULT))
+        # A client that fell further behind than the ring holds must resync from a full snapshot.
+        truncated = after + 1 < events.first_id
+        text = (
+            f'{{"status":"ok","first_id":{events.first_id},"last_id":{events.last_id},'
+            f'"truncated":{"true" if truncated else "false"},"events":{events.json_after(after, limit)}}}'
+        )
+        return web.Response(text=text, content_type="application/json")
+
     async def api_recording_start_handler(self, _: web.Request) -> web.Response:
         payload = self.start_recording(self.now_ms())
         await self.broadcast_world_state()
         return web.json_response(payload)
 
     async def api_recording_stop_handler(self, _: web.Request) -> web.Response:
-        payload = self.stop_recording()
+        payload = await self.stop_recording()
         await self.broadcast_world_state()
         return web.json_response(payload)
 
-    async def api_aar_list_handler(self, _: web.Request) -> web.Response:
-        return web.json_response(
-            {
-                "status": "not_enabled",
-                "sessions": [],
-                "message": "AAR listing is not enabled in this build.",
+    async def api_aar_list_handler(self, request: web.Request) -> web.Response:
+        query = request.query
+        try:
+            filters = {
+                "since_unix_ms": int(query["from"]) if "from" in query else None,
+                "until_unix_ms": int(query["to"]) if "to" in query else None,
+                "player_id": int(query["player"]) if "player" in query else None,
+                "min_alerts": int(query["min_alerts"]) if "min_alerts" in query else None,
+                "limit": int(query.get("limit", 50)),
+                "offset": int(query.get("offset", 0)),
+            }
+        except ValueError:
+            return web.json_response(
+                {"status": "error", "message": "from, to, player, min_alerts, limit and offset must be integers"},
+                status=400,
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, lambda: self.catalog.list_sessions(**filters))
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Session catalog query failed: %s", exc)
+            return web.json_response({"status": "error", "sessions": [], "message": str(exc)}, status=500)
+        result["status"] = "ok"
+        return web.json_response(result)
+
+    async def api_aar_state_handler(self, request: web.Request) -> web.Response:
+        session_id = request.match_info["session_id"]
+        try:
+            t_ms = int(request.query["t"])
+        except (KeyError, ValueError):
+            return web.json_response({"status": "error", "message": "t (ms since session start) is required"}, status=400)
+
+        def seek() -> dict[str, Any] | None:
+            session = self.catalog.get_session(session_id)
+            if session is None:
+                return None
+            started = time.perf_counter()
+            with RecordingReader.for_session(session) as reader:
+                state, keyframe_t_us = reader.state_at(max(0, t_ms) * 1000)
+                payload = state.to_dict(max(0, t_ms) * 1000)
+            payload["keyframe_t_ms"] = None if keyframe_t_us is None else keyframe_t_us // 1000
+            payload["records_applied"] = state.records_applied
+            payload["seek_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+            return payload
+
+        loop = asyncio.get_running_loop()
+        try:
+            payload = await loop.run_in_executor(None, seek)
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            LOG.warning("AAR seek in %s failed: %s", session_id, exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
+        if payload is None:
+            return web.json_response({"status": "not_found", "message": f"no recorded session {session_id}"}, status=404)
+        return web.json_response({"status": "ok", "session_id": session_id, **payload})
+
+    async def api_aar_export_handler(self, request: web.Request) -> web.StreamResponse:
+        session_id = request.match_info["session_id"]
+        query = request.query
+        fmt = query.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return web.json_response({"status": "error", "message": "format must be csv or ndjson"}, status=400)
+        try:
+            from_us = max(0, int(query.get("from", 0))) * 1000
+            to_us = int(query["to"]) * 1000 if "to" in query else None
+            players = {int(pid) for pid in query["players"].split(",") if pid.strip()} if query.get("players") else None
+        except ValueError:
+            return web.json_response(
+                {"status": "error", "message": "from/to must be ms integers and players a comma-separated id list"},
+                status=400,
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            session = await loop.run_in_executor(None, self.catalog.get_session, session_id)
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Session catalog query failed: %s", exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
+        if session is None:
+            return web.json_response({"status": "not_found", "message": f"no recorded session {session_id}"}, status=404)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": f"{EXPORT_FORMATS[fmt]}; charset=utf-8",
+                "Content-Disposition": f'attachment; filename="{session_id}.{fmt}"',
+                "Cache-Control": "no-cache",
             }
         )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        reader = RecordingReader.for_session(session)
+        chunks = iter_export_chunks(iter_export_rows(reader, from_us, to_us, players), fmt)
+
+        def close_export(pending: asyncio.Future[bytes | None] | None = None) -> None:
+            if pending is not None and not pending.cancelled():
+                pending.exception()
+            chunks.close()
+            reader.close()
 
-    async def api_replay_start_handler(self, _: web.Request) -> web.Response:
+        pending: asyncio.Future[bytes | None] | None = None
+        try:
+            while True:
+                # Decode the next chunk off the event loop; awaiting write() before
+                # producing another one lets a slow client throttle the export.
+                pending = loop.run_in_executor(None, next, chunks, None)
+                chunk = await asyncio.shield(pending)
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        except (ConnectionResetError, asyncio.CancelledError):
+            LOG.info("Export of %s aborted by the client", session_id)
+            raise
+        finally:
+            if pending is not None and not pending.done():
+                # The worker is still inside the generator and the mmap; close both once it returns.
+                pending.add_done_callback(close_export)
+            else:
+                close_export()
+        await response.write_eof()
+        return response
+
+    async def api_aar_analysis_handler(self, request: web.Request) -> web.Response:
+        session_id = request.match_info["session_id"]
+
+        def load() -> tuple[dict[str, Any] | None, bytes | None]:
+            session = self.catalog.get_session(session_id)
+            if session is None:
+                return None, None
+            path = Path(session["output_dir"]) / ANALYSIS_NAME
+            return session, path.read_bytes() if path.is_file() else None
+
+        loop = asyncio.get_running_loop()
+        try:
+            session, body = await loop.run_in_executor(None, load)
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Loading analysis of %s failed: %s", session_id, exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
+        if session is None:
+            return web.json_response({"status": "not_found", "message": f"no recorded session {session_id}"}, status=404)
+        if body is None:
+            return web.json_response(
+                {
+                    "status": "not_analyzed",
+                    "message": f"run `python -m tools.aar_analyze --session {session_id}` to analyze this session",
+                },
+                status=404,
+            )
+        return web.Response(body=body, content_type="application/json", headers={"Cache-Control": "no-cache"})
+
+    async def api_blackbox_dump_handler(self, request: web.Request) -> web.Response:
+        blackbox = self.blackbox
+        if blackbox is None:
+            return web.json_response({"status": "not_enabled", "message": "blackbox_mb is 0"}, status=404)
+        try:
+            body = await request.json() if request.can_read_body else {}
+            seconds = None if not isinstance(body, dict) or body.get("seconds") is None else float(body["seconds"])
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return web.json_response({"status": "error", "message": "seconds must be a number"}, status=400)
+
+        # Freeze on the event loop so no packet lands mid-copy; write off it.
+        data, offsets = blackbox.freeze()
+        since_us = None if seconds is None else blackbox.elapsed_us() - int(seconds * 1_000_000)
+        session_id = f"BB-{int(time.time() * 1000)}"
+        output_dir = Path(self.config.recordings_dir) / session_id
+        config_json = self.config_message_json()
+
+        def dump() -> dict[str, Any]:
+            manifest = write_dump(
+                data,
+                offsets,
+                blackbox.start_unix_ms,
+                output_dir,
+                session_id,
+                config_json,
+                since_us=since_us,
+            )
+            try:
+                self.catalog.add_session(manifest, output_dir)
+            except sqlite3.Error:
+                LOG.exception("Black box dump %s could not be indexed", session_id)
+            return manifest
+
+        loop = asyncio.get_running_loop()
+        try:
+            manifest = await loop.run_in_executor(None, dump)
+        except OSError as exc:
+            LOG.warning("Black box dump failed: %s", exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
         return web.json_response(
             {
-                "status": "not_enabled",
-                "message": "Replay start is not enabled in this build.",
-            },
-            status=501,
+                "status": "ok",
+                "session_id": session_id,
+                "files": [str(output_dir / segment["file"]) for segment in manifest["segments"]]
+                + [str(output_dir / MANIFEST_NAME)],
+                "summary": manifest,
+            }
         )
 
+    async def api_replay_start_handler(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json() if request.can_read_body else {}
+        except json.JSONDecodeError:
+            body = None
+        if not isinstance(body, dict):
+            return web.json_response({"status": "error", "message": "body must be a JSON object"}, status=400)
+        overrides = body.get("overrides") or {}
+        if not isinstance(overrides, dict):
+            return web.json_response({"status": "error", "message": "overrides must be an object"}, status=400)
+        try:
+            speed = parse_speed(body.get("speed", 1.0))
+        except (TypeError, ValueError) as exc:
+            return web.json_response({"status": "error", "message": str(exc)}, status=400)
+
+        loop = asyncio.get_running_loop()
+        session_id = body.get("session_id")
+        try:
+            if session_id is None:
+                latest = await loop.run_in_executor(None, lambda: self.catalog.list_sessions(limit=1))
+                session_id = latest["sessions"][0]["session_id"] if latest["sessions"] else None
+            session = None if session_id is None else await loop.run_in_executor(
+                None, self.catalog.get_session, str(session_id)
+            )
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Session catalog query failed: %s", exc)
+            return web.json_response({"status": "error", "message": str(exc)}, status=500)
+        if session is None:
+            return web.json_response(
+                {"status": "not_found", "message": f"no recorded session {session_id or '(none recorded yet)'}"},
+                status=404,
+            )
+
+        clock = VirtualClock()
+        replay_config = CoordinatorConfig(recordings_dir=self.config.recordings_dir, blackbox_mb=0.0)
+        try:
+            engine = ReplayEngine(
+                session,
+                MatchCoordinator(replay_config, clock=clock.now_ms),
+                clock,
+                speed=speed,
+                overrides=overrides,
+            )
+        except (TypeError, ValueError) as exc:
+            return web.json_response({"status": "error", "message": f"bad override: {exc}"}, status=400)
+
+        if self.replay is not None:
+            await self.replay.stop()
+        self.replay = engine
+        engine.start()
+        return web.json_response({"status": "ok", "replay": engine.status()})
+
     async def api_replay_stop_handler(self, _: web.Request) -> web.Response:
-        return web.json_response(
-            {
-                "status": "not_enabled",
-                "message": "Replay stop is not enabled in this build.",
-            },
-            status=501,
-        )
+        if self.replay is None:
+            return web.json_response({"status": "ok", "replay": None})
+        await self.replay.stop()
+        return web.json_response({"status": "ok", "replay": self.replay.status()})
+
+    async def api_replay_status_handler(self, _: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "replay": None if self.replay is None else self.replay.status()})
 
     async def api_sim_add_handler(self, _: web.Request) -> web.Response:
         player_id = self.add_sim_player()
@@ -441,6 +1294,23 @@ class MatchCoordinator:
             }
         )
 
+    async def api_telemetry_bulk_handler(self, request: web.Request) -> web.Response:
+        data = await request.read()
+        addr = None
+        if "reply_port" in request.query:
+            try:
+                reply_port = int(request.query["reply_port"])
+            except ValueError:
+                reply_port = 0
+            if not 0 < reply_port <= 0xFFFF:
+                return web.json_response({"status": "error", "message": "reply_port must be 1..65535"}, status=400)
+            addr = (request.remote or "127.0.0.1", reply_port)
+        try:
+            result = self.ingest_bulk(data, addr, self.now_ms())
+        except PacketError as exc:
+            return web.json_response({"status": "error", "message": str(exc)}, status=400)
+        return web.json_response({"status": "ok", **result})
+
     async def on_startup(self, app: web.Application) -> None:
         loop = asyncio.get_running_loop()
         transport, _ = await loop.create_datagram_endpoint(
@@ -449,14 +1319,27 @@ class MatchCoordinator:
         )
         self.udp_transport = transport  # type: ignore[assignment]
 
+        try:
+            imported = await loop.run_in_executor(
+                None, self.catalog.import_missing, Path(self.config.recordings_dir)
+            )
+            if imported:
+                LOG.info("Indexed %d previously recorded sessions", imported)
+        except (OSError, sqlite3.Error) as exc:
+            LOG.warning("Session catalog unavailable: %s", exc)
+
         self.tasks = [
             asyncio.create_task(self.simulation_loop(), name="simulation_loop"),
             asyncio.create_task(self.alert_loop(), name="alert_loop"),
             asyncio.create_task(self.ws_broadcast_loop(), name="ws_broadcast_loop"),
+            asyncio.create_task(self.metrics.lag_probe.run(), name="loop_lag_probe"),
         ]
         LOG.info("Match coordinator started")
 
     async def on_cleanup(self, _: web.Application) -> None:
+        await self.stop_recording()
+        if self.replay is not None:
+            await self.replay.stop()
         for task in self.tasks:
             task.cancel()
         if self.tasks:
@@ -473,8 +1356,7 @@ def build_app(coordinator: MatchCoordinator, host: str, udp_port: int) -> web.Ap
     app["udp_host"] = host
     app["udp_port"] = udp_port
 
-    web_root = Path(__file__).parent / "web"
-    app_root = web_root / "app"
+    coordinator.load_static_assets()
 
     app.router.add_get("/", coordinator.index_handler)
     app.router.add_get("/console", coordinator.console_handler)
@@ -482,20 +1364,36 @@ def build_app(coordinator: MatchCoordinator, host: str, udp_port: int) -> web.Ap
     app.router.add_get("/about", coordinator.about_handler)
     app.router.add_get("/3d", coordinator.view3d_handler)
     app.router.add_get("/ws", coordinator.ws_handler)
+    app.router.add_get("/ws/aar/{session_id}", coordinator.aar_ws_handler)
 
     app.router.add_get("/api/health", coordinator.api_health_handler)
     app.router.add_get("/api/status", coordinator.api_status_handler)
+    app.router.add_get("/api/config", coordinator.api_config_handler)
+    app.router.add_get("/api/metrics", coordinator.api_metrics_handler)
+    app.router.add_get("/api/world", coordinator.api_world_handler)
+    app.router.add_get("/api/players/{player_id}", coordinator.api_player_handler)
+    app.router.add_get("/api/players/{player_id}/series", coordinator.api_player_series_handler)
+    app.router.add_get("/api/players/{player_id}/history", coordinator.api_player_history_handler)
+    app.router.add_get("/api/events", coordinator.api_events_handler)
+    app.router.add_get("/api/filters", coordinator.api_filters_handler)
     app.router.add_post("/api/recording/start", coordinator.api_recording_start_handler)
     app.router.add_post("/api/recording/stop", coordinator.api_recording_stop_handler)
     app.router.add_get("/api/aar/list", coordinator.api_aar_list_handler)
+    app.router.add_get("/api/aar/{session_id}/state", coordinator.api_aar_state_handler)
+    app.router.add_get("/api/aar/{session_id}/analysis", coordinator.api_aar_analysis_handler)
+    app.router.add_get("/api/aar/{session_id}/export", coordinator.api_aar_export_handler)
     app.router.add_post("/api/replay/start", coordinator.api_replay_start_handler)
     app.router.add_post("/api/replay/stop", coordinator.api_replay_stop_handler)
+    app.router.add_get("/api/replay/status", coordinator.api_replay_status_handler)
+    app.router.add_post("/api/blackbox/dump", coordinator.api_blackbox_dump_handler)
     app.router.add_post("/api/sim/add", coordinator.api_sim_add_handler)
     app.router.add_post("/api/sim/remove", coordinator.api_sim_remove_handler)
+    app.router.add_post("/api/telemetry/bulk", coordinator.api_telemetry_bulk_handler)
 
-    app.router.add_static("/static/", web_root, show_index=False)
-    if app_root.exists():
-        app.router.add_static("/app/", app_root, show_index=False)
+    if coordinator.legacy_assets is not None:
+        app.router.add_get("/static/{path:.*}", coordinator.legacy_assets.handler)
+    if coordinator.app_assets is not None:
+        app.router.add_get("/app/{path:.*}", coordinator.app_assets.handler)
 
     app.on_startup.append(coordinator.on_startup)
     app.on_cleanup.append(coordinator.on_cleanup)
@@ -507,7 +1405,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--host", default="0.0.0.0", help="HTTP host")
     parser.add_argument("--http-port", type=int, default=8080, help="HTTP and WebSocket port")
     parser.add_argument("--udp-port", type=int, default=9999, help="UDP telemetry port")
+    parser.add_argument("--recordings-dir", default=None, help="Directory for recorded sessions")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
+    parser.add_argument("--zones", default=None, help="JSON file with alert suppression zones")
     return parser.parse_args()
 
 
@@ -519,6 +1419,10 @@ def main() -> None:
     )
 
     config = CoordinatorConfig()
+    if args.recordings_dir is not None:
+        config.recordings_dir = args.recordings_dir
+    if args.zones is not None:
+        config.apply_updates({"zones": json.loads(Path(args.zones).read_text(encoding="utf-8"))})
     coordinator = MatchCoordinator(config=config)
     app = build_app(coordinator, host=args.host, udp_port=args.udp_port)
 
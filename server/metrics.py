@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Iterable
+
+
+LOG = logging.getLogger("fdw.metrics")
+
+# Bucket upper bounds in milliseconds; the last bucket is +Inf.
+DURATION_BUCKETS_MS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() does no allocation beyond float math."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Iterable[float] = DURATION_BUCKETS_MS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[idx] if idx < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+        }
+
+    def prometheus_lines(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class LoopStats:
+    """Tick duration, scheduling jitter, overruns and achieved rate of one periodic loop."""
+
+    def __init__(self, name: str, target_hz: float) -> None:
+        self.name = name
+        self.target_hz = target_hz
+        self.tick_ms = Histogram()
+        self.jitter_ms = Histogram()
+        self.ticks = 0
+        self.overruns = 0
+        self.achieved_hz = 0.0
+        self.slow_tick_log = False
+        self.phase_totals_ms: dict[str, float] = {}
+        self._started = 0.0
+        self._mark = 0.0
+        self._prev_started: float | None = None
+        self._next_due: float | None = None
+        self._phases: list[tuple[str, float]] = []
+
+    @property
+    def interval_s(self) -> float:
+        return 1.0 / self.target_hz if self.target_hz > 0.0 else 0.0
+
+    def begin(self) -> None:
+        now = time.perf_counter()
+        if self._next_due is not None:
+            self.jitter_ms.observe(max(0.0, now - self._next_due) * 1000.0)
+        if self._prev_started is not None:
+            period = now - self._prev_started
+            if period > 0.0:
+                instant_hz = 1.0 / period
+                self.achieved_hz = instant_hz if self.ticks <= 1 else (self.achieved_hz * 0.9) + (instant_hz * 0.1)
+        self._prev_started = now
+        self._started = now
+        self._mark = now
+        self._phases.clear()
+
+    def phase(self, name: str) -> None:
+        """Close the phase that ran since begin() or the previous phase() call."""
+        now = time.perf_counter()
+        elapsed_ms = (now - self._mark) * 1000.0
+        self._mark = now
+        self._phases.append((name, elapsed_ms))
+        self.phase_totals_ms[name] = self.phase_totals_ms.get(name, 0.0) + elapsed_ms
+
+    def end(self) -> float:
+        """Finish the tick; returns its duration in seconds."""
+        now = time.perf_counter()
+        elapsed = now - self._started
+        self.ticks += 1
+        self.tick_ms.observe(elapsed * 1000.0)
+        interval = self.interval_s
+        if elapsed > interval > 0.0:
+            self.overruns += 1
+            if self.slow_tick_log:
+                LOG.warning(
+                    "Slow %s tick: %.1f ms over a %.1f ms budget (%s)",
+                    self.name,
+                    elapsed * 1000.0,
+                    interval * 1000.0,
+                    ", ".join(f"{phase}={ms:.1f}ms" for phase, ms in self._phases) or "no phases",
+                )
+        self._next_due = max(self._started + interval, now)
+        return elapsed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "target_hz": self.target_hz,
+            "achieved_hz": round(self.achieved_hz, 2),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "tick_ms": self.tick_ms.to_dict(),
+            "jitter_ms": self.jitter_ms.to_dict(),
+            "phase_totals_ms": {name: round(total, 1) for name, total in self.phase_totals_ms.items()},
+        }
+
+
+class LoopLagProbe:
+    """Measures how late the event loop wakes a fixed-interval sleeper."""
+
+    def __init__(self, interval_s: float = 0.1) -> None:
+        self.interval_s = interval_s
+        self.lag_ms = Histogram()
+        self.last_lag_ms = 0.0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            self.last_lag_ms = max(0.0, loop.time() - expected) * 1000.0
+            self.lag_ms.observe(self.last_lag_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        payload = self.lag_ms.to_dict()
+        payload["last"] = round(self.last_lag_ms, 3)
+        return payload
+
+
+class RuntimeMetrics:
+    def __init__(self) -> None:
+        self.loops: dict[str, LoopStats] = {}
+        self.lag_probe = LoopLagProbe()
+
+    def loop(self, name: str, target_hz: float) -> LoopStats:
+        stats = self.loops.get(name)
+        if stats is None:
+            stats = LoopStats(name, target_hz)
+            self.loops[name] = stats
+        stats.target_hz = target_hz
+        return stats
+
+    def set_slow_tick_log(self, enabled: bool) -> None:
+        for stats in self.loops.values():
+            stats.slow_tick_log = enabled
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "event_loop_lag_ms": self.lag_probe.to_dict(),
+            "loops": {name: stats.to_dict() for name, stats in self.loops.items()},
+        }
+
+    def prometheus_lines(self) -> list[str]:
+        lines = [
+            "# TYPE fdw_event_loop_lag_ms histogram",
+            *self.lag_probe.lag_ms.prometheus_lines("fdw_event_loop_lag_ms", 'probe="sleep"'),
+            "# TYPE fdw_loop_tick_ms histogram",
+        ]
+        for name, stats in self.loops.items():
+            lines.extend(stats.tick_ms.prometheus_lines("fdw_loop_tick_ms", f'loop="{name}"'))
+        lines.append("# TYPE fdw_loop_jitter_ms histogram")
+        for name, stats in self.loops.items():
+            lines.extend(stats.jitter_ms.prometheus_lines("fdw_loop_jitter_ms", f'loop="{name}"'))
+        lines.append("# TYPE fdw_loop_overruns_total counter")
+        for name, stats in self.loops.items():
+            lines.append(f'fdw_loop_overruns_total{{loop="{name}"}} {stats.overruns}')
+        lines.append("# TYPE fdw_loop_ticks_total counter")
+        for name, stats in self.loops.items():
+            lines.append(f'fdw_loop_ticks_total{{loop="{name}"}} {stats.ticks}')
+        lines.append("# TYPE fdw_loop_achieved_hz gauge")
+        for name, stats in self.loops.items():
+            lines.append(f'fdw_loop_achieved_hz{{loop="{name}"}} {stats.achieved_hz:.3f}')
+        lines.append("# TYPE fdw_loop_target_hz gauge")
+        for name, stats in self.loops.items():
+            lines.append(f'fdw_loop_target_hz{{loop="{name}"}} {stats.target_hz:.3f}')
+        lines.append("# TYPE fdw_loop_phase_ms_total counter")
+        for name, stats in self.loops.items():
+            for phase, total in stats.phase_totals_ms.items():
+                lines.append(f'fdw_loop_phase_ms_total{{loop="{name}",phase="{phase}"}} {total:.3f}')
+        return lines
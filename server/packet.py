@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import binascii
 from dataclasses import dataclass
 import struct
 
 
 MAGIC = b"FD"
 
-# Alert packets stay on version 1 for backwards compatibility.
+# Alert packets stay on version 1 for v1/v2 nodes; v3 nodes get v3 alerts.
 VERSION = 1
 ALERT_VERSION = VERSION
+ALERT_VERSION_V3 = 3
 TELEMETRY_VERSION_V1 = 1
 TELEMETRY_VERSION_V2 = 2
+TELEMETRY_VERSION_V3 = 3
+
+# v1/v2 carry a u8 player id; v3 widens it to u16.
+MAX_PLAYER_ID_V2 = 0xFF
+MAX_PLAYER_ID = 0xFFFF
 
 MSG_TELEMETRY = 1
 MSG_ALERT = 2
+MSG_RATE_CONTROL = 3
+MSG_BULK = 4
+
+RATE_CONTROL_VERSION = 1
+BULK_VERSION = 1
 
 TELEMETRY_V1_FMT_NOCRC = "<2sBBBHIhhhBiiBHB"
 TELEMETRY_V1_FMT = "<2sBBBHIhhhBiiBHBH"
@@ -25,6 +37,11 @@ TELEMETRY_V2_FMT_NOCRC = "<2sBBBHIhhhBiiBHBiiiB"
 TELEMETRY_V2_FMT = "<2sBBBHIhhhBiiBHBiiiBH"
 TELEMETRY_V2_SIZE = struct.calcsize(TELEMETRY_V2_FMT)
 
+# v3 telemetry is v2 with a u16 player_id.
+TELEMETRY_V3_FMT_NOCRC = "<2sBBHHIhhhBiiBHBiiiB"
+TELEMETRY_V3_FMT = "<2sBBHHIhhhBiiBHBiiiBH"
+TELEMETRY_V3_SIZE = struct.calcsize(TELEMETRY_V3_FMT)
+
 # Backwards compatibility aliases.
 TELEMETRY_FMT_NOCRC = TELEMETRY_V1_FMT_NOCRC
 TELEMETRY_FMT = TELEMETRY_V1_FMT
@@ -33,6 +50,20 @@ TELEMETRY_SIZE = TELEMETRY_V1_SIZE
 ALERT_FMT_NOCRC = "<2sBBBBBH"
 ALERT_FMT = "<2sBBBBBHH"
 ALERT_SIZE = struct.calcsize(ALERT_FMT)
+ALERT_V3_FMT_NOCRC = "<2sBBHBBH"
+ALERT_V3_FMT = "<2sBBHBBHH"
+ALERT_V3_SIZE = struct.calcsize(ALERT_V3_FMT)
+
+# Rate control: u16 player_id, u16 rate in 0.1 Hz units (0 = node default), u16 valid_ms.
+RATE_CONTROL_FMT_NOCRC = "<2sBBHHH"
+RATE_CONTROL_FMT = "<2sBBHHHH"
+RATE_CONTROL_SIZE = struct.calcsize(RATE_CONTROL_FMT)
+
+# Bulk container: header (magic, version, type, u16 gateway_id, u16 count), then
+# `count` entries of a u8 length and one complete telemetry packet with its own CRC.
+BULK_HEADER_FMT = "<2sBBHH"
+BULK_HEADER_SIZE = struct.calcsize(BULK_HEADER_FMT)
+BULK_MAX_PACKETS = 4096
 
 
 class PacketError(ValueError):
@@ -66,18 +97,29 @@ class AlertPacket:
     alert_on: int
     intensity: int
     hold_ms: int
+    # Ids above 255 are always sent as v3.
+    version: int = ALERT_VERSION
+
+
+@dataclass(slots=True)
+class RateControlPacket:
+    player_id: int
+    # Telemetry rate the node should send at; 0 returns it to its own default rate.
+    rate_hz: float
+    # The node falls back to its default rate when no refresh arrives for this long; 0 never expires.
+    valid_ms: int = 0
+
+
+@dataclass(slots=True)
+class BulkFrame:
+    gateway_id: int
+    # Raw inner telemetry packets, still to be decoded and CRC-checked one by one.
+    packets: list[bytes]
 
 
 def crc16_ccitt_false(data: bytes) -> int:
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+    # CRC-16/XMODEM in C with the CCITT-FALSE initial value (poly 0x1021, init 0xFFFF, no reflection).
+    return binascii.crc_hqx(data, 0xFFFF)
 
 
 def _clamp_i16_centideg(value_deg: float) -> int:
@@ -98,21 +140,24 @@ def _packet_has_gps(pkt: TelemetryPacket) -> bool:
 
 
 def encode_telemetry(pkt: TelemetryPacket) -> bytes:
-    if pkt.version not in (TELEMETRY_VERSION_V1, TELEMETRY_VERSION_V2):
+    if pkt.version not in (TELEMETRY_VERSION_V1, TELEMETRY_VERSION_V2, TELEMETRY_VERSION_V3):
         raise PacketError(f"unsupported telemetry version for encode: {pkt.version}")
+    if not 0 <= pkt.player_id <= MAX_PLAYER_ID:
+        raise PacketError(f"player id out of range: {pkt.player_id}")
 
+    use_v3 = pkt.version == TELEMETRY_VERSION_V3 or pkt.player_id > MAX_PLAYER_ID_V2
     use_v2 = pkt.version == TELEMETRY_VERSION_V2 or _packet_has_gps(pkt)
 
-    if use_v2:
+    if use_v3 or use_v2:
         gps_lat_e7 = _deg_to_e7(pkt.gps_lat_deg or 0.0)
         gps_lon_e7 = _deg_to_e7(pkt.gps_lon_deg or 0.0)
         gps_alt_cm = _clamp_i32(int(round((pkt.gps_alt_m or 0.0) * 100.0)))
         payload = struct.pack(
-            TELEMETRY_V2_FMT_NOCRC,
+            TELEMETRY_V3_FMT_NOCRC if use_v3 else TELEMETRY_V2_FMT_NOCRC,
             MAGIC,
-            TELEMETRY_VERSION_V2,
+            TELEMETRY_VERSION_V3 if use_v3 else TELEMETRY_VERSION_V2,
             MSG_TELEMETRY,
-            pkt.player_id & 0xFF,
+            pkt.player_id,
             pkt.seq & 0xFFFF,
             pkt.timestamp_ms & 0xFFFFFFFF,
             _clamp_i16_centideg(pkt.yaw_deg),
@@ -210,10 +255,15 @@ def decode_telemetry(data: bytes) -> TelemetryPacket:
             version=TELEMETRY_VERSION_V1,
         )
 
-    if version == TELEMETRY_VERSION_V2:
-        if len(data) != TELEMETRY_V2_SIZE:
-            raise PacketError(f"telemetry v2 size mismatch: {len(data)} != {TELEMETRY_V2_SIZE}")
-        unpacked = struct.unpack(TELEMETRY_V2_FMT, data)
+    if version in (TELEMETRY_VERSION_V2, TELEMETRY_VERSION_V3):
+        fmt, size = (
+            (TELEMETRY_V3_FMT, TELEMETRY_V3_SIZE)
+            if version == TELEMETRY_VERSION_V3
+            else (TELEMETRY_V2_FMT, TELEMETRY_V2_SIZE)
+        )
+        if len(data) != size:
+            raise PacketError(f"telemetry v{version} size mismatch: {len(data)} != {size}")
+        unpacked = struct.unpack(fmt, data)
         (
             _magic,
             _version,
@@ -258,19 +308,22 @@ def decode_telemetry(data: bytes) -> TelemetryPacket:
             gps_lon_deg=(gps_lon_e7 / 10_000_000.0) if has_gps else None,
             gps_alt_m=(gps_alt_cm / 100.0) if has_gps else None,
             gps_quality=gps_quality,
-            version=TELEMETRY_VERSION_V2,
+            version=version,
         )
 
     raise PacketError(f"bad telemetry version: {version}")
 
 
 def encode_alert(pkt: AlertPacket) -> bytes:
+    if not 0 <= pkt.player_id <= MAX_PLAYER_ID:
+        raise PacketError(f"player id out of range: {pkt.player_id}")
+    use_v3 = pkt.version == ALERT_VERSION_V3 or pkt.player_id > MAX_PLAYER_ID_V2
     payload = struct.pack(
-        ALERT_FMT_NOCRC,
+        ALERT_V3_FMT_NOCRC if use_v3 else ALERT_FMT_NOCRC,
         MAGIC,
-        ALERT_VERSION,
+        ALERT_VERSION_V3 if use_v3 else ALERT_VERSION,
         MSG_ALERT,
-        pkt.player_id & 0xFF,
+        pkt.player_id,
         1 if pkt.alert_on else 0,
         max(0, min(255, int(pkt.intensity))),
         max(0, min(65535, int(pkt.hold_ms))),
@@ -280,17 +333,103 @@ def encode_alert(pkt: AlertPacket) -> bytes:
 
 
 def decode_alert(data: bytes) -> AlertPacket:
-    if len(data) != ALERT_SIZE:
-        raise PacketError(f"alert size mismatch: {len(data)} != {ALERT_SIZE}")
-    unpacked = struct.unpack(ALERT_FMT, data)
+    if len(data) < 3:
+        raise PacketError(f"alert too short: {len(data)}")
+    fmt, size = (ALERT_V3_FMT, ALERT_V3_SIZE) if data[2] == ALERT_VERSION_V3 else (ALERT_FMT, ALERT_SIZE)
+    if len(data) != size:
+        raise PacketError(f"alert size mismatch: {len(data)} != {size}")
+    unpacked = struct.unpack(fmt, data)
     magic, version, msg_type, player_id, alert_on, intensity, hold_ms, recv_crc = unpacked
     if magic != MAGIC:
         raise PacketError("bad alert magic")
-    if version != ALERT_VERSION:
+    if version not in (ALERT_VERSION, ALERT_VERSION_V3):
         raise PacketError(f"bad alert version: {version}")
     if msg_type != MSG_ALERT:
         raise PacketError(f"bad alert type: {msg_type}")
     calc_crc = crc16_ccitt_false(data[:-2])
     if calc_crc != recv_crc:
         raise PacketError(f"bad alert crc: {recv_crc:#06x} != {calc_crc:#06x}")
-    return AlertPacket(player_id=player_id, alert_on=alert_on, intensity=intensity, hold_ms=hold_ms)
+    return AlertPacket(player_id=player_id, alert_on=alert_on, intensity=intensity, hold_ms=hold_ms, version=version)
+
+
+def encode_rate_control(pkt: RateControlPacket) -> bytes:
+    if not 0 <= pkt.player_id <= MAX_PLAYER_ID:
+        raise PacketError(f"player id out of range: {pkt.player_id}")
+    payload = struct.pack(
+        RATE_CONTROL_FMT_NOCRC,
+        MAGIC,
+        RATE_CONTROL_VERSION,
+        MSG_RATE_CONTROL,
+        pkt.player_id,
+        max(0, min(0xFFFF, int(round(pkt.rate_hz * 10.0)))),
+        max(0, min(0xFFFF, int(pkt.valid_ms))),
+    )
+    crc = crc16_ccitt_false(payload)
+    return payload + struct.pack("<H", crc)
+
+
+def decode_rate_control(data: bytes) -> RateControlPacket:
+    if len(data) != RATE_CONTROL_SIZE:
+        raise PacketError(f"rate control size mismatch: {len(data)} != {RATE_CONTROL_SIZE}")
+    magic, version, msg_type, player_id, rate_dhz, valid_ms, recv_crc = struct.unpack(RATE_CONTROL_FMT, data)
+    if magic != MAGIC:
+        raise PacketError("bad rate control magic")
+    if version != RATE_CONTROL_VERSION:
+        raise PacketError(f"bad rate control version: {version}")
+    if msg_type != MSG_RATE_CONTROL:
+        raise PacketError(f"bad rate control type: {msg_type}")
+    calc_crc = crc16_ccitt_false(data[:-2])
+    if calc_crc != recv_crc:
+        raise PacketError(f"bad rate control crc: {recv_crc:#06x} != {calc_crc:#06x}")
+    return RateControlPacket(player_id=player_id, rate_hz=rate_dhz / 10.0, valid_ms=valid_ms)
+
+
+def encode_bulk(gateway_id: int, packets: list[bytes]) -> bytes:
+    """Wrap encoded telemetry packets in one container frame."""
+    if not 0 <= gateway_id <= 0xFFFF:
+        raise PacketError(f"gateway id out of range: {gateway_id}")
+    if len(packets) > BULK_MAX_PACKETS:
+        raise PacketError(f"too many packets for one frame: {len(packets)} > {BULK_MAX_PACKETS}")
+    parts = [struct.pack(BULK_HEADER_FMT, MAGIC, BULK_VERSION, MSG_BULK, gateway_id, len(packets))]
+    for raw in packets:
+        if not 0 < len(raw) <= 0xFF:
+            raise PacketError(f"inner packet size out of range: {len(raw)}")
+        parts.append(bytes((len(raw),)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def decode_bulk(data: bytes) -> BulkFrame:
+    """Split a container frame into its inner packets.
+
+    The header, the entry count and the entry lengths must account for the
+    frame exactly, or the whole frame is rejected. Inner packets are not
+    decoded here, so one bad CRC only costs that packet.
+    """
+    if len(data) < BULK_HEADER_SIZE:
+        raise PacketError(f"bulk frame too short: {len(data)}")
+    magic, version, msg_type, gateway_id, count = struct.unpack_from(BULK_HEADER_FMT, data)
+    if magic != MAGIC:
+        raise PacketError("bad bulk magic")
+    if version != BULK_VERSION:
+        raise PacketError(f"bad bulk version: {version}")
+    if msg_type != MSG_BULK:
+        raise PacketError(f"bad bulk type: {msg_type}")
+    if count > BULK_MAX_PACKETS:
+        raise PacketError(f"bulk count too large: {count} > {BULK_MAX_PACKETS}")
+    view = memoryview(data)
+    packets: list[bytes] = []
+    pos = BULK_HEADER_SIZE
+    end = len(data)
+    for _ in range(count):
+        if pos >= end:
+            raise PacketError(f"bulk frame truncated after {len(packets)} of {count} packets")
+        size = data[pos]
+        pos += 1
+        if pos + size > end:
+            raise PacketError(f"bulk frame truncated after {len(packets)} of {count} packets")
+        packets.append(bytes(view[pos : pos + size]))
+        pos += size
+    if pos != end:
+        raise PacketError(f"bulk frame has {end - pos} trailing bytes")
+    return BulkFrame(gateway_id=gateway_id, packets=packets)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from .aar import AarState, decode_record
+from .recfile import REC_KEYFRAME, SEGMENT_HEADER, iter_records
+from .replay import parse_speed
+
+
+@dataclass(frozen=True, slots=True)
+class BlockRef:
+    """A byte range of one segment that starts at a keyframe or at the segment start."""
+
+    path: Path
+    segment_index: int
+    start: int
+    end: int
+    t_us: int
+    keyframe: bool
+
+
+@dataclass(slots=True)
+class DecodedBlock:
+    times: list[int]
+    # (rtype, player_id, t_us, decoded payload) ready for AarState.apply_decoded.
+    records: list[tuple[int, int, int, Any]]
+    # Recorded size of the block; the cache is bounded by this, not by Python object size.
+    nbytes: int
+
+
+def session_blocks(session: dict[str, Any]) -> list[BlockRef]:
+    """Split a catalog session into keyframe-aligned blocks, in playback order."""
+    output_dir = Path(session["output_dir"])
+    keyframes: dict[int, list[tuple[int, int]]] = {}
+    for t_us, segment_index, offset in session.get("keyframes") or []:
+        keyframes.setdefault(segment_index, []).append((offset, t_us))
+
+    blocks: list[BlockRef] = []
+    for segment in sorted(session["segments"], key=lambda item: item["index"]):
+        index = segment["index"]
+        end = SEGMENT_HEADER.size + int(segment["bytes"])
+        starts = [(offset, t_us, True) for offset, t_us in sorted(keyframes.get(index, []))]
+        if not starts or starts[0][0] > SEGMENT_HEADER.size:
+            starts.insert(0, (SEGMENT_HEADER.size, int(segment.get("first_t_us") or 0), False))
+        for position, (start, t_us, keyframe) in enumerate(starts):
+            stop = starts[position + 1][0] if position + 1 < len(starts) else end
+            if stop > start:
+                blocks.append(BlockRef(output_dir / segment["file"], index, start, stop, t_us, keyframe))
+    return blocks
+
+
+def load_block(ref: BlockRef) -> DecodedBlock:
+    with open(ref.path, "rb") as handle:
+        handle.seek(ref.start)
+        data = handle.read(ref.end - ref.start)
+    times: list[int] = []
+    records: list[tuple[int, int, int, Any]] = []
+    for _offset, rtype, player_id, t_us, payload in iter_records(data, 0):
+        times.append(t_us)
+        records.append((rtype, player_id, t_us, decode_record(rtype, payload)))
+    return DecodedBlock(times=times, records=records, nbytes=len(data))
+
+
+class BlockCache:
+    """LRU of decoded blocks shared by every AAR playback client.
+
+    Concurrent requests for a block that is still loading share one executor
+    job; the most recently used blocks are kept until their recorded size
+    exceeds `capacity_bytes`.
+    """
+
+    def __init__(self, capacity_bytes: int) -> None:
+        self.capacity = capacity_bytes
+        self._blocks: OrderedDict[tuple[str, int], DecodedBlock] = OrderedDict()
+        self._loading: dict[tuple[str, int], asyncio.Future[DecodedBlock]] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, ref: BlockRef) -> DecodedBlock:
+        key = (str(ref.path), ref.start)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+        future = self._loading.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(None, load_block, ref)
+            self._loading[key] = future
+            future.add_done_callback(lambda done: self._loaded(key, done))
+        else:
+            self.hits += 1
+        # Shielded so a client disconnecting mid-load does not cancel it for the others.
+        return await asyncio.shield(future)
+
+    def _loaded(self, key: tuple[str, int], future: asyncio.Future[DecodedBlock]) -> None:
+        self._loading.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        block = future.result()
+        self._blocks[key] = block
+        self.bytes += block.nbytes
+        while self.bytes > self.capacity and len(self._blocks) > 1:
+            _key, evicted = self._blocks.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity_bytes": self.capacity,
+            "bytes": self.bytes,
+            "blocks": len(self._blocks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class AarPlayback:
+    """One client's cursor, speed and pause state over a recorded session.
+
+    State is folded forward from the shared block cache as the cursor moves.
+    Seeking backwards, or past a later keyframe, restarts from the nearest
+    keyframe block at or before the target.
+    """
+
+    def __init__(
+        self,
+        session: dict[str, Any],
+        cache: BlockCache,
+        speed: float = 1.0,
+        paused: bool = False,
+    ) -> None:
+        self.session_id: str = session["session_id"]
+        self.cache = cache
+        self.blocks = session_blocks(session)
+        self.duration_us = max(
+            int(session.get("duration_ms") or 0) * 1000,
+            max((int(segment.get("last_t_us") or 0) for segment in session["segments"]), default=0),
+        )
+        self.speed = speed
+        self.paused = paused
+        self.cursor_us = 0
+        self.state = AarState()
+        self._keyframe_blocks = [index for index, block in enumerate(self.blocks) if block.keyframe]
+        self._keyframe_times = [self.blocks[index].t_us for index in self._keyframe_blocks]
+        self._block_index = 0
+        self._record_index = 0
+        self._folded_us = -1
+        self._apply_keyframe = True
+        self._last_tick = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _restart_block(self, t_us: int) -> int:
+        position = bisect_right(self._keyframe_times, t_us) - 1
+        return self._keyframe_blocks[position] if position >= 0 else 0
+
+    async def _fold_to(self, t_us: int) -> None:
+        restart = self._restart_block(t_us)
+        if t_us < self._folded_us or restart > self._block_index:
+            self.state = AarState()
+            self._block_index = restart
+            self._record_index = 0
+            self._apply_keyframe = True
+        while self._block_index < len(self.blocks):
+            block = await self.cache.get(self.blocks[self._block_index])
+            stop = bisect_right(block.times, t_us, lo=self._record_index)
+            for rtype, player_id, record_t_us, decoded in block.records[self._record_index : stop]:
+                # Keyframes only matter when folding starts at one; otherwise the state is already current.
+                if rtype != REC_KEYFRAME or self._apply_keyframe:
+                    self.state.apply_decoded(rtype, player_id, record_t_us, decoded)
+                self._apply_keyframe = False
+            self._record_index = stop
+            if stop < len(block.records):
+                break
+            self._block_index += 1
+            self._record_index = 0
+        self._folded_us = t_us
+
+    async def seek(self, t_us: int) -> None:
+        async with self._lock:
+            self.cursor_us = max(0, min(t_us, self.duration_us))
+            self._last_tick = time.monotonic()
+            await self._fold_to(self.cursor_us)
+
+    async def advance(self) -> None:
+        """Move the cursor by the wall time since the last tick, scaled by speed."""
+        async with self._lock:
+            now = time.monotonic()
+            elapsed_s, self._last_tick = now - self._last_tick, now
+            if self.paused:
+                return
+            self.cursor_us = min(self.duration_us, self.cursor_us + int(elapsed_s * self.speed * 1_000_000))
+            if self.cursor_us >= self.duration_us:
+                self.paused = True
+            await self._fold_to(self.cursor_us)
+
+    async def command(self, message: dict[str, Any]) -> None:
+        """Apply a client message: play, pause, seek {t_ms} or speed {value}."""
+        kind = message.get("type")
+        if kind == "play":
+            if self.cursor_us >= self.duration_us:
+                await self.seek(0)
+            self._last_tick = time.monotonic()
+            self.paused = False
+        elif kind == "pause":
+            await self.advance()
+            self.paused = True
+        elif kind == "seek":
+            try:
+                t_ms = int(message["t_ms"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("seek needs an integer t_ms") from None
+            await self.seek(t_ms * 1000)
+        elif kind == "speed":
+            await self.advance()
+            try:
+                speed = parse_speed(message.get("value"))
+            except TypeError:
+                speed = None
+            if speed is None:
+                raise ValueError("playback speed must be a number")
+            self.speed = speed
+        else:
+            raise ValueError(f"unknown playback message: {kind}")
+
+    def frame_json(self) -> str:
+        frame = self.state.to_dict(self.cursor_us)
+        frame.update(
+            {
+                "type": "aar_frame",
+                "session_id": self.session_id,
+                "duration_ms": self.duration_us // 1000,
+                "speed": self.speed,
+                "paused": self.paused,
+                "ended": self.cursor_us >= self.duration_us,
+            }
+        )
+        return json.dumps(frame, separators=(",", ":"))
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .config import CoordinatorConfig
+from .state import LogicPlayer
+
+
+RATE_TIER_IDLE = 0
+RATE_TIER_NEAR = 1
+RATE_TIER_ENGAGED = 2
+RATE_TIER_NAMES = ("idle", "near", "engaged")
+
+# Tiers are re-evaluated at this interval rather than on every alert tick.
+RATE_EVAL_INTERVAL_MS = 250
+# Unchanged rates are re-sent this often to repair lost packets; nodes fall
+# back to their own rate when no refresh arrives within RATE_VALID_MS.
+RATE_REFRESH_MS = 5000
+RATE_VALID_MS = 15000
+# Engaged: within this multiple of max_range_m and rate_engage_margin_deg of a cone edge.
+ENGAGE_RANGE_FACTOR = 1.5
+# Near: anyone within this multiple of max_range_m.
+NEAR_RANGE_FACTOR = 2.0
+# The floor always leaves this many packets per offline_timeout_ms.
+LIVENESS_PACKETS = 4
+# Rows of the pairwise distance matrix computed at once, bounding scratch memory.
+_BLOCK_ROWS = 256
+
+
+def engagement_tiers(
+    positions: np.ndarray,
+    yaw_deg: np.ndarray,
+    max_range_m: float,
+    cone_half_angle_deg: float,
+    margin_deg: float,
+) -> np.ndarray:
+    """RATE_TIER_* for each row of `positions` (n x 2, arena metres).
+
+    A pair is engaged when the target is in range of the source's cone or
+    close to its edge. Both ends of such a pair are engaged, since the
+    source's yaw and the target's position both decide the warning. The
+    pairs are computed in row blocks, so scratch memory stays bounded for
+    thousands of players.
+    """
+    count = len(positions)
+    tiers = np.zeros(count, dtype=np.int8)
+    if count < 2:
+        return tiers
+    xs, ys = positions[:, 0], positions[:, 1]
+    engage_m = max_range_m * ENGAGE_RANGE_FACTOR
+    near_m = max_range_m * NEAR_RANGE_FACTOR
+    engage_deg = cone_half_angle_deg + margin_deg
+    engaged_target = np.zeros(count, dtype=bool)
+    for start in range(0, count, _BLOCK_ROWS):
+        stop = min(count, start + _BLOCK_ROWS)
+        dx = xs[None, :] - xs[start:stop, None]
+        dy = ys[None, :] - ys[start:stop, None]
+        dist = np.hypot(dx, dy)
+        dist[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        off_axis = np.abs((yaw_deg[start:stop, None] - np.degrees(np.arctan2(dy, dx)) + 180.0) % 360.0 - 180.0)
+        engaged = (dist < engage_m) & (off_axis < engage_deg)
+        engaged_target |= engaged.any(axis=0)
+        block = tiers[start:stop]
+        block[(dist < near_m).any(axis=1)] = RATE_TIER_NEAR
+        block[engaged.any(axis=1)] = RATE_TIER_ENGAGED
+    tiers[engaged_target] = RATE_TIER_ENGAGED
+    return tiers
+
+
+@dataclass(slots=True)
+class NodeRate:
+    tier: int
+    rate_hz: float = 0.0
+    # When the measured tier first fell below `tier`; None while it has not.
+    lower_since_ms: int | None = None
+    sent_ms: int | None = None
+
+
+class RateController:
+    """Telemetry rate per connected node, from how close it is to other players' cones.
+
+    update() reuses the alert tick's logic players and geometry. A rate goes
+    up as soon as the measured tier rises, so warning latency is unaffected.
+    It only comes down after the lower tier has held for rate_hold_ms. Nodes
+    without a position stay at the full rate because nothing is known about
+    them, and no rate drops below a floor that keeps the link alive.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: dict[int, NodeRate] = {}
+        self._next_eval_ms: int | None = None
+
+    def rate_for(self, tier: int, config: CoordinatorConfig) -> float:
+        floor_hz = max(config.rate_min_hz, LIVENESS_PACKETS * 1000.0 / max(1, config.offline_timeout_ms))
+        return max(floor_hz, (config.rate_min_hz, config.rate_near_hz, config.rate_max_hz)[tier])
+
+    def update(self, now_ms: int, logic_players: dict[int, LogicPlayer], config: CoordinatorConfig) -> list[int]:
+        """Re-evaluate tiers when due; returns the node ids whose rate should be sent now."""
+        if self._next_eval_ms is not None and now_ms < self._next_eval_ms:
+            return []
+        self._next_eval_ms = now_ms + RATE_EVAL_INTERVAL_MS
+
+        placed = [player for player in logic_players.values() if player.position is not None]
+        measured: dict[int, int] = {}
+        if placed:
+            tiers = engagement_tiers(
+                np.array([player.position for player in placed], dtype=float),
+                np.array([player.yaw_deg for player in placed], dtype=float),
+                config.max_range_m,
+                config.cone_half_angle_deg,
+                config.rate_engage_margin_deg,
+            )
+            measured = {player.player_id: int(tier) for player, tier in zip(placed, tiers)}
+
+        nodes: dict[int, NodeRate] = {}
+        due: list[int] = []
+        for player_id, player in logic_players.items():
+            if player.addr is None or not player.online:
+                continue
+            tier = measured.get(player_id, RATE_TIER_ENGAGED)
+            node = self.nodes.get(player_id)
+            if node is None:
+                node = NodeRate(tier=tier)
+            elif tier > node.tier:
+                node.tier = tier
+                node.lower_since_ms = None
+            elif tier < node.tier:
+                if node.lower_since_ms is None:
+                    node.lower_since_ms = now_ms
+                if now_ms - node.lower_since_ms >= config.rate_hold_ms:
+                    node.tier = tier
+                    node.lower_since_ms = None
+            else:
+                node.lower_since_ms = None
+            rate_hz = self.rate_for(node.tier, config)
+            if rate_hz != node.rate_hz or node.sent_ms is None or now_ms - node.sent_ms >= RATE_REFRESH_MS:
+                node.rate_hz = rate_hz
+                node.sent_ms = now_ms
+                due.append(player_id)
+            nodes[player_id] = node
+        # Nodes that went offline or were removed are forgotten; they start over when they return.
+        self.nodes = nodes
+        return due
+
+    def release(self) -> list[int]:
+        """Forget every commanded rate; returns the ids to send a rate of 0 (back to their own default)."""
+        released = list(self.nodes)
+        self.nodes = {}
+        self._next_eval_ms = None
+        return released
+
+    def stats(self, config: CoordinatorConfig) -> dict[str, Any]:
+        tiers = {name: 0 for name in RATE_TIER_NAMES}
+        for node in self.nodes.values():
+            tiers[RATE_TIER_NAMES[node.tier]] += 1
+        commanded_hz = sum(node.rate_hz for node in self.nodes.values())
+        full_hz = config.rate_max_hz * len(self.nodes)
+        return {
+            "enabled": config.rate_control,
+            "nodes": len(self.nodes),
+            "tiers": tiers,
+            "commanded_hz": round(commanded_hz, 1),
+            "uplink_fraction": round(commanded_hz / full_hz, 3) if full_hz > 0 else 1.0,
+        }
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import struct
+from typing import Iterator
+
+
+# Recording segments are append-only files:
+#   segment header | record | record | ...
+# Every record is a fixed header followed by `length` payload bytes. A crash
+# can only leave a truncated last record, which readers silently ignore.
+SEGMENT_MAGIC = b"FDRS"
+SEGMENT_VERSION = 1
+# magic, version, reserved, session_start_unix_ms, segment_index
+SEGMENT_HEADER = struct.Struct("<4sHHQI")
+# payload length, record type, flags, player_id, t_us since session start
+RECORD_HEADER = struct.Struct("<IBBHq")
+
+REC_TELEMETRY = 1  # raw telemetry datagram as received
+REC_ALERT = 2  # encoded alert packet, written on alert transitions
+REC_CONFIG = 3  # config message JSON
+# Full-state keyframe: its payload is itself a run of records holding the latest
+# telemetry/alert record per player plus the latest config, with original t_us.
+REC_KEYFRAME = 4
+REC_EVENT = 5  # server event JSON (see server/events.py)
+
+SEGMENT_SUFFIX = ".fdr"
+MANIFEST_NAME = "session.json"
+# Cached output of `python -m tools.aar_analyze`, next to the manifest.
+ANALYSIS_NAME = "analysis.json"
+
+
+class RecordFormatError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentHeader:
+    version: int
+    session_start_unix_ms: int
+    segment_index: int
+
+
+def segment_name(index: int) -> str:
+    return f"seg-{index:06d}{SEGMENT_SUFFIX}"
+
+
+def pack_segment_header(session_start_unix_ms: int, segment_index: int) -> bytes:
+    return SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, 0, session_start_unix_ms, segment_index)
+
+
+def read_segment_header(data: bytes | memoryview) -> SegmentHeader:
+    if len(data) < SEGMENT_HEADER.size:
+        raise RecordFormatError(f"segment too short: {len(data)}")
+    magic, version, _reserved, start_unix_ms, index = SEGMENT_HEADER.unpack_from(data, 0)
+    if magic != SEGMENT_MAGIC:
+        raise RecordFormatError("bad segment magic")
+    if version != SEGMENT_VERSION:
+        raise RecordFormatError(f"unsupported segment version: {version}")
+    return SegmentHeader(version=version, session_start_unix_ms=start_unix_ms, segment_index=index)
+
+
+def pack_record_into(
+    buf: bytearray,
+    offset: int,
+    rtype: int,
+    player_id: int,
+    t_us: int,
+    payload: bytes | memoryview,
+) -> int:
+    """Write one record at `offset` without intermediate allocations; returns the end offset."""
+    RECORD_HEADER.pack_into(buf, offset, len(payload), rtype, 0, player_id & 0xFFFF, t_us)
+    start = offset + RECORD_HEADER.size
+    end = start + len(payload)
+    buf[start:end] = payload
+    return end
+
+
+def pack_records(records: list[tuple[int, int, int, bytes | memoryview]]) -> bytearray:
+    """Pack (rtype, player_id, t_us, payload) tuples back to back, e.g. as a keyframe payload."""
+    buf = bytearray(sum(RECORD_HEADER.size + len(payload) for _, _, _, payload in records))
+    offset = 0
+    for rtype, player_id, t_us, payload in records:
+        offset = pack_record_into(buf, offset, rtype, player_id, t_us, payload)
+    return buf
+
+
+def iter_records(
+    data: bytes | bytearray | memoryview,
+    start: int = SEGMENT_HEADER.size,
+    end: int | None = None,
+) -> Iterator[tuple[int, int, int, int, memoryview]]:
+    """Yield (offset, rtype, player_id, t_us, payload) for each complete record."""
+    view = memoryview(data)
+    limit = len(view) if end is None else min(end, len(view))
+    offset = start
+    header_size = RECORD_HEADER.size
+    while offset + header_size <= limit:
+        length, rtype, _flags, player_id, t_us = RECORD_HEADER.unpack_from(view, offset)
+        payload_end = offset + header_size + length
+        if payload_end > limit:
+            return
+        yield offset, rtype, player_id, t_us, view[offset + header_size : payload_end]
+        offset = payload_end
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .catalog import SessionCatalog
+from .recfile import (
+    MANIFEST_NAME,
+    RECORD_HEADER,
+    REC_ALERT,
+    REC_CONFIG,
+    REC_EVENT,
+    REC_KEYFRAME,
+    REC_TELEMETRY,
+    SEGMENT_HEADER,
+    pack_record_into,
+    pack_records,
+    pack_segment_header,
+    segment_name,
+)
+
+
+LOG = logging.getLogger("fdw.recorder")
+
+
+@dataclass(slots=True)
+class RecorderStats:
+    records: int = 0
+    bytes: int = 0
+    dropped_records: int = 0
+    telemetry_packets: int = 0
+    alert_transitions: int = 0
+    config_changes: int = 0
+    events: int = 0
+    packets_by_player: dict[int, int] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SegmentInfo:
+    index: int
+    file: str
+    bytes: int
+    first_t_us: int | None = None
+    last_t_us: int | None = None
+
+
+class SessionRecorder:
+    """Append-only binary session recorder.
+
+    Producers on the event loop pack records into a preallocated buffer.
+    Full (or stale) buffers are handed to a writer thread that flushes them
+    in large writes and rotates segments by size and age. When the writer
+    falls behind and no free buffer is left, records are dropped and
+    counted instead of blocking the caller.
+
+    Every `keyframe_interval_s` a keyframe record snapshots the latest
+    telemetry and alert record of each player plus the latest config; the
+    writer turns their buffer offsets into a (t_us, segment, offset) index
+    so readers can seek without replaying from the start.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        session_id: str,
+        buffer_bytes: int = 1 << 20,
+        buffer_count: int = 8,
+        flush_interval_s: float = 0.5,
+        segment_max_bytes: int = 64 << 20,
+        segment_max_s: float = 300.0,
+        keyframe_interval_s: float = 10.0,
+        catalog: SessionCatalog | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.session_id = session_id
+        self.flush_interval_s = flush_interval_s
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_s = segment_max_s
+        self.keyframe_interval_us = int(keyframe_interval_s * 1_000_000)
+        self.catalog = catalog
+        self.start_unix_ms = int(time.time() * 1000)
+        self.stats = RecorderStats()
+        self.segments: list[SegmentInfo] = []
+        # (t_us, segment_index, file_offset) of every keyframe written so far.
+        self.keyframes: list[tuple[int, int, int]] = []
+
+        self._start_ns = time.monotonic_ns()
+        self._free: queue.SimpleQueue[bytearray] = queue.SimpleQueue()
+        for _ in range(buffer_count - 1):
+            self._free.put(bytearray(buffer_bytes))
+        self._filled: queue.SimpleQueue[tuple[bytearray, int, int, int, list[tuple[int, int]]] | None] = (
+            queue.SimpleQueue()
+        )
+        self._active: bytearray | None = bytearray(buffer_bytes)
+        self._offset = 0
+        # (t_us, buffer offset) of keyframes in the active buffer.
+        self._buffer_keyframes: list[tuple[int, int]] = []
+        # Latest (t_us, payload) per (rtype << 16 | player_id), for keyframes.
+        self._latest: dict[int, tuple[int, bytes | memoryview]] = {}
+        self._last_keyframe_us: int | None = None
+        self._first_t_us = -1
+        self._last_t_us = -1
+        self._last_swap = time.monotonic()
+        self._closed = False
+        self._manifest: dict[str, Any] | None = None
+        self._thread = threading.Thread(target=self._writer_main, name=f"recorder-{session_id}", daemon=True)
+        self._thread.start()
+
+    def elapsed_us(self) -> int:
+        return (time.monotonic_ns() - self._start_ns) // 1000
+
+    def record(self, rtype: int, player_id: int, payload: bytes | memoryview, t_us: int | None = None) -> bool:
+        if self._closed:
+            return False
+        if t_us is None:
+            t_us = self.elapsed_us()
+        size = RECORD_HEADER.size + len(payload)
+        buf = self._active
+        if buf is None or self._offset + size > len(buf):
+            self._swap()
+            buf = self._active
+            if buf is None or size > len(buf):
+                self.stats.dropped_records += 1
+                return False
+
+        if rtype == REC_KEYFRAME:
+            self._buffer_keyframes.append((t_us, self._offset))
+        elif rtype != REC_EVENT:
+            self._latest[(rtype << 16) | player_id] = (t_us, payload)
+        self._offset = pack_record_into(buf, self._offset, rtype, player_id, t_us, payload)
+        if self._first_t_us < 0:
+            self._first_t_us = t_us
+        self._last_t_us = t_us
+
+        stats = self.stats
+        stats.records += 1
+        stats.bytes += size
+        if rtype == REC_TELEMETRY:
+            stats.telemetry_packets += 1
+            stats.packets_by_player[player_id] = stats.packets_by_player.get(player_id, 0) + 1
+        elif rtype == REC_ALERT:
+            stats.alert_transitions += 1
+        elif rtype == REC_CONFIG:
+            stats.config_changes += 1
+        elif rtype == REC_EVENT:
+            stats.events += 1
+        return True
+
+    def poll(self) -> None:
+        """Write a keyframe when one is due and hand stale partial buffers to the writer."""
+        now_us = self.elapsed_us()
+        if self._latest and (
+            self._last_keyframe_us is None or now_us - self._last_keyframe_us >= self.keyframe_interval_us
+        ):
+            self.write_keyframe(now_us)
+        if self._offset > 0 and (time.monotonic() - self._last_swap) >= self.flush_interval_s:
+            self._swap()
+
+    def write_keyframe(self, t_us: int | None = None) -> bool:
+        if t_us is None:
+            t_us = self.elapsed_us()
+        self._last_keyframe_us = t_us
+        latest = sorted(
+            ((key >> 16, key & 0xFFFF, record_t_us, payload) for key, (record_t_us, payload) in self._latest.items()),
+            key=lambda item: item[2],
+        )
+        return self.record(REC_KEYFRAME, 0, pack_records(latest), t_us=t_us)
+
+    def _swap(self) -> None:
+        if self._active is not None and self._offset > 0:
+            self._filled.put((self._active, self._offset, self._first_t_us, self._last_t_us, self._buffer_keyframes))
+            self._active = None
+            self._buffer_keyframes = []
+        self._offset = 0
+        self._first_t_us = -1
+        self._last_t_us = -1
+        self._last_swap = time.monotonic()
+        if self._active is None:
+            try:
+                self._active = self._free.get_nowait()
+            except queue.Empty:
+                self._active = None
+
+    def close(self) -> dict[str, Any]:
+        """Flush, stop the writer thread and return the session manifest. Blocks on I/O."""
+        if not self._closed:
+            self._swap()
+            self._closed = True
+            self._filled.put(None)
+        self._thread.join()
+        return self._manifest or {}
+
+    def files(self) -> list[str]:
+        return [str(self.output_dir / segment.file) for segment in self.segments]
+
+    def _writer_main(self) -> None:
+        handle = None
+        segment: SegmentInfo | None = None
+        segment_opened = 0.0
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            while True:
+                item = self._filled.get()
+                if item is None:
+                    break
+                buf, length, first_t_us, last_t_us, buffer_keyframes = item
+                rotate = segment is None or (
+                    segment.bytes > 0
+                    and (
+                        segment.bytes + length > self.segment_max_bytes
+                        or (time.monotonic() - segment_opened) >= self.segment_max_s
+                    )
+                )
+                if rotate:
+                    if handle is not None:
+                        handle.close()
+                    segment = SegmentInfo(index=len(self.segments), file=segment_name(len(self.segments)), bytes=0)
+                    self.segments.append(segment)
+                    handle = open(self.output_dir / segment.file, "wb", buffering=0)
+                    handle.write(pack_segment_header(self.start_unix_ms, segment.index))
+                    segment_opened = time.monotonic()
+                assert handle is not None and segment is not None
+                base = SEGMENT_HEADER.size + segment.bytes
+                for t_us, offset in buffer_keyframes:
+                    self.keyframes.append((t_us, segment.index, base + offset))
+                handle.write(memoryview(buf)[:length])
+                segment.bytes += length
+                if segment.first_t_us is None:
+                    segment.first_t_us = first_t_us
+                segment.last_t_us = last_t_us
+                self._free.put(buf)
+        except OSError:
+            LOG.exception("Recorder %s failed writing to %s", self.session_id, self.output_dir)
+            # Keep draining so producers recycle buffers and the close() join returns.
+            while (item := self._filled.get()) is not None:
+                self._free.put(item[0])
+        finally:
+            if handle is not None:
+                handle.close()
+
+        self._manifest = self._write_manifest()
+        if self.catalog is not None:
+            try:
+                self.catalog.add_session(self._manifest, self.output_dir)
+            except (OSError, sqlite3.Error):
+                LOG.exception("Recorder %s failed updating the session catalog", self.session_id)
+
+    def _write_manifest(self) -> dict[str, Any]:
+        end_unix_ms = int(time.time() * 1000)
+        stats = self.stats
+        manifest = {
+            "session_id": self.session_id,
+            "start_unix_ms": self.start_unix_ms,
+            "end_unix_ms": end_unix_ms,
+            "duration_ms": max(0, end_unix_ms - self.start_unix_ms),
+            "records": stats.records,
+            "bytes": stats.bytes,
+            "dropped_records": stats.dropped_records,
+            "telemetry_packets": stats.telemetry_packets,
+            "alert_transitions": stats.alert_transitions,
+            "config_changes": stats.config_changes,
+            "events": stats.events,
+            "players": {str(pid): count for pid, count in sorted(stats.packets_by_player.items())},
+            "segments": [
+                {
+                    "index": segment.index,
+                    "file": segment.file,
+                    "bytes": segment.bytes,
+                    "first_t_us": segment.first_t_us,
+                    "last_t_us": segment.last_t_us,
+                }
+                for segment in self.segments
+            ],
+            "keyframes": [list(keyframe) for keyframe in self.keyframes],
+        }
+        path = self.output_dir / MANIFEST_NAME
+        try:
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            LOG.exception("Recorder %s failed writing its manifest", self.session_id)
+        return manifest
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any
+
+from .recfile import REC_ALERT, REC_CONFIG, REC_TELEMETRY, iter_records, read_segment_header
+
+if TYPE_CHECKING:
+    from .main import MatchCoordinator
+
+
+LOG = logging.getLogger("fdw.replay")
+
+MIN_SPEED = 0.25
+MAX_SPEED = 50.0
+# Source address given to replayed datagrams; replay coordinators have no UDP socket.
+REPLAY_ADDR = ("replay", 0)
+# Unpaced replays yield to the event loop this often so live traffic keeps flowing.
+YIELD_EVERY_RECORDS = 512
+# Paced replays only sleep when they are at least this far ahead of schedule.
+MIN_SLEEP_S = 0.002
+
+
+class VirtualClock:
+    """Millisecond clock advanced explicitly by the replay engine."""
+
+    __slots__ = ("ms",)
+
+    def __init__(self, start_ms: int = 0) -> None:
+        self.ms = start_ms
+
+    def now_ms(self) -> int:
+        return self.ms
+
+
+def parse_speed(value: Any) -> float | None:
+    """Validate a requested replay speed; None means as fast as possible."""
+    if value is None or value == "max" or value == 0:
+        return None
+    speed = float(value)
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"speed must be between {MIN_SPEED} and {MAX_SPEED}, or 'max'")
+    return speed
+
+
+class ReplayEngine:
+    """Feeds a recorded session through an isolated coordinator on a virtual clock.
+
+    Telemetry records go through the coordinator's normal UDP ingest, and the
+    world step, online flags and alert ticks run at their configured rates in
+    virtual time, so alert decisions are recomputed rather than read back.
+    Config overrides stay pinned even when the recording changes them.
+    """
+
+    def __init__(
+        self,
+        session: dict[str, Any],
+        coordinator: MatchCoordinator,
+        clock: VirtualClock,
+        speed: float | None = 1.0,
+        overrides: dict[str, Any] | None = None,
+    ) -> None:
+        self.session = session
+        self.coordinator = coordinator
+        self.clock = clock
+        self.speed = speed
+        self.overrides = dict(overrides or {})
+        self.coordinator.apply_config_updates(self.overrides)
+
+        self.state = "idle"
+        self.error: str | None = None
+        self.records = 0
+        self.telemetry_packets = 0
+        self.recorded_alert_transitions = 0
+        self.alert_transitions = 0
+        self.alert_transitions_by_player: dict[int, int] = {}
+        self._alert_state: dict[int, tuple[bool, int]] = {}
+        self._start_ms = 0
+        self._wall_started = 0.0
+        self._wall_finished: float | None = None
+        self._task: asyncio.Task | None = None
+
+        config = coordinator.config
+        self._sim_interval_ms = 1000.0 / config.world_update_hz
+        self._alert_interval_ms = 1000.0 / config.tick_hz
+        self._snapshot_interval_ms = 1000.0 / config.ws_hz
+        self._next_sim_ms = 0.0
+        self._next_alert_ms = 0.0
+        self._next_snapshot_ms = 0.0
+
+    @property
+    def session_id(self) -> str:
+        return self.session["session_id"]
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self.state = "running"
+        self._wall_started = time.monotonic()
+        self._task = asyncio.create_task(self.run(), name=f"replay-{self.session_id}")
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        output_dir = Path(self.session["output_dir"])
+        try:
+            started = False
+            for segment in self.session["segments"]:
+                data = await loop.run_in_executor(None, (output_dir / segment["file"]).read_bytes)
+                read_segment_header(data)
+                for _offset, rtype, player_id, t_us, payload in iter_records(data):
+                    t_ms = t_us // 1000
+                    if not started:
+                        started = True
+                        self._reset_schedule(t_ms)
+                    self._advance_to(t_ms)
+                    self._apply_record(rtype, player_id, payload)
+                    await self._pace(t_ms)
+            self._advance_to(self.clock.ms + self.coordinator.config.alert_hold_ms)
+            self.coordinator.publish_snapshot()
+            self.state = "finished"
+        except asyncio.CancelledError:
+            self.state = "stopped"
+            raise
+        except Exception as exc:
+            LOG.exception("Replay of %s failed", self.session_id)
+            self.state = "failed"
+            self.error = str(exc)
+        finally:
+            self._wall_finished = time.monotonic()
+            LOG.info(
+                "Replay of %s %s: %d records, %d alert transitions (%d recorded)",
+                self.session_id,
+                self.state,
+                self.records,
+                self.alert_transitions,
+                self.recorded_alert_transitions,
+            )
+
+    def _reset_schedule(self, t_ms: int) -> None:
+        self._start_ms = t_ms
+        self.clock.ms = t_ms
+        self._next_sim_ms = float(t_ms)
+        self._next_alert_ms = float(t_ms)
+        self._next_snapshot_ms = float(t_ms)
+        self._wall_started = time.monotonic()
+
+    def _advance_to(self, t_ms: int) -> None:
+        """Run every world step and alert tick that falls due before `t_ms`."""
+        coordinator = self.coordinator
+        paced = self.speed is not None
+        while True:
+            due = min(self._next_sim_ms, self._next_alert_ms)
+            if paced:
+                due = min(due, self._next_snapshot_ms)
+            if due > t_ms:
+                break
+            now_ms = int(due)
+            self.clock.ms = now_ms
+            if self._next_sim_ms <= due:
+                coordinator.world.step(self._sim_interval_ms / 1000.0)
+                coordinator.state.update_online_flags(now_ms)
+                self._next_sim_ms += self._sim_interval_ms
+            if self._next_alert_ms <= due:
+                if coordinator._run_alert_tick(now_ms):
+                    self._count_transitions()
+                self._next_alert_ms += self._alert_interval_ms
+            if paced and self._next_snapshot_ms <= due:
+                coordinator.publish_snapshot(now_ms)
+                self._next_snapshot_ms += self._snapshot_interval_ms
+        self.clock.ms = max(self.clock.ms, t_ms)
+
+    def _count_transitions(self) -> None:
+        for player_id, player in self.coordinator.state.players.items():
+            current = (player.alert_on, player.alert_intensity)
+            if self._alert_state.get(player_id, (False, 0)) != current:
+                self._alert_state[player_id] = current
+                self.alert_transitions += 1
+                self.alert_transitions_by_player[player_id] = self.alert_transitions_by_player.get(player_id, 0) + 1
+
+    def _apply_record(self, rtype: int, player_id: int, payload: memoryview) -> None:
+        self.records += 1
+        if rtype == REC_TELEMETRY:
+            self.telemetry_packets += 1
+            self.coordinator.handle_udp_packet(bytes(payload), REPLAY_ADDR)
+        elif rtype == REC_ALERT:
+            self.recorded_alert_transitions += 1
+        elif rtype == REC_CONFIG:
+            try:
+                recorded = json.loads(bytes(payload)).get("config", {})
+            except ValueError:
+                LOG.warning("Replay of %s: skipping unreadable config record", self.session_id)
+                return
+            updates = {key: value for key, value in recorded.items() if key not in self.overrides}
+            self.coordinator.apply_config_updates(updates)
+
+    async def _pace(self, t_ms: int) -> None:
+        if self.speed is None:
+            if self.records % YIELD_EVERY_RECORDS == 0:
+                await asyncio.sleep(0)
+            return
+        target = self._wall_started + ((t_ms - self._start_ms) / 1000.0) / self.speed
+        delay = target - time.monotonic()
+        if delay >= MIN_SLEEP_S:
+            await asyncio.sleep(delay)
+
+    def status(self) -> dict[str, Any]:
+        finished = self._wall_finished if self._wall_finished is not None else time.monotonic()
+        wall_ms = int((finished - self._wall_started) * 1000) if self.state != "idle" else 0
+        virtual_ms = max(0, self.clock.ms - self._start_ms)
+        duration_ms = int(self.session.get("duration_ms") or 0)
+        return {
+            "session_id": self.session_id,
+            "state": self.state,
+            "speed": "max" if self.speed is None else self.speed,
+            "overrides": self.overrides,
+            "virtual_ms": virtual_ms,
+            "wall_ms": wall_ms,
+            "effective_speed": round(virtual_ms / wall_ms, 2) if wall_ms > 0 else None,
+            "progress": round(min(1.0, virtual_ms / duration_ms), 4) if duration_ms > 0 else None,
+            "records": self.records,
+            "telemetry_packets": self.telemetry_packets,
+            "alert_transitions": self.alert_transitions,
+            "recorded_alert_transitions": self.recorded_alert_transitions,
+            "alert_transitions_by_player": {
+                str(player_id): count for player_id, count in sorted(self.alert_transitions_by_player.items())
+            },
+            "generation": self.coordinator.snapshots.generation,
+            "error": self.error,
+        }
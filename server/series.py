@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from array import array
+import math
+import sys
+from typing import Any
+
+
+SERIES_METRICS = ("packet_rate_hz", "drop_rate", "jitter_ms", "quality", "battery_mv")
+# (bucket width in seconds, buckets kept): 5 min at 1 s, 1 h at 10 s, 6 h at 60 s.
+SERIES_RESOLUTIONS = ((1, 300), (10, 360), (60, 360))
+
+_NAN = float("nan")
+# Every bucket stores min, mean and max for each metric.
+_STATS = 3
+_WIDTH = len(SERIES_METRICS) * _STATS
+
+
+class RollupRing:
+    """Fixed-capacity ring of buckets: a start time plus min/mean/max per metric."""
+
+    __slots__ = ("capacity", "_starts", "_values", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._starts = array("q", bytes(8 * capacity))
+        self._values = array("d", [_NAN]) * (capacity * _WIDTH)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._starts) + sys.getsizeof(self._values)
+
+    def push(self, start_ms: int, values: array) -> None:
+        slot = self._count % self.capacity
+        self._starts[slot] = start_ms
+        base = slot * _WIDTH
+        self._values[base : base + _WIDTH] = values
+        self._count += 1
+
+    def rows(self, since_ms: int | None = None) -> tuple[list[int], list[array]]:
+        """Bucket starts and value rows, oldest first."""
+        first = self._count - len(self)
+        starts: list[int] = []
+        rows: list[array] = []
+        for index in range(first, self._count):
+            slot = index % self.capacity
+            start = self._starts[slot]
+            if since_ms is not None and start < since_ms:
+                continue
+            starts.append(start)
+            rows.append(self._values[slot * _WIDTH : (slot + 1) * _WIDTH])
+        return starts, rows
+
+
+class _Rollup:
+    """Folds finished child buckets into one parent bucket (min of mins, mean of means, max of maxes)."""
+
+    __slots__ = ("start_ms", "_acc")
+
+    def __init__(self) -> None:
+        self.start_ms: int | None = None
+        # min, sum of means, max, count of non-empty child buckets, per metric.
+        self._acc = array("d", bytes(8 * 4 * len(SERIES_METRICS)))
+        self.reset(None)
+
+    def reset(self, start_ms: int | None) -> None:
+        self.start_ms = start_ms
+        acc = self._acc
+        for metric in range(len(SERIES_METRICS)):
+            base = metric * 4
+            acc[base] = math.inf
+            acc[base + 1] = 0.0
+            acc[base + 2] = -math.inf
+            acc[base + 3] = 0.0
+
+    def add(self, values: array) -> None:
+        acc = self._acc
+        for metric in range(len(SERIES_METRICS)):
+            mean = values[metric * _STATS + 1]
+            if mean != mean:  # empty child bucket
+                continue
+            base = metric * 4
+            acc[base] = min(acc[base], values[metric * _STATS])
+            acc[base + 1] += mean
+            acc[base + 2] = max(acc[base + 2], values[metric * _STATS + 2])
+            acc[base + 3] += 1.0
+
+    def values(self) -> array:
+        out = array("d", [_NAN]) * _WIDTH
+        acc = self._acc
+        for metric in range(len(SERIES_METRICS)):
+            base = metric * 4
+            if acc[base + 3] > 0:
+                out[metric * _STATS] = acc[base]
+                out[metric * _STATS + 1] = acc[base + 1] / acc[base + 3]
+                out[metric * _STATS + 2] = acc[base + 2]
+        return out
+
+
+class LinkSeries:
+    """Per-player link-quality history at 1 s, 10 s and 60 s resolution.
+
+    ingest() only updates the running 1 s bucket. A bucket is closed when a
+    packet (or a query) arrives in a later second; closed buckets cascade
+    into the 10 s and 60 s rollups. Seconds without packets are recorded as
+    a packet rate of 0 with the other metrics empty, so a silent link shows
+    up in the series. Memory is fixed at construction.
+    """
+
+    __slots__ = (
+        "rings",
+        "_rollups",
+        "_second",
+        "_packets",
+        "_dropped",
+        "_jitter",
+        "_quality",
+        "_battery",
+        "_prev_transit_ms",
+    )
+
+    def __init__(self) -> None:
+        self.rings = {width: RollupRing(capacity) for width, capacity in SERIES_RESOLUTIONS}
+        self._rollups = {width: _Rollup() for width, _capacity in SERIES_RESOLUTIONS[1:]}
+        self._second: int | None = None
+        self._packets = 0
+        self._dropped = 0
+        # min, sum, max, n
+        self._jitter = [math.inf, 0.0, -math.inf, 0]
+        self._quality = [math.inf, 0.0, -math.inf, 0]
+        self._battery = [math.inf, 0.0, -math.inf, 0]
+        self._prev_transit_ms: int | None = None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the rings and rollup accumulators."""
+        return sum(ring.nbytes for ring in self.rings.values()) + sum(
+            sys.getsizeof(rollup._acc) for rollup in self._rollups.values()
+        )
+
+    def ingest(self, now_ms: int, node_timestamp_ms: int, dropped: int, quality: int, battery_mv: int) -> None:
+        self.advance(now_ms)
+        if self._second is None:
+            self._second = now_ms // 1000
+        self._packets += 1
+        self._dropped += dropped
+        _accumulate(self._quality, quality)
+        if battery_mv > 0:
+            _accumulate(self._battery, battery_mv)
+        # RFC 3550 style: change in one-way transit between consecutive packets.
+        transit_ms = now_ms - node_timestamp_ms
+        if self._prev_transit_ms is not None:
+            _accumulate(self._jitter, abs(transit_ms - self._prev_transit_ms))
+        self._prev_transit_ms = transit_ms
+
+    def advance(self, now_ms: int) -> None:
+        """Close every 1 s bucket that ended before `now_ms`."""
+        second = self._second
+        if second is None or now_ms // 1000 <= second:
+            return
+        self._close_second(second)
+        last = now_ms // 1000
+        # Silent seconds in between; no more than the finest ring can hold.
+        gap_start = max(second + 1, last - self.rings[1].capacity)
+        for empty in range(gap_start, last):
+            self._close_second(empty)
+        self._second = last
+
+    def _close_second(self, second: int) -> None:
+        values = array("d", [_NAN]) * _WIDTH
+        packets = self._packets
+        values[0] = values[1] = values[2] = float(packets)
+        if packets:
+            rate = self._dropped / (packets + self._dropped)
+            values[3] = values[4] = values[5] = rate
+        for metric, acc in ((2, self._jitter), (3, self._quality), (4, self._battery)):
+            if acc[3]:
+                values[metric * _STATS] = acc[0]
+                values[metric * _STATS + 1] = acc[1] / acc[3]
+                values[metric * _STATS + 2] = acc[2]
+            acc[0], acc[1], acc[2], acc[3] = math.inf, 0.0, -math.inf, 0
+        self._packets = 0
+        self._dropped = 0
+        self._push(1, second * 1000, values)
+
+    def _push(self, width: int, start_ms: int, values: array) -> None:
+        self.rings[width].push(start_ms, values)
+        for parent_width, rollup in self._rollups.items():
+            if parent_width <= width or parent_width % width:
+                continue
+            parent_start = start_ms - start_ms % (parent_width * 1000)
+            if rollup.start_ms is not None and rollup.start_ms != parent_start:
+                finished_start = rollup.start_ms
+                finished = rollup.values()
+                rollup.reset(parent_start)
+                rollup.add(values)
+                self._push(parent_width, finished_start, finished)
+            else:
+                if rollup.start_ms is None:
+                    rollup.reset(parent_start)
+                rollup.add(values)
+            # Only cascade into the next coarser resolution.
+            break
+
+    def to_dict(self, resolution_s: int, since_ms: int | None = None) -> dict[str, Any]:
+        starts, rows = self.rings[resolution_s].rows(since_ms)
+        out: dict[str, Any] = {"t_ms": starts}
+        for metric, name in enumerate(SERIES_METRICS):
+            out[name] = {
+                stat: [_json_number(row[metric * _STATS + offset]) for row in rows]
+                for offset, stat in enumerate(("min", "mean", "max"))
+            }
+        return out
+
+
+def _accumulate(acc: list, value: float) -> None:
+    if value < acc[0]:
+        acc[0] = value
+    acc[1] += value
+    if value > acc[2]:
+        acc[2] = value
+    acc[3] += 1
+
+
+def _json_number(value: float) -> float | None:
+    return None if value != value else round(value, 3)
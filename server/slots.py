@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import heapq
+
+from .packet import MAX_PLAYER_ID
+
+
+class PlayerSlots:
+    """Player ids mapped to dense indices 0..n-1, with a free list of unused ids.
+
+    add() gives a new id the next dense index; remove() moves the last id
+    into the freed index so array-backed state can do the same swap and stay
+    packed. allocate_id() returns the lowest free id: released ids come back
+    through a min-heap, and fresh ids come from a counter. Ids a node claimed
+    on its own are skipped when they come up, so every operation is O(1)
+    amortized (O(log n) for the heap) instead of a scan of the id space.
+    """
+
+    __slots__ = ("max_id", "ids", "_index", "_released", "_next_fresh")
+
+    def __init__(self, max_id: int = MAX_PLAYER_ID) -> None:
+        self.max_id = max_id
+        self.ids: list[int] = []
+        self._index: dict[int, int] = {}
+        self._released: list[int] = []
+        self._next_fresh = 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._index
+
+    def index(self, player_id: int) -> int | None:
+        return self._index.get(player_id)
+
+    def add(self, player_id: int) -> int:
+        index = self._index.get(player_id)
+        if index is None:
+            index = len(self.ids)
+            self._index[player_id] = index
+            self.ids.append(player_id)
+        return index
+
+    def remove(self, player_id: int) -> tuple[int, int | None] | None:
+        """Free `player_id`; returns (its index, id moved into that index or None), or None if unknown."""
+        index = self._index.pop(player_id, None)
+        if index is None:
+            return None
+        last = self.ids.pop()
+        moved = None
+        if last != player_id:
+            self.ids[index] = last
+            self._index[last] = index
+            moved = last
+        if player_id < self._next_fresh:
+            heapq.heappush(self._released, player_id)
+        return index, moved
+
+    def allocate_id(self) -> int | None:
+        """Lowest id in 1..max_id not in use, or None when the id space is full. The id is not added."""
+        released = self._released
+        while released:
+            candidate = released[0]
+            if candidate in self._index:
+                heapq.heappop(released)  # claimed again by a node since it was released
+                continue
+            return candidate
+        while self._next_fresh <= self.max_id and self._next_fresh in self._index:
+            self._next_fresh += 1
+        if self._next_fresh > self.max_id:
+            return None
+        return self._next_fresh
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+
+@dataclass(frozen=True, slots=True)
+class WorldSnapshot:
+    generation: int
+    ts_ms: int
+    text: str
+    body: bytes
+    etag: str
+    players_online: int
+    players_total: int
+    # Serialized per-player entries keyed by player id, shared with `text`.
+    player_fragments: Mapping[int, str]
+    # Fragment version per player id; a player's entry keeps its ETag while its version holds.
+    player_versions: Mapping[int, int]
+
+
+class SnapshotStore:
+    """Holds the latest published world snapshot and wakes long-poll waiters."""
+
+    def __init__(self, instance_id: str) -> None:
+        self.instance_id = instance_id
+        self.generation = 0
+        self.latest: WorldSnapshot | None = None
+        self._published = asyncio.Event()
+
+    def publish(
+        self,
+        ts_ms: int,
+        text: str,
+        players_online: int,
+        player_fragments: dict[int, str],
+        player_versions: dict[int, int] | None = None,
+        content_version: int | None = None,
+    ) -> WorldSnapshot:
+        """Publish the next generation.
+
+        With `content_version` the ETag is a weak one that only changes with
+        it, so frames differing only in their clock fields share it.
+        """
+        self.generation += 1
+        if content_version is None:
+            etag = f'"ws-{self.instance_id}-{self.generation}"'
+        else:
+            etag = f'W/"ws-{self.instance_id}-c{content_version}"'
+
+        snapshot = WorldSnapshot(
+            generation=self.generation,
+            ts_ms=ts_ms,
+            text=text,
+            body=text.encode("utf-8"),
+            etag=etag,
+            players_online=players_online,
+            players_total=len(player_fragments),
+            player_fragments=MappingProxyType(player_fragments),
+            player_versions=MappingProxyType(player_versions or {}),
+        )
+        self.latest = snapshot
+        # Swap the event so waiters released now never observe a stale set flag.
+        published, self._published = self._published, asyncio.Event()
+        published.set()
+        return snapshot
+
+    def player_etag(self, snapshot: WorldSnapshot, player_id: int) -> str:
+        """Weak ETag of one player's entry; the per-frame age fields are not part of it."""
+        return f'W/"pl-{self.instance_id}-{player_id}-{snapshot.player_versions.get(player_id, 0)}"'
+
+    async def wait_after(self, generation: int, timeout_s: float) -> WorldSnapshot | None:
+        """Wait for a snapshot newer than `generation`; None on timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        while self.latest is None or self.latest.generation <= generation:
+            remaining = deadline - loop.time()
+            if remaining <= 0.0:
+                return None
+            try:
+                await asyncio.wait_for(self._published.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return self.latest
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+import json
+import math
+import sys
 from typing import Any
 
+import numpy as np
+
+from .clocksync import CLOCK_FIELDS_EMPTY, NodeClock
 from .config import CoordinatorConfig
+from .deadlines import DeadlineQueue
+from .events import (
+    EVENT_ALERT_OFF,
+    EVENT_ALERT_ON,
+    EVENT_LOW_BATTERY,
+    EVENT_PLAYER_EVICTED,
+    EVENT_PLAYER_OFFLINE,
+    EVENT_PLAYER_ONLINE,
+    EVENT_SEQ_DROP_BURST,
+    EventLog,
+)
+from .filters import KalmanBank
+from .geo import EnuProjection
 from .packet import TelemetryPacket
+from .series import LinkSeries
+from .slots import PlayerSlots
 from .world_sim import WorldSimulator
 
 
@@ -19,6 +41,8 @@ class PlayerState:
     quality: int = 0
     battery_mv: int = 0
     flags: int = 0
+    # Telemetry version the node sends; alerts go back in the matching format.
+    protocol_version: int = 0
 
     real_x_m: float | None = None
     real_y_m: float | None = None
@@ -27,6 +51,9 @@ class PlayerState:
     gps_lon_deg: float | None = None
     gps_alt_m: float | None = None
     gps_quality: int = 0
+    # Latest GPS fix in arena metres, projected in batches by PlayerRegistry.project_gps().
+    gps_x_m: float | None = None
+    gps_y_m: float | None = None
 
     last_seen_ms: int | None = None
     online: bool = False
@@ -34,12 +61,194 @@ class PlayerState:
     addr: tuple[str, int] | None = None
     packet_rate_hz: float = 0.0
     seq_drop_count: int = 0
+    low_battery: bool = False
 
     alert_on: bool = False
     alert_intensity: int = 0
     alert_hold_until_ms: int = 0
 
 
+# Battery must recover this far above low_battery_mv before another low_battery event.
+LOW_BATTERY_REARM_MV = 100
+
+# Field groups of the per-player world_state fragment. A group is rebuilt only
+# when one of its source fields changed since the previous snapshot.
+DIRTY_POSE = 0x01
+DIRTY_POSITION = 0x02
+DIRTY_GPS = 0x04
+DIRTY_LINK = 0x08
+DIRTY_ALERT = 0x10
+# The sim trail is kept apart from the field groups; it is spliced in as pre-serialized text.
+DIRTY_TRAIL = 0x20
+DIRTY_ALL = DIRTY_POSE | DIRTY_POSITION | DIRTY_GPS | DIRTY_LINK | DIRTY_ALERT | DIRTY_TRAIL
+
+_FRAGMENT_GROUPS = (DIRTY_POSITION, DIRTY_POSE, DIRTY_GPS, DIRTY_LINK, DIRTY_ALERT)
+
+
+@dataclass(slots=True)
+class PlayerFragment:
+    groups: dict[int, dict[str, Any]] = field(default_factory=dict)
+    payload: dict[str, Any] = field(default_factory=dict)
+    # Serialized payload without the closing brace, and the trail's JSON array.
+    head: str = ""
+    trail: str = "[]"
+    # head plus trail without the closing brace; the per-frame
+    # last_seen_ms_ago and sample_age_ms fields are appended when a snapshot is assembled.
+    prefix: str = ""
+    # Registry fragments_version at which `prefix` last changed.
+    version: int = 0
+
+
+HISTORY_CLOCKS = ("server", "node")
+
+
+class TelemetryHistory:
+    """Fixed-capacity ring of one player's telemetry samples in parallel arrays.
+
+    Samples are indexed by server receive time and by the node's own
+    timestamp_ms; both are non-decreasing within the ring, so lookups are a
+    binary search over logical indices. A node timestamp that goes backwards
+    means the node restarted, and the ring starts over. Appending writes
+    into preallocated arrays and allocates no per-sample objects.
+    """
+
+    __slots__ = (
+        "capacity",
+        "recv_ms",
+        "node_ms",
+        "yaw_deg",
+        "pitch_deg",
+        "roll_deg",
+        "x_m",
+        "y_m",
+        "quality",
+        "pos_quality",
+        "_count",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(2, capacity)
+        self.recv_ms = array("q", bytes(8 * self.capacity))
+        self.node_ms = array("q", bytes(8 * self.capacity))
+        self.yaw_deg = array("d", bytes(8 * self.capacity))
+        self.pitch_deg = array("d", bytes(8 * self.capacity))
+        self.roll_deg = array("d", bytes(8 * self.capacity))
+        # NaN where the sample carried no position.
+        self.x_m = array("d", bytes(8 * self.capacity))
+        self.y_m = array("d", bytes(8 * self.capacity))
+        self.quality = array("B", bytes(self.capacity))
+        self.pos_quality = array("B", bytes(self.capacity))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            sys.getsizeof(buf)
+            for buf in (
+                self.recv_ms,
+                self.node_ms,
+                self.yaw_deg,
+                self.pitch_deg,
+                self.roll_deg,
+                self.x_m,
+                self.y_m,
+                self.quality,
+                self.pos_quality,
+            )
+        )
+
+    def append(self, recv_ms: int, pkt: TelemetryPacket) -> None:
+        count = self._count
+        if count and pkt.timestamp_ms < self.node_ms[(count - 1) % self.capacity]:
+            count = 0
+        slot = count % self.capacity
+        self.recv_ms[slot] = recv_ms
+        self.node_ms[slot] = pkt.timestamp_ms
+        self.yaw_deg[slot] = pkt.yaw_deg
+        self.pitch_deg[slot] = pkt.pitch_deg
+        self.roll_deg[slot] = pkt.roll_deg
+        if pkt.pos_quality > 0:
+            self.x_m[slot] = pkt.pos_x_cm / 100.0
+            self.y_m[slot] = pkt.pos_y_cm / 100.0
+        else:
+            self.x_m[slot] = math.nan
+            self.y_m[slot] = math.nan
+        self.quality[slot] = pkt.quality
+        self.pos_quality[slot] = pkt.pos_quality
+        self._count = count + 1
+
+    def _slot(self, index: int) -> int:
+        return (self._count - len(self) + index) % self.capacity
+
+    def _bisect_right(self, times: array, t_ms: int) -> int:
+        """Logical index of the first sample with time > t_ms."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[self._slot(mid)] <= t_ms:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _times(self, clock: str) -> array:
+        if clock not in HISTORY_CLOCKS:
+            raise ValueError(f"clock must be one of {HISTORY_CLOCKS}")
+        return self.recv_ms if clock == "server" else self.node_ms
+
+    def interpolate(self, t_ms: float, clock: str = "server") -> dict[str, Any] | None:
+        """Sample at `t_ms`, linearly interpolated between its neighbours; None outside the ring."""
+        times = self._times(clock)
+        index = self._bisect_right(times, int(t_ms))
+        if index == 0:
+            return None
+        before = self._slot(index - 1)
+        if index == len(self):
+            if times[before] != t_ms:
+                return None
+            after = before
+        else:
+            after = self._slot(index)
+        span = times[after] - times[before]
+        frac = (t_ms - times[before]) / span if span > 0 else 0.0
+        nearest = after if frac >= 0.5 else before
+        x_m = self.x_m[before] + (self.x_m[after] - self.x_m[before]) * frac
+        y_m = self.y_m[before] + (self.y_m[after] - self.y_m[before]) * frac
+        if math.isnan(x_m) or math.isnan(y_m):
+            # Only one side has a position: use the nearest sample as is.
+            x_m, y_m = self.x_m[nearest], self.y_m[nearest]
+        yaw_step = (self.yaw_deg[after] - self.yaw_deg[before] + 180.0) % 360.0 - 180.0
+        return {
+            "recv_ms": self.recv_ms[before] + (self.recv_ms[after] - self.recv_ms[before]) * frac,
+            "node_ms": self.node_ms[before] + (self.node_ms[after] - self.node_ms[before]) * frac,
+            "yaw_deg": (self.yaw_deg[before] + yaw_step * frac) % 360.0,
+            "pitch_deg": self.pitch_deg[before] + (self.pitch_deg[after] - self.pitch_deg[before]) * frac,
+            "roll_deg": self.roll_deg[before] + (self.roll_deg[after] - self.roll_deg[before]) * frac,
+            "x_m": None if math.isnan(x_m) else x_m,
+            "y_m": None if math.isnan(y_m) else y_m,
+            "quality": self.quality[nearest],
+            "pos_quality": self.pos_quality[nearest],
+        }
+
+    def window(self, from_ms: int | None = None, to_ms: int | None = None, clock: str = "server") -> dict[str, list]:
+        """Samples with from_ms <= time <= to_ms as columns, oldest first."""
+        times = self._times(clock)
+        start = 0 if from_ms is None else self._bisect_right(times, from_ms - 1)
+        stop = len(self) if to_ms is None else self._bisect_right(times, to_ms)
+        slots = [self._slot(index) for index in range(start, stop)]
+        columns: dict[str, list] = {}
+        for name in ("recv_ms", "node_ms", "yaw_deg", "pitch_deg", "roll_deg", "quality", "pos_quality"):
+            values = getattr(self, name)
+            columns[name] = [values[slot] for slot in slots]
+        for name in ("x_m", "y_m"):
+            values = getattr(self, name)
+            columns[name] = [None if math.isnan(values[slot]) else values[slot] for slot in slots]
+        return columns
+
+
 @dataclass(slots=True)
 class LogicPlayer:
     player_id: int
@@ -51,10 +260,41 @@ class LogicPlayer:
 
 
 class PlayerRegistry:
-    def __init__(self, config: CoordinatorConfig, world: WorldSimulator) -> None:
+    def __init__(self, config: CoordinatorConfig, world: WorldSimulator, events: EventLog | None = None) -> None:
         self.config = config
         self.world = world
+        self.events = events
+        # Link-quality rollups of players that have sent real telemetry.
+        self.series: dict[int, LinkSeries] = {}
+        self.history: dict[int, TelemetryHistory] = {}
+        self.clocks: dict[int, NodeClock] = {}
+        self.filters = KalmanBank()
         self.players: dict[int, PlayerState] = {}
+        # Dense index per player id and the free list that sim players are allocated from.
+        self.slots = PlayerSlots()
+        # Players that have never sent telemetry; only these need per-tick emulation.
+        self._sim_ids: set[int] = set()
+        # Link timeouts, alert holds and evictions are only visited when they fall due.
+        self.offline_deadlines = DeadlineQueue()
+        # offline_timeout_ms and player_ttl_ms the queued deadlines were armed with.
+        self._offline_timeout_ms = config.offline_timeout_ms
+        self._player_ttl_ms = config.player_ttl_ms
+        # Whether sim heartbeats were being emulated at the previous update_online_flags.
+        self._emulating = False
+        self.hold_deadlines = DeadlineQueue()
+        self.evict_deadlines = DeadlineQueue()
+        self.evicted_total = 0
+        # Telemetry dropped because it named a new id while at max_players.
+        self.rejected_packets = 0
+        # Players whose GPS fix changed since the last projection pass.
+        self._gps_pending: set[int] = set()
+        self._projection: EnuProjection | None = None
+        self._projection_key: tuple[Any, ...] | None = None
+        self._dirty: dict[int, int] = {}
+        self._fragments: dict[int, PlayerFragment] = {}
+        self._sorted_ids: list[int] | None = None
+        # Bumped whenever a cached fragment's prefix or the set of players changes.
+        self.fragments_version = 0
         for pid in config.default_player_ids:
             self.ensure_player(pid)
 
@@ -65,16 +305,53 @@ class PlayerRegistry:
             return player
         player = PlayerState(player_id=player_id)
         self.players[player_id] = player
+        self.slots.add(player_id)
+        self._sim_ids.add(player_id)
         self.world.ensure_player(player_id)
+        self._dirty[player_id] = DIRTY_ALL
+        self._sorted_ids = None
+        self.fragments_version += 1
         return player
 
+    def memory_stats(self) -> dict[str, dict[str, int]]:
+        """Per-subsystem entry counts and bytes, summed from the structures each player holds."""
+        players = self.players
+        fragments = self._fragments
+        deadlines = (self.offline_deadlines, self.hold_deadlines, self.evict_deadlines)
+        return {
+            "players": {
+                "count": len(players),
+                "bytes": sys.getsizeof(players) + sum(sys.getsizeof(player) for player in players.values()),
+            },
+            "fragments": {
+                "count": len(fragments),
+                "bytes": sys.getsizeof(fragments)
+                + sum(
+                    sys.getsizeof(fragment.head) + sys.getsizeof(fragment.trail) + sys.getsizeof(fragment.prefix)
+                    for fragment in fragments.values()
+                ),
+            },
+            "history": {"count": len(self.history), "bytes": sum(item.nbytes for item in self.history.values())},
+            "series": {"count": len(self.series), "bytes": sum(item.nbytes for item in self.series.values())},
+            "clocks": {"count": len(self.clocks), "bytes": sum(item.nbytes for item in self.clocks.values())},
+            "filters": {"count": len(self.filters), "bytes": self.filters.nbytes},
+            "deadlines": {"count": sum(len(queue) for queue in deadlines), "bytes": sum(q.nbytes for q in deadlines)},
+            "world": self.world.memory_stats(),
+        }
+
+    def mark_dirty(self, player_id: int, groups: int) -> None:
+        self._dirty[player_id] = self._dirty.get(player_id, 0) | groups
+
+    def mark_all_dirty(self, groups: int = DIRTY_ALL) -> None:
+        for player_id in self.players:
+            self.mark_dirty(player_id, groups)
+
     def next_available_player_id(self) -> int | None:
-        for candidate in range(1, 256):
-            if candidate not in self.players:
-                return candidate
-        return None
+        return self.slots.allocate_id()
 
     def add_sim_player(self) -> int | None:
+        if len(self.players) >= self.config.max_players:
+            return None
         player_id = self.next_available_player_id()
         if player_id is None:
             return None
@@ -82,24 +359,57 @@ class PlayerRegistry:
         return player_id
 
     def remove_sim_player(self) -> int | None:
-        removable_ids = [
-            player_id
-            for player_id, player in self.players.items()
-            if player.addr is None
-        ]
-        if not removable_ids:
+        if not self._sim_ids:
             return None
 
-        player_id = max(removable_ids)
+        player_id = max(self._sim_ids)
+        self._drop_player(player_id)
+        return player_id
+
+    def _drop_player(self, player_id: int) -> None:
+        """Forget a player and release everything held for it, including its sim body and trail."""
         self.players.pop(player_id, None)
+        self.slots.remove(player_id)
+        self._dirty.pop(player_id, None)
+        self._fragments.pop(player_id, None)
+        self.series.pop(player_id, None)
+        self.history.pop(player_id, None)
+        self.clocks.pop(player_id, None)
+        self.filters.remove(player_id)
+        self._sim_ids.discard(player_id)
+        self._gps_pending.discard(player_id)
+        self.offline_deadlines.cancel(player_id)
+        self.hold_deadlines.cancel(player_id)
+        self.evict_deadlines.cancel(player_id)
+        self._sorted_ids = None
+        self.fragments_version += 1
         self.world.remove_player(player_id)
-        return player_id
 
-    def ingest_telemetry(self, pkt: TelemetryPacket, addr: tuple[str, int], now_ms: int) -> None:
-        player = self.ensure_player(pkt.player_id)
+    def ingest_telemetry(self, pkt: TelemetryPacket, addr: tuple[str, int] | None, now_ms: int) -> bool:
+        """Apply one telemetry packet; False when it names a new player while at max_players.
+
+        `addr` is where alerts for the player go, None when it has no return path.
+        """
+        player = self.players.get(pkt.player_id)
+        if player is None:
+            if len(self.players) >= self.config.max_players:
+                self.rejected_packets += 1
+                return False
+            player = self.ensure_player(pkt.player_id)
         prev_seq = player.seq
         prev_seen_ms = player.last_seen_ms
         was_online = player.online
+        dirty = DIRTY_POSE | DIRTY_LINK
+        if (
+            pkt.gps_quality != player.gps_quality
+            or pkt.gps_lat_deg != player.gps_lat_deg
+            or pkt.gps_lon_deg != player.gps_lon_deg
+            or pkt.gps_alt_m != player.gps_alt_m
+        ):
+            dirty |= DIRTY_GPS | DIRTY_POSITION
+            self._gps_pending.add(pkt.player_id)
+        if pkt.pos_quality > 0 or pkt.pos_quality != player.pos_quality:
+            dirty |= DIRTY_POSITION
 
         if prev_seen_ms is not None:
             dt_ms = max(0, now_ms - prev_seen_ms)
@@ -110,10 +420,45 @@ class PlayerRegistry:
                 else:
                     player.packet_rate_hz = (player.packet_rate_hz * 0.8) + (instant_rate_hz * 0.2)
 
+        events = self.events
+        dropped = 0
         if prev_seen_ms is not None:
             seq_delta = (pkt.seq - prev_seq) & 0xFFFF
             if 1 < seq_delta < 0x8000:
-                player.seq_drop_count += seq_delta - 1
+                dropped = seq_delta - 1
+                player.seq_drop_count += dropped
+                if events is not None and seq_delta - 1 >= self.config.seq_drop_burst:
+                    events.emit(
+                        EVENT_SEQ_DROP_BURST,
+                        "warn",
+                        player.player_id,
+                        details={"dropped": seq_delta - 1, "from_seq": prev_seq, "to_seq": pkt.seq},
+                    )
+
+        if events is not None and pkt.battery_mv > 0:
+            if not player.low_battery and pkt.battery_mv < self.config.low_battery_mv:
+                player.low_battery = True
+                events.emit(EVENT_LOW_BATTERY, "warn", player.player_id, details={"battery_mv": pkt.battery_mv})
+            elif player.low_battery and pkt.battery_mv >= self.config.low_battery_mv + LOW_BATTERY_REARM_MV:
+                player.low_battery = False
+
+        series = self.series.get(player.player_id)
+        if series is None:
+            series = self.series[player.player_id] = LinkSeries()
+        series.ingest(now_ms, pkt.timestamp_ms, dropped, pkt.quality, pkt.battery_mv)
+        history = self.history.get(player.player_id)
+        if history is None:
+            history = self.history[player.player_id] = TelemetryHistory(self.config.history_samples)
+        history.append(now_ms, pkt)
+        clock = self.clocks.get(player.player_id)
+        if clock is None:
+            clock = self.clocks[player.player_id] = NodeClock()
+        clock.observe(now_ms, pkt.timestamp_ms)
+        if self.config.alert_filter:
+            has_position = pkt.pos_quality > 0 and pkt.pos_quality >= self.config.pos_quality_threshold
+            position = (pkt.pos_x_cm / 100.0, pkt.pos_y_cm / 100.0) if has_position else None
+            # Date the measurement by when it was taken, not when a slow path delivered it.
+            self.filters.update(player.player_id, now_ms - clock.excess_ms, pkt.yaw_deg, position)
 
         player.seq = pkt.seq
         player.timestamp_ms = pkt.timestamp_ms
@@ -123,6 +468,7 @@ class PlayerRegistry:
         player.quality = pkt.quality
         player.battery_mv = pkt.battery_mv
         player.flags = pkt.flags
+        player.protocol_version = pkt.version
         player.pos_quality = pkt.pos_quality
         player.gps_lat_deg = pkt.gps_lat_deg
         player.gps_lon_deg = pkt.gps_lon_deg
@@ -133,60 +479,210 @@ class PlayerRegistry:
         if (player.connected_since_ms is None) or (not was_online):
             player.connected_since_ms = now_ms
         player.addr = addr
+        self._sim_ids.discard(player.player_id)
+        # Offline once more than offline_timeout_ms has passed without telemetry.
+        self.offline_deadlines.arm(player.player_id, now_ms + self.config.offline_timeout_ms + 1)
+        self.evict_deadlines.cancel(player.player_id)
+        if events is not None and not was_online:
+            events.emit(EVENT_PLAYER_ONLINE, "info", player.player_id, reason="telemetry")
 
         if pkt.pos_quality > 0:
             player.real_x_m = pkt.pos_x_cm / 100.0
             player.real_y_m = pkt.pos_y_cm / 100.0
 
+        self.mark_dirty(player.player_id, dirty)
+        return True
+
+    def ingest_batch(self, packets: list[TelemetryPacket], addr: tuple[str, int] | None, now_ms: int) -> int:
+        """Apply packets a gateway forwarded together, all received at `now_ms`; returns how many were accepted."""
+        accepted = 0
+        ingest = self.ingest_telemetry
+        for pkt in packets:
+            accepted += ingest(pkt, addr, now_ms)
+        return accepted
+
     def update_online_flags(self, now_ms: int) -> None:
-        timeout = self.config.offline_timeout_ms
-        for player in self.players.values():
-            was_online = player.online
-            if self.config.sim_players_emulate_real and player.addr is None:
+        """Emulate sim heartbeats, take timed-out players offline and drop real players offline past player_ttl_ms.
+
+        While emulation is on, sim players' offline deadlines are ignored rather
+        than re-armed every tick; switching it off arms them once. A changed
+        offline_timeout_ms or player_ttl_ms re-arms the queued deadlines.
+        """
+        timeout_ms = self.config.offline_timeout_ms
+        if timeout_ms != self._offline_timeout_ms:
+            # Queued deadlines still reflect the old timeout; move every online player to the new one.
+            self._offline_timeout_ms = timeout_ms
+            for player_id, player in self.players.items():
+                if player.online and player.last_seen_ms is not None and player_id in self.offline_deadlines:
+                    self.offline_deadlines.arm(player_id, player.last_seen_ms + timeout_ms + 1)
+        ttl_ms = self.config.player_ttl_ms
+        if ttl_ms != self._player_ttl_ms:
+            # Likewise for evictions: re-arm every offline real player under the new TTL, or none when it is 0.
+            self._player_ttl_ms = ttl_ms
+            for player_id, player in self.players.items():
+                if player.online or player.last_seen_ms is None or player_id in self._sim_ids:
+                    continue
+                if ttl_ms > 0:
+                    self.evict_deadlines.arm(player_id, player.last_seen_ms + ttl_ms)
+                else:
+                    self.evict_deadlines.cancel(player_id)
+        emulate = self.config.sim_players_emulate_real
+        if emulate != self._emulating:
+            self._emulating = emulate
+            if not emulate:
+                # Emulated players time out like real ones once emulation is switched off.
+                for player_id in self._sim_ids:
+                    player = self.players[player_id]
+                    if player.online and player.last_seen_ms is not None:
+                        self.offline_deadlines.arm(player_id, player.last_seen_ms + timeout_ms + 1)
+        if emulate:
+            for player_id in self._sim_ids:
+                player = self.players[player_id]
+                prev_link = (player.online, player.connected_since_ms, player.packet_rate_hz)
                 player.last_seen_ms = now_ms
                 player.online = True
-                if (player.connected_since_ms is None) or (not was_online):
+                if (player.connected_since_ms is None) or (not prev_link[0]):
                     player.connected_since_ms = now_ms
                 if self.config.world_update_hz > 0.0:
                     player.packet_rate_hz = self.config.world_update_hz
+                if prev_link != (player.online, player.connected_since_ms, player.packet_rate_hz):
+                    self.mark_dirty(player_id, DIRTY_LINK)
+                    if self.events is not None and not prev_link[0]:
+                        self.events.emit(EVENT_PLAYER_ONLINE, "info", player_id, reason="sim")
+
+        for player_id in self.offline_deadlines.expire(now_ms):
+            player = self.players.get(player_id)
+            if player is None or not player.online or (emulate and player_id in self._sim_ids):
+                continue
+            player.online = False
+            player.connected_since_ms = None
+            self.mark_dirty(player_id, DIRTY_LINK)
+            if player_id not in self._sim_ids and self.config.player_ttl_ms > 0:
+                self.evict_deadlines.arm(player_id, player.last_seen_ms + self.config.player_ttl_ms)
+            if self.events is not None:
+                self.events.emit(EVENT_PLAYER_OFFLINE, "warn", player_id, reason="timeout")
+
+        for player_id in self.evict_deadlines.expire(now_ms):
+            player = self.players.get(player_id)
+            if player is None or player.online or ttl_ms <= 0:
                 continue
-            if player.last_seen_ms is None:
-                player.online = False
-                player.connected_since_ms = None
+            # A deadline armed under a shorter TTL may still be queued after the TTL was raised.
+            due_ms = player.last_seen_ms + ttl_ms
+            if due_ms > now_ms:
+                self.evict_deadlines.arm(player_id, due_ms)
                 continue
-            player.online = (now_ms - player.last_seen_ms) <= timeout
-            if was_online and not player.online:
-                player.connected_since_ms = None
+            self._drop_player(player_id)
+            self.evicted_total += 1
+            if self.events is not None:
+                self.events.emit(
+                    EVENT_PLAYER_EVICTED, "info", player_id, details={"offline_ms": now_ms - player.last_seen_ms}
+                )
 
     def _has_valid_real_position(self, player: PlayerState) -> bool:
         if player.real_x_m is None or player.real_y_m is None:
             return False
         return player.pos_quality >= self.config.pos_quality_threshold
 
+    def _gps_position(self, player: PlayerState) -> tuple[float, float] | None:
+        if player.gps_x_m is None or player.gps_y_m is None:
+            return None
+        if player.gps_quality <= 0 or player.gps_quality < self.config.gps_quality_threshold:
+            return None
+        return (player.gps_x_m, player.gps_y_m)
+
+    def project_gps(self) -> int:
+        """Project every GPS fix that changed since the last call in one pass; returns the count.
+
+        A changed arena origin or rotation rebuilds the projection and
+        re-projects every player with a fix.
+        """
+        config = self.config
+        key = (
+            config.arena_origin_lat_deg,
+            config.arena_origin_lon_deg,
+            config.arena_origin_alt_m,
+            config.arena_rotation_deg,
+        )
+        if key != self._projection_key:
+            self._projection_key = key
+            self._projection = None
+            if config.arena_origin_lat_deg is not None and config.arena_origin_lon_deg is not None:
+                self._projection = EnuProjection(*key)
+            for player_id, player in self.players.items():
+                if player.gps_lat_deg is not None or player.gps_x_m is not None:
+                    self._gps_pending.add(player_id)
+                    self.mark_dirty(player_id, DIRTY_POSITION)
+        if not self._gps_pending:
+            return 0
+
+        pending, self._gps_pending = self._gps_pending, set()
+        fixes: list[PlayerState] = []
+        for player_id in pending:
+            player = self.players.get(player_id)
+            if player is None:
+                continue
+            if self._projection is None or player.gps_lat_deg is None or player.gps_lon_deg is None:
+                player.gps_x_m = player.gps_y_m = None
+            else:
+                fixes.append(player)
+        if fixes:
+            origin_alt = config.arena_origin_alt_m
+            x, y = self._projection.project(
+                np.array([player.gps_lat_deg for player in fixes]),
+                np.array([player.gps_lon_deg for player in fixes]),
+                np.array([origin_alt if player.gps_alt_m is None else player.gps_alt_m for player in fixes]),
+            )
+            for player, x_m, y_m in zip(fixes, x.tolist(), y.tolist()):
+                player.gps_x_m = x_m
+                player.gps_y_m = y_m
+        return len(fixes)
+
     def display_position(self, player: PlayerState) -> tuple[tuple[float, float], str]:
+        """Position and its source for the UI: UWB, then a good GPS fix, then the simulator."""
         if self._has_valid_real_position(player):
             return (player.real_x_m or 0.0, player.real_y_m or 0.0), "real"
+        gps = self._gps_position(player)
+        if gps is not None:
+            return gps, "gps"
 
         sim = self.world.ensure_player(player.player_id)
         return (sim.x_m, sim.y_m), "sim"
 
+    def _shows_sim_position(self, player: PlayerState) -> bool:
+        return not self._has_valid_real_position(player) and self._gps_position(player) is None
+
     def logic_position(self, player: PlayerState) -> tuple[float, float] | None:
         if self._has_valid_real_position(player):
             return (player.real_x_m or 0.0, player.real_y_m or 0.0)
+        gps = self._gps_position(player)
+        if gps is not None:
+            return gps
         if self.config.use_sim_positions:
             sim = self.world.ensure_player(player.player_id)
             return (sim.x_m, sim.y_m)
         return None
 
-    def build_logic_players(self) -> dict[int, LogicPlayer]:
+    def build_logic_players(self, now_ms: int | None = None) -> dict[int, LogicPlayer]:
+        """Alert inputs per player; with alert_filter, real telemetry is replaced by filter predictions at now_ms."""
+        self.project_gps()
+        estimates: dict[int, tuple[float, float, float, bool]] = {}
+        if self.config.alert_filter and now_ms is not None:
+            estimates = self.filters.predict(now_ms, self.config.alert_filter_max_predict_ms)
         out: dict[int, LogicPlayer] = {}
         for player_id, player in self.players.items():
+            yaw_deg = player.yaw_deg
+            position = self.logic_position(player)
+            estimate = estimates.get(player_id)
+            if estimate is not None:
+                yaw_deg = estimate[2]
+                if estimate[3] and self._has_valid_real_position(player):
+                    position = (estimate[0], estimate[1])
             out[player_id] = LogicPlayer(
                 player_id=player_id,
-                yaw_deg=player.yaw_deg,
+                yaw_deg=yaw_deg,
                 quality=player.quality,
                 online=player.online,
-                position=self.logic_position(player),
+                position=position,
                 addr=player.addr,
             )
         return out
@@ -205,65 +701,186 @@ class PlayerRegistry:
         if player.alert_on:
             if inside_on:
                 player.alert_hold_until_ms = now_ms + self.config.alert_hold_ms
+                self.hold_deadlines.arm(player_id, player.alert_hold_until_ms)
                 player.alert_intensity = intensity
-            elif (not inside_off) or (now_ms >= player.alert_hold_until_ms):
+            elif not inside_off:
                 player.alert_on = False
                 player.alert_intensity = 0
             else:
+                # Held on in the hysteresis band until expire_alert_holds() releases it.
                 player.alert_intensity = max(player.alert_intensity, 64)
         elif inside_on:
             player.alert_on = True
             player.alert_intensity = intensity
             player.alert_hold_until_ms = now_ms + self.config.alert_hold_ms
-
-        return prev_state != (player.alert_on, player.alert_intensity)
-
-    def world_state_message(self, now_ms: int) -> dict[str, Any]:
-        players_payload: list[dict[str, Any]] = []
-
-        for player_id in sorted(self.players):
-            player = self.players[player_id]
+            self.hold_deadlines.arm(player_id, player.alert_hold_until_ms)
+
+        changed = prev_state != (player.alert_on, player.alert_intensity)
+        if changed:
+            self.mark_dirty(player_id, DIRTY_ALERT)
+            if self.events is not None and prev_state[0] != player.alert_on:
+                if player.alert_on:
+                    self.events.emit(EVENT_ALERT_ON, "warn", player_id, details={"intensity": player.alert_intensity})
+                else:
+                    self.events.emit(EVENT_ALERT_OFF, "info", player_id)
+        return changed
+
+    def expire_alert_holds(self, now_ms: int) -> list[int]:
+        """Switch off alerts whose hold ran out without the target re-entering the cone; returns their ids.
+
+        Run after the tick's hysteresis updates, which re-arm the hold of every
+        player still inside the on-cone.
+        """
+        released: list[int] = []
+        for player_id in self.hold_deadlines.expire(now_ms):
+            player = self.players.get(player_id)
+            if player is None or not player.alert_on:
+                continue
+            player.alert_on = False
+            player.alert_intensity = 0
+            self.mark_dirty(player_id, DIRTY_ALERT)
+            if self.events is not None:
+                self.events.emit(EVENT_ALERT_OFF, "info", player_id)
+            released.append(player_id)
+        return released
+
+    def _build_group(self, player: PlayerState, group: int) -> dict[str, Any]:
+        if group == DIRTY_POSITION:
             (x_m, y_m), pos_source = self.display_position(player)
-            sim_player = self.world.ensure_player(player_id)
-            trail = [[round(px, 3), round(py, 3)] for px, py in sim_player.trail]
-            last_seen_ms_ago = None if player.last_seen_ms is None else max(0, now_ms - player.last_seen_ms)
+            return {
+                "x_m": round(x_m, 3),
+                "y_m": round(y_m, 3),
+                "pos_source": pos_source,
+                "pos_quality": player.pos_quality,
+            }
+        if group == DIRTY_POSE:
+            return {
+                "yaw_deg": round(player.yaw_deg, 2),
+                "pitch_deg": round(player.pitch_deg, 2),
+                "roll_deg": round(player.roll_deg, 2),
+                "quality": player.quality,
+            }
+        if group == DIRTY_GPS:
+            return {
+                "gps_lat_deg": None if player.gps_lat_deg is None else round(player.gps_lat_deg, 7),
+                "gps_lon_deg": None if player.gps_lon_deg is None else round(player.gps_lon_deg, 7),
+                "gps_alt_m": None if player.gps_alt_m is None else round(player.gps_alt_m, 2),
+                "gps_quality": player.gps_quality,
+            }
+        if group == DIRTY_LINK:
+            clock = self.clocks.get(player.player_id)
+            return {
+                "online": player.online,
+                "battery_mv": player.battery_mv,
+                "battery_v": round(player.battery_mv / 1000.0, 2) if player.battery_mv > 0 else None,
+                "packet_rate_hz": round(player.packet_rate_hz, 2),
+                "seq_drop_count": player.seq_drop_count,
+                "connected_since_ms": player.connected_since_ms,
+                "addr": None if player.addr is None else f"{player.addr[0]}:{player.addr[1]}",
+                **(clock.to_dict() if clock is not None else CLOCK_FIELDS_EMPTY),
+            }
+        return {
+            "alert": player.alert_on,
+            "alert_intensity": player.alert_intensity,
+        }
 
-            players_payload.append(
-                {
-                    "id": player_id,
-                    "x_m": round(x_m, 3),
-                    "y_m": round(y_m, 3),
-                    "yaw_deg": round(player.yaw_deg, 2),
-                    "pitch_deg": round(player.pitch_deg, 2),
-                    "roll_deg": round(player.roll_deg, 2),
-                    "quality": player.quality,
-                    "online": player.online,
-                    "alert": player.alert_on,
-                    "alert_intensity": player.alert_intensity,
-                    "pos_source": pos_source,
-                    "pos_quality": player.pos_quality,
-                    "gps_lat_deg": None if player.gps_lat_deg is None else round(player.gps_lat_deg, 7),
-                    "gps_lon_deg": None if player.gps_lon_deg is None else round(player.gps_lon_deg, 7),
-                    "gps_alt_m": None if player.gps_alt_m is None else round(player.gps_alt_m, 2),
-                    "gps_quality": player.gps_quality,
-                    "battery_mv": player.battery_mv,
-                    "battery_v": round(player.battery_mv / 1000.0, 2) if player.battery_mv > 0 else None,
-                    "packet_rate_hz": round(player.packet_rate_hz, 2),
-                    "seq_drop_count": player.seq_drop_count,
-                    "connected_since_ms": player.connected_since_ms,
-                    "addr": None if player.addr is None else f"{player.addr[0]}:{player.addr[1]}",
-                    "trail": trail,
-                    "last_seen_ms_ago": last_seen_ms_ago,
-                }
-            )
+    def refresh_fragments(self) -> int:
+        """Rebuild the cached fragments of players that changed; returns the rebuild count."""
+        self.project_gps()
+        for player_id in self.world.drain_moved():
+            player = self.players.get(player_id)
+            # A sim twin's moves only matter to players whose shown position comes from it.
+            if player is not None and self._shows_sim_position(player):
+                self.mark_dirty(player_id, DIRTY_POSITION | DIRTY_TRAIL)
+        if not self._dirty:
+            return 0
+
+        dirty = self._dirty
+        self._dirty = {}
+        for player_id, groups in dirty.items():
+            player = self.players.get(player_id)
+            if player is None:
+                continue
+            fragment = self._fragments.get(player_id)
+            if fragment is None:
+                fragment = PlayerFragment()
+                self._fragments[player_id] = fragment
+                groups = DIRTY_ALL
+            if groups & ~DIRTY_TRAIL:
+                for group in _FRAGMENT_GROUPS:
+                    if groups & group:
+                        fragment.groups[group] = self._build_group(player, group)
+                payload: dict[str, Any] = {"id": player_id}
+                for group in _FRAGMENT_GROUPS:
+                    payload.update(fragment.groups[group])
+                fragment.payload = payload
+                fragment.head = json.dumps(payload, separators=(",", ":"))[:-1]
+            if groups & DIRTY_TRAIL:
+                fragment.trail = self.world.ensure_player(player_id).trail_json()
+            prefix = f'{fragment.head},"trail":{fragment.trail}'
+            if prefix != fragment.prefix:
+                self.fragments_version += 1
+                fragment.prefix = prefix
+                fragment.version = self.fragments_version
+        return len(dirty)
+
+    def fragment_versions(self) -> dict[int, int]:
+        """Version of each cached fragment, keyed by player id."""
+        return {player_id: fragment.version for player_id, fragment in self._fragments.items()}
+
+    def sorted_player_ids(self) -> list[int]:
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self.players)
+        return self._sorted_ids
+
+    def player_fragments_json(self, now_ms: int) -> list[str]:
+        """Serialized player entries for a world_state frame, in id order."""
+        self.refresh_fragments()
+        out: list[str] = []
+        for player_id in self.sorted_player_ids():
+            last_seen_ms = self.players[player_id].last_seen_ms
+            if last_seen_ms is None:
+                out.append(self._fragments[player_id].prefix + ',"last_seen_ms_ago":null,"sample_age_ms":null}')
+            else:
+                ago = max(0, now_ms - last_seen_ms)
+                age = self._sample_age_ms(player_id, ago)
+                out.append(f'{self._fragments[player_id].prefix},"last_seen_ms_ago":{ago},"sample_age_ms":{age}}}')
+        return out
 
+    def _sample_age_ms(self, player_id: int, last_seen_ms_ago: int) -> int:
+        """Age of the latest sample: time since it arrived plus how late its path was."""
+        clock = self.clocks.get(player_id)
+        if clock is None:
+            return last_seen_ms_ago
+        return last_seen_ms_ago + int(round(clock.excess_ms))
+
+    def world_state_envelope(self, now_ms: int) -> dict[str, Any]:
         return {
             "type": "world_state",
             "ts_ms": now_ms,
-            "players": players_payload,
-            "config": self.config.to_dict(),
+            "config_version": self.config.version,
             "arena": {
                 "width_m": self.world.arena_width_m,
                 "height_m": self.world.arena_height_m,
             },
         }
+
+    def world_state_message(self, now_ms: int) -> dict[str, Any]:
+        self.refresh_fragments()
+        players_payload: list[dict[str, Any]] = []
+
+        for player_id in self.sorted_player_ids():
+            player = self.players[player_id]
+            last_seen_ms_ago = None if player.last_seen_ms is None else max(0, now_ms - player.last_seen_ms)
+            fragment = self._fragments[player_id]
+            entry = dict(fragment.payload)
+            entry["trail"] = json.loads(fragment.trail)
+            entry["last_seen_ms_ago"] = last_seen_ms_ago
+            entry["sample_age_ms"] = (
+                None if last_seen_ms_ago is None else self._sample_age_ms(player_id, last_seen_ms_ago)
+            )
+            players_payload.append(entry)
+
+        message = self.world_state_envelope(now_ms)
+        message["players"] = players_payload
+        return message
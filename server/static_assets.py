@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gzip
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path
+import re
+
+from aiohttp import web
+
+try:  # Brotli is optional; gzip is always available.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+LOG = logging.getLogger("fdw.static")
+
+# Vite emits `assets/name-<8 char hash>.<ext>`; such files never change under the same URL.
+# Only the build's asset directory is considered, and the hash must contain a
+# digit so words such as `app-settings.json` are not taken for one. A hash
+# that happens to have no digit is merely revalidated.
+VITE_ASSETS_DIR = "assets"
+HASHED_NAME_RE = re.compile(r"-(?=[A-Za-z0-9_-]{0,7}[0-9])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".html", ".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt", ".xml", ".ico", ".wasm"}
+)
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True, slots=True)
+class StaticAsset:
+    path: str
+    content_type: str
+    etag: str
+    cache_control: str
+    # Encoded bodies keyed by content coding ("identity", "gzip", "br").
+    variants: dict[str, bytes]
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                if float(value) <= 0.0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+class StaticAssetCache:
+    """In-memory copy of a static directory with precompressed variants.
+
+    Files directly under `hashed_dir` whose names carry a content hash are
+    served as immutable; everything else is revalidated.
+    """
+
+    def __init__(self, root: Path, exclude: tuple[str, ...] = (), hashed_dir: str | None = None) -> None:
+        self.root = root
+        self.exclude = exclude
+        self.hashed_dir = hashed_dir
+        self.assets: dict[str, StaticAsset] = {}
+        self.load()
+
+    def load(self) -> None:
+        assets: dict[str, StaticAsset] = {}
+        raw_bytes = 0
+        stored_bytes = 0
+        if self.root.is_dir():
+            for file_path in sorted(self.root.rglob("*")):
+                if not file_path.is_file() or file_path.suffix in (".gz", ".br"):
+                    continue
+                rel = file_path.relative_to(self.root).as_posix()
+                if rel.split("/", 1)[0] in self.exclude:
+                    continue
+                asset = self._load_asset(file_path, rel)
+                assets[rel] = asset
+                raw_bytes += len(asset.variants["identity"])
+                stored_bytes += sum(len(body) for body in asset.variants.values())
+        self.assets = assets
+        LOG.info(
+            "Static cache %s: %d files, %d bytes raw, %d bytes with compressed variants%s",
+            self.root,
+            len(assets),
+            raw_bytes,
+            stored_bytes,
+            "" if brotli is not None else " (brotli unavailable)",
+        )
+
+    def _is_hashed(self, rel: str) -> bool:
+        directory, _, name = rel.rpartition("/")
+        return (
+            self.hashed_dir is not None
+            and directory == self.hashed_dir
+            and not name.endswith(".html")
+            and HASHED_NAME_RE.search(name) is not None
+        )
+
+    def _load_asset(self, file_path: Path, rel: str) -> StaticAsset:
+        data = file_path.read_bytes()
+        content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        variants = {"identity": data}
+
+        if file_path.suffix in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_BYTES:
+            gz_path = file_path.with_name(file_path.name + ".gz")
+            gz = gz_path.read_bytes() if gz_path.is_file() else gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gz) < len(data):
+                variants["gzip"] = gz
+
+            br_path = file_path.with_name(file_path.name + ".br")
+            if br_path.is_file():
+                br = br_path.read_bytes()
+            elif brotli is not None:
+                br = brotli.compress(data, quality=11)
+            else:
+                br = b""
+            if br and len(br) < len(data):
+                variants["br"] = br
+
+        cache_control = IMMUTABLE_CACHE_CONTROL if self._is_hashed(rel) else REVALIDATE_CACHE_CONTROL
+
+        return StaticAsset(
+            path=rel,
+            content_type=content_type,
+            etag=f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"',
+            cache_control=cache_control,
+            variants=variants,
+        )
+
+    def get(self, rel: str) -> StaticAsset | None:
+        return self.assets.get(rel)
+
+    @staticmethod
+    def respond(request: web.Request, asset: StaticAsset) -> web.Response:
+        accepted = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        coding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in accepted and candidate in asset.variants:
+                coding = candidate
+                break
+
+        etag = asset.etag if coding == "identity" else f'{asset.etag[:-1]}-{coding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match or asset.etag in if_none_match):
+            return web.Response(status=304, headers=headers)
+
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return web.Response(body=asset.variants[coding], content_type=asset.content_type, headers=headers)
+
+    async def handler(self, request: web.Request) -> web.Response:
+        asset = self.get(request.match_info.get("path", ""))
+        if asset is None:
+            raise web.HTTPNotFound()
+        return self.respond(request, asset)
@@ -4,9 +4,19 @@ from collections import deque
 from dataclasses import dataclass, field
 import math
 import random
+import sys
 from typing import Deque
 
 
+def _trail_point(x_m: float, y_m: float) -> str:
+    """JSON text of one trail point, rounded to millimetres."""
+    return f"[{round(x_m, 3)!r},{round(y_m, 3)!r}]"
+
+
+# One trail point: its JSON text at a typical length.
+_TRAIL_POINT_BYTES = sys.getsizeof(_trail_point(12.345, 67.891))
+
+
 @dataclass(slots=True)
 class SimPlayer:
     player_id: int
@@ -15,7 +25,11 @@ class SimPlayer:
     heading_rad: float
     vx_mps: float
     vy_mps: float
-    trail: Deque[tuple[float, float]] = field(default_factory=deque)
+    # Points are kept as JSON text, so a snapshot joins them instead of re-encoding the trail.
+    trail: Deque[str] = field(default_factory=deque)
+
+    def trail_json(self) -> str:
+        return f"[{','.join(self.trail)}]"
 
 
 class WorldSimulator:
@@ -39,12 +53,19 @@ class WorldSimulator:
         self.trail_seconds = trail_seconds
         self.paused = False
         self._players: dict[int, SimPlayer] = {}
+        self._moved: set[int] = set()
         self._rng = random.Random(seed)
 
     @property
     def players(self) -> dict[int, SimPlayer]:
         return self._players
 
+    def drain_moved(self) -> set[int]:
+        """Return ids whose position or trail changed since the last call."""
+        moved = self._moved
+        self._moved = set()
+        return moved
+
     def configure(
         self,
         *,
@@ -77,8 +98,8 @@ class WorldSimulator:
         vx = math.cos(heading) * self.speed_mps
         vy = math.sin(heading) * self.speed_mps
         trail_len = max(10, int(self.update_hz * self.trail_seconds))
-        trail: Deque[tuple[float, float]] = deque(maxlen=trail_len)
-        trail.append((x, y))
+        trail: Deque[str] = deque(maxlen=trail_len)
+        trail.append(_trail_point(x, y))
         player = SimPlayer(
             player_id=player_id,
             x_m=x,
@@ -89,12 +110,23 @@ class WorldSimulator:
             trail=trail,
         )
         self._players[player_id] = player
+        self._moved.add(player_id)
         return player
 
+    def memory_stats(self) -> dict[str, int]:
+        """Sim bodies and trail points held, with their size in bytes."""
+        points = 0
+        nbytes = sys.getsizeof(self._players) + sys.getsizeof(self._moved)
+        for player in self._players.values():
+            points += len(player.trail)
+            nbytes += sys.getsizeof(player) + sys.getsizeof(player.trail)
+        return {"count": len(self._players), "trail_points": points, "bytes": nbytes + points * _TRAIL_POINT_BYTES}
+
     def remove_player(self, player_id: int) -> bool:
         if player_id not in self._players:
             return False
         del self._players[player_id]
+        self._moved.discard(player_id)
         return True
 
     def randomize_positions(self) -> None:
@@ -105,7 +137,8 @@ class WorldSimulator:
             player.vx_mps = math.cos(player.heading_rad) * self.speed_mps
             player.vy_mps = math.sin(player.heading_rad) * self.speed_mps
             player.trail.clear()
-            player.trail.append((player.x_m, player.y_m))
+            player.trail.append(_trail_point(player.x_m, player.y_m))
+        self._moved.update(self._players)
 
     def reset(self) -> None:
         existing_ids = list(self._players.keys())
@@ -127,6 +160,7 @@ class WorldSimulator:
 
         for player in self._players.values():
             self._step_player(player, dt_s)
+        self._moved.update(self._players)
 
     def _step_player(self, player: SimPlayer, dt_s: float) -> None:
         heading_noise = self._rng.gauss(0.0, self.steering_noise) * math.sqrt(dt_s)
@@ -148,7 +182,7 @@ class WorldSimulator:
         else:
             self._bounce(player)
 
-        player.trail.append((player.x_m, player.y_m))
+        player.trail.append(_trail_point(player.x_m, player.y_m))
 
     def _bounce(self, player: SimPlayer) -> None:
         if player.x_m < 0.0:
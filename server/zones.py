@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+import math
+from typing import Any, Iterable
+
+
+ZONE_MODES = ("suppress", "downgrade")
+# Classification bits returned by ZoneIndex.classify().
+ZONE_SUPPRESS = 0x01
+ZONE_DOWNGRADE = 0x02
+_MODE_BITS = {"suppress": ZONE_SUPPRESS, "downgrade": ZONE_DOWNGRADE}
+
+ZONE_CELL_M = 5.0
+MAX_ZONES = 64
+MAX_ZONE_POINTS = 256
+# Zone coordinates are limited to the largest arena apply_updates allows, and
+# the grid cells covered by all zone bounding boxes to a fixed budget, so a
+# set_config cannot make the index arbitrarily expensive to build.
+ZONE_COORD_LIMIT_M = 1000.0
+MAX_ZONE_CELLS = 200_000
+
+
+@dataclass(frozen=True, slots=True)
+class Zone:
+    zone_id: str
+    mode: str
+    points: tuple[tuple[float, float], ...]
+    bbox: tuple[float, float, float, float]
+
+    def contains(self, x: float, y: float) -> bool:
+        """Even-odd ray casting; points on an edge may fall either way."""
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        inside = False
+        points = self.points
+        x1, y1 = points[-1]
+        for x2, y2 in points:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+            x1, y1 = x2, y2
+        return inside
+
+
+def normalize_zones(raw: Any) -> list[dict[str, Any]]:
+    """Validate zone specs from config or set_config; raises ValueError on bad input.
+
+    Each zone is {"id": str, "mode": "suppress"|"downgrade", "points": [[x_m, y_m], ...]}
+    in arena metres with at least three points.
+    """
+    if raw is None:
+        return []
+    if not isinstance(raw, (list, tuple)):
+        raise ValueError("zones must be a list")
+    if len(raw) > MAX_ZONES:
+        raise ValueError(f"at most {MAX_ZONES} zones are supported")
+    zones: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    cells = 0
+    for index, spec in enumerate(raw):
+        if not isinstance(spec, dict):
+            raise ValueError(f"zone {index} must be an object")
+        zone_id = str(spec.get("id") or f"zone-{index + 1}")
+        if zone_id in seen:
+            raise ValueError(f"duplicate zone id: {zone_id}")
+        mode = spec.get("mode", "suppress")
+        if mode not in ZONE_MODES:
+            raise ValueError(f"zone {zone_id}: mode must be one of {', '.join(ZONE_MODES)}")
+        points_raw = spec.get("points")
+        if not isinstance(points_raw, (list, tuple)) or not 3 <= len(points_raw) <= MAX_ZONE_POINTS:
+            raise ValueError(f"zone {zone_id}: points must list 3 to {MAX_ZONE_POINTS} [x_m, y_m] pairs")
+        try:
+            points = [[float(point[0]), float(point[1])] for point in points_raw]
+        except (TypeError, ValueError, IndexError):
+            raise ValueError(f"zone {zone_id}: points must be [x_m, y_m] pairs") from None
+        if not all(math.isfinite(value) for point in points for value in point):
+            raise ValueError(f"zone {zone_id}: points must be finite")
+        if any(abs(value) > ZONE_COORD_LIMIT_M for point in points for value in point):
+            raise ValueError(f"zone {zone_id}: points must lie within ±{ZONE_COORD_LIMIT_M:g} m")
+        xs = [x for x, _y in points]
+        ys = [y for _x, y in points]
+        cells += _cell_span(min(xs), max(xs)) * _cell_span(min(ys), max(ys))
+        if cells > MAX_ZONE_CELLS:
+            raise ValueError(f"zones cover too much area: more than {MAX_ZONE_CELLS} {ZONE_CELL_M:g} m grid cells")
+        seen.add(zone_id)
+        zones.append({"id": zone_id, "mode": mode, "points": points})
+    return zones
+
+
+def _cell_span(low: float, high: float, size: float = ZONE_CELL_M) -> int:
+    return math.floor(high / size) - math.floor(low / size) + 1
+
+
+class ZoneIndex:
+    """Grid-bucketed point-in-polygon lookup for alert suppression zones.
+
+    Each `cell_m` square cell lists the zones that cover it completely and
+    the zones whose edges cross it. classify() answers from the first list
+    directly and only runs a polygon test against the second, so a lookup is
+    one dict access plus, near a boundary, a test against one or two zones.
+    """
+
+    def __init__(self, specs: Iterable[dict[str, Any]], cell_m: float = ZONE_CELL_M) -> None:
+        self.cell_m = cell_m
+        self.zones: list[Zone] = []
+        for spec in specs:
+            points = tuple((float(x), float(y)) for x, y in spec["points"])
+            xs = [x for x, _y in points]
+            ys = [y for _x, y in points]
+            self.zones.append(Zone(spec["id"], spec["mode"], points, (min(xs), min(ys), max(xs), max(ys))))
+        # cell -> (bits of zones covering the whole cell, zones crossing it)
+        self._cells: dict[tuple[int, int], tuple[int, tuple[Zone, ...]]] = {}
+        for zone in self.zones:
+            self._add(zone)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def _add(self, zone: Zone) -> None:
+        """Rasterize one zone a row of cells at a time.
+
+        Cells an edge passes through are found by clipping each edge to the
+        row. Every other cell in the row lies wholly inside or outside, which
+        the crossings of the row's centre line decide. Cost is linear in the
+        cells covered rather than cells times edges.
+        """
+        size = self.cell_m
+        bit = _MODE_BITS[zone.mode]
+        min_x, min_y, max_x, max_y = zone.bbox
+        points = zone.points
+        edges = list(zip(points, points[1:] + points[:1]))
+        first_cx, last_cx = math.floor(min_x / size), math.floor(max_x / size)
+        for cy in range(math.floor(min_y / size), math.floor(max_y / size) + 1):
+            y0, y1 = cy * size, (cy + 1) * size
+            yc = y0 + 0.5 * size
+            crossed: set[int] = set()
+            centre_xs: list[float] = []
+            for (ax, ay), (bx, by) in edges:
+                low, high = (ay, by) if ay <= by else (by, ay)
+                if high < y0 or low > y1:
+                    continue
+                if ay == by:
+                    xa, xb = ax, bx
+                else:
+                    slope = (bx - ax) / (by - ay)
+                    xa = ax + (max(low, y0) - ay) * slope
+                    xb = ax + (min(high, y1) - ay) * slope
+                    if (ay > yc) != (by > yc):
+                        centre_xs.append(ax + (yc - ay) * slope)
+                if xa > xb:
+                    xa, xb = xb, xa
+                crossed.update(range(math.floor(xa / size), math.floor(xb / size) + 1))
+            centre_xs.sort()
+            for cx in range(first_cx, last_cx + 1):
+                full, partial = self._cells.get((cx, cy), (0, ()))
+                if cx in crossed:
+                    partial = partial + (zone,)
+                elif bisect_left(centre_xs, (cx + 0.5) * size) % 2:
+                    full |= bit
+                else:
+                    continue
+                self._cells[(cx, cy)] = (full, partial)
+
+    def classify(self, x: float, y: float) -> int:
+        """ZONE_* bits of every zone containing (x, y)."""
+        size = self.cell_m
+        cell = self._cells.get((math.floor(x / size), math.floor(y / size)))
+        if cell is None:
+            return 0
+        bits, partial = cell
+        for zone in partial:
+            if zone.contains(x, y):
+                bits |= _MODE_BITS[zone.mode]
+        return bits
+
+    def zones_at(self, x: float, y: float) -> list[str]:
+        return [zone.zone_id for zone in self.zones if zone.contains(x, y)]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+
+from server.aar import RecordingReader, iter_export_chunks, iter_export_rows
+from server.packet import AlertPacket, TelemetryPacket, encode_alert, encode_telemetry
+from server.recfile import REC_ALERT, REC_TELEMETRY
+from server.recorder import SessionRecorder
+
+
+def moving_packet(player_id: int, seq: int) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 100,
+            yaw_deg=float(seq % 360),
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=seq,
+            pos_y_cm=player_id * 100,
+            pos_quality=100,
+            battery_mv=3700,
+            flags=0,
+        )
+    )
+
+
+def record_session(tmp_path: Path) -> SessionRecorder:
+    """60 s of two players at 10 Hz, a keyframe every 5 s and small segments."""
+    recorder = SessionRecorder(
+        output_dir=tmp_path / "REC-1",
+        session_id="REC-1",
+        buffer_bytes=4096,
+        buffer_count=64,
+        segment_max_bytes=16 << 10,
+        keyframe_interval_s=5.0,
+    )
+    for seq in range(600):
+        t_us = seq * 100_000
+        recorder.record(REC_TELEMETRY, 1, moving_packet(1, seq), t_us=t_us)
+        if seq != 150:  # player 2 skips one packet at 15 s
+            recorder.record(REC_TELEMETRY, 2, moving_packet(2, seq), t_us=t_us + 10)
+        if seq == 200:
+            alert = encode_alert(AlertPacket(player_id=1, alert_on=1, intensity=180, hold_ms=250))
+            recorder.record(REC_ALERT, 1, alert, t_us=t_us + 20)
+        if seq % 50 == 0:
+            recorder.write_keyframe(t_us + 50)
+    recorder.close()
+    return recorder
+
+
+def test_keyframes_are_indexed_across_segments(tmp_path: Path) -> None:
+    recorder = record_session(tmp_path)
+    assert len(recorder.segments) > 1
+    assert len(recorder.keyframes) == 12
+    assert {segment_index for _t, segment_index, _offset in recorder.keyframes} == {
+        segment.index for segment in recorder.segments
+    }
+
+
+def test_seek_matches_full_fold(tmp_path: Path) -> None:
+    recorder = record_session(tmp_path)
+    segments = [{"index": s.index, "file": s.file} for s in recorder.segments]
+
+    with RecordingReader(recorder.output_dir, segments, recorder.keyframes) as indexed, RecordingReader(
+        recorder.output_dir, segments
+    ) as linear:
+        for t_ms in (0, 4_999, 15_050, 20_010, 20_030, 37_777, 59_999, 90_000):
+            state, keyframe_t_us = indexed.state_at(t_ms * 1000)
+            baseline, _ = linear.state_at(t_ms * 1000)
+            assert state.to_dict(t_ms * 1000) == baseline.to_dict(t_ms * 1000)
+            if t_ms >= 5_000:
+                assert keyframe_t_us is not None and keyframe_t_us <= t_ms * 1000
+                assert state.records_applied < baseline.records_applied
+
+        state, _ = indexed.state_at(20_030_000)
+        players = state.to_dict(20_030_000)["players"]
+        assert players[0]["alert"] is True
+        assert players[0]["x_m"] == 2.0
+        assert players[1]["seq"] == 200
+
+
+def test_export_streams_filtered_rows(tmp_path: Path) -> None:
+    recorder = record_session(tmp_path)
+    segments = [{"index": s.index, "file": s.file} for s in recorder.segments]
+
+    with RecordingReader(recorder.output_dir, segments, recorder.keyframes) as reader:
+        chunks = list(
+            iter_export_chunks(iter_export_rows(reader, 19_000_000, 21_000_000, {1}), "csv", chunk_bytes=256)
+        )
+        assert len(chunks) > 1
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        assert {row["player_id"] for row in rows} == {"1"}
+        assert [row for row in rows if row["kind"] == "alert"][0]["alert_intensity"] == "180"
+        telemetry = [row for row in rows if row["kind"] == "telemetry"]
+        assert len(telemetry) == 21
+        assert float(telemetry[0]["t_ms"]) == 19_000.0
+
+        lines = b"".join(iter_export_chunks(iter_export_rows(reader, to_us=1_000_000), "ndjson")).splitlines()
+        first = json.loads(lines[0])
+        assert first["kind"] == "telemetry" and first["t_ms"] == 0.0 and first["alert_on"] is None
+        assert len(lines) == 21
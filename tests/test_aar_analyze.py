@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from server.packet import TelemetryPacket, encode_telemetry
+from server.recfile import ANALYSIS_NAME, REC_CONFIG, REC_TELEMETRY
+from server.recorder import SessionRecorder
+from tools.aar_analyze import analyze_session, exposure
+
+
+def packet(player_id: int, seq: int, x_cm: int, y_cm: int, yaw_deg: float, version: int = 1) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 100,
+            yaw_deg=yaw_deg,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=x_cm,
+            pos_y_cm=y_cm,
+            pos_quality=100,
+            battery_mv=3700,
+            flags=0,
+            gps_lat_deg=32.0 if version == 2 else None,
+            gps_lon_deg=34.0 if version == 2 else None,
+            gps_alt_m=10.0 if version == 2 else None,
+            gps_quality=80 if version == 2 else 0,
+        )
+    )
+
+
+def test_exposure_matches_cone_math() -> None:
+    # Source 0 at origin looking along +x; target 1 ahead in range, target 2 behind.
+    x = np.array([[0.0, 5.0, -5.0]])
+    y = np.zeros((1, 3))
+    yaw = np.zeros((1, 3))
+    ok = np.ones((1, 3), dtype=bool)
+    inside, intensity = exposure(x, y, yaw, ok, ok, max_range_m=15.0, cone_half_angle_deg=6.0)
+    assert inside[0, 0].tolist() == [False, True, False]
+    assert intensity[0, 0, 1] == int(40 + 215 * (0.55 * (1.0 - 5.0 / 15.0) + 0.45))
+
+
+def test_analyze_session_writes_cached_result(tmp_path: Path) -> None:
+    recorder = SessionRecorder(output_dir=tmp_path / "REC-1", session_id="REC-1")
+    recorder.record(REC_CONFIG, 0, b'{"type":"config","config_version":1,"config":{"max_range_m":15.0}}', t_us=0)
+    for seq in range(100):
+        t_us = seq * 100_000
+        # Player 1 watches player 2 for the first five seconds, then turns away.
+        recorder.record(REC_TELEMETRY, 1, packet(1, seq, 1000, 1000, 0.0 if seq < 50 else 90.0), t_us=t_us)
+        recorder.record(REC_TELEMETRY, 2, packet(2, seq, 1500, 1000, 90.0, version=2), t_us=t_us + 10)
+    recorder.close()
+
+    session_id, outcome, _ = analyze_session(tmp_path / "REC-1")
+    assert (session_id, outcome) == ("REC-1", "analyzed")
+    result = json.loads((tmp_path / "REC-1" / ANALYSIS_NAME).read_text(encoding="utf-8"))
+    assert result["players"] == [1, 2]
+    assert abs(result["per_player"]["1"]["time_aiming_at_others_s"] - 5.0) <= 0.2
+    assert abs(result["per_player"]["2"]["time_in_others_cones_s"] - 5.0) <= 0.2
+    assert result["per_player"]["2"]["time_aiming_at_others_s"] == 0.0
+    matrix = result["exposure_matrix_s"]["seconds"]
+    assert matrix[1][0] == 0.0 and abs(matrix[0][1] - 5.0) <= 0.2
+    assert sum(map(sum, result["heatmap"]["counts"])) == round(result["per_player"]["2"]["time_in_others_cones_s"] / 0.1)
+    assert result["heatmap"]["counts"][10][15] > 0
+
+    assert analyze_session(tmp_path / "REC-1")[1] == "cached"
+    assert analyze_session(tmp_path / "REC-1", overrides={"max_range_m": 2.0})[1] == "analyzed"
+    result = json.loads((tmp_path / "REC-1" / ANALYSIS_NAME).read_text(encoding="utf-8"))
+    assert result["per_player"]["1"]["time_aiming_at_others_s"] == 0.0
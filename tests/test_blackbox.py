@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from server.aar import RecordingReader
+from server.blackbox import BlackBoxRing, write_dump
+from server.packet import TelemetryPacket, decode_telemetry, encode_telemetry
+from server.recfile import MANIFEST_NAME, RECORD_HEADER, REC_CONFIG, REC_TELEMETRY
+
+
+def telemetry_bytes(player_id: int, seq: int) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 50,
+            yaw_deg=0.0,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=0,
+            pos_y_cm=0,
+            pos_quality=0,
+            battery_mv=3700,
+            flags=0,
+        )
+    )
+
+
+def test_ring_keeps_only_the_newest_records_across_wraps() -> None:
+    record_size = RECORD_HEADER.size + len(telemetry_bytes(1, 0))
+    ring = BlackBoxRing(capacity_bytes=record_size * 10 + 7)
+    for seq in range(95):
+        assert ring.record(REC_TELEMETRY, 1, telemetry_bytes(1, seq), t_us=seq * 1000)
+
+    data, offsets = ring.freeze()
+    seqs = []
+    for offset in offsets:
+        length, _rtype, _flags, _pid, t_us = RECORD_HEADER.unpack_from(data, offset)
+        payload = data[offset + RECORD_HEADER.size : offset + RECORD_HEADER.size + length]
+        seqs.append(decode_telemetry(payload).seq)
+        assert t_us == seqs[-1] * 1000
+    assert seqs == list(range(85, 95))
+    assert ring.stats()["records"] == 10
+    assert ring.stats()["span_s"] == 0.009
+
+
+def test_dump_is_a_readable_recorder_session(tmp_path: Path) -> None:
+    ring = BlackBoxRing(capacity_bytes=64 * 1024)
+    for seq in range(20):
+        ring.record(REC_TELEMETRY, 3, telemetry_bytes(3, seq), t_us=5_000_000 + seq * 50_000)
+
+    data, offsets = ring.freeze()
+    config_json = '{"type":"config","config_version":4,"config":{"max_range_m":9.0}}'
+    manifest = write_dump(data, offsets, 1_000, tmp_path / "BB-1", "BB-1", config_json, since_us=5_500_000)
+    assert manifest["telemetry_packets"] == 10
+    assert manifest["start_unix_ms"] == 1_000 + 5_500
+    assert json.loads((tmp_path / "BB-1" / MANIFEST_NAME).read_text(encoding="utf-8"))["players"] == {"3": 10}
+
+    with RecordingReader(tmp_path / "BB-1", manifest["segments"]) as reader:
+        records = list((rtype, t_us) for rtype, _pid, t_us, _payload in reader.iter_from())
+        state, _ = reader.state_at(10_000_000)
+    assert records[0] == (REC_CONFIG, 0)
+    assert [t_us for _rtype, t_us in records[1:]] == [i * 50_000 for i in range(10)]
+    assert state.config["max_range_m"] == 9.0
+    assert state.players[3].seq == 19
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from server.catalog import SessionCatalog
+
+
+def manifest(session_id: str, start_unix_ms: int, alerts: int, players: dict[str, int]) -> dict:
+    return {
+        "session_id": session_id,
+        "start_unix_ms": start_unix_ms,
+        "end_unix_ms": start_unix_ms + 60_000,
+        "duration_ms": 60_000,
+        "records": sum(players.values()) + alerts,
+        "bytes": 1000,
+        "dropped_records": 0,
+        "telemetry_packets": sum(players.values()),
+        "alert_transitions": alerts,
+        "players": players,
+        "segments": [{"index": 0, "file": "seg-000000.fdr", "bytes": 1000, "first_t_us": 0, "last_t_us": 10}],
+        "keyframes": [[0, 0, 20]],
+    }
+
+
+def test_list_filters_and_paginates(tmp_path: Path) -> None:
+    catalog = SessionCatalog(tmp_path / "catalog.sqlite3")
+    catalog.add_session(manifest("REC-1", 1_000, alerts=0, players={"1": 10, "2": 10}), tmp_path / "REC-1")
+    catalog.add_session(manifest("REC-2", 2_000, alerts=5, players={"2": 10, "3": 10}), tmp_path / "REC-2")
+    catalog.add_session(manifest("REC-3", 3_000, alerts=9, players={"3": 10}), tmp_path / "REC-3")
+
+    everything = catalog.list_sessions()
+    assert everything["total"] == 3
+    assert [s["session_id"] for s in everything["sessions"]] == ["REC-3", "REC-2", "REC-1"]
+
+    assert [s["session_id"] for s in catalog.list_sessions(player_id=2)["sessions"]] == ["REC-2", "REC-1"]
+    assert [s["session_id"] for s in catalog.list_sessions(min_alerts=5, since_unix_ms=2_500)["sessions"]] == ["REC-3"]
+
+    page = catalog.list_sessions(limit=1, offset=1)
+    assert page["total"] == 3
+    assert [s["session_id"] for s in page["sessions"]] == ["REC-2"]
+
+
+def test_get_session_and_import_missing(tmp_path: Path) -> None:
+    session_dir = tmp_path / "REC-9"
+    session_dir.mkdir()
+    (session_dir / "session.json").write_text(json.dumps(manifest("REC-9", 9_000, 1, {"7": 3})), encoding="utf-8")
+    catalog = SessionCatalog(tmp_path / "catalog.sqlite3")
+
+    assert catalog.import_missing(tmp_path) == 1
+    assert catalog.import_missing(tmp_path) == 0
+
+    session = catalog.get_session("REC-9")
+    assert session is not None
+    assert session["player_ids"] == [7]
+    assert session["segments"][0]["file"] == "seg-000000.fdr"
+    assert session["keyframes"] == [(0, 0, 20)]
+    assert catalog.get_session("missing") is None
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import random
+
+from server.clocksync import NodeClock
+
+
+def run_link(clock: NodeClock, seconds: float, drift_ppm: float, delay, start_node_ms: int = 0) -> int:
+    """Feed 50 Hz packets from a node whose clock runs `drift_ppm` fast; returns the last node time."""
+    node_ms = start_node_ms
+    for index in range(int(seconds * 50)):
+        true_ms = 1_000_000 + index * 20
+        node_ms = start_node_ms + int(round(index * 20 * (1 + drift_ppm / 1e6)))
+        clock.observe(true_ms + delay(index), node_ms)
+    return node_ms
+
+
+def test_offset_and_drift_follow_the_fastest_path() -> None:
+    rng = random.Random(4)
+    clock = NodeClock()
+    last_node = run_link(clock, 90, drift_ppm=-200.0, delay=lambda _i: 3 + int(rng.expovariate(1 / 15)))
+
+    assert abs(clock.drift_ppm - 200.0) < 30.0
+    # Receive time = true time + delay, and true time ~ node time / (1 - 200 ppm); the fastest delay is 3 ms.
+    true_at_last = last_node / (1 - 200e-6)
+    expected = 1_000_000 + true_at_last + 3 - last_node
+    assert abs(clock.offset_at(last_node) - expected) < 2.0
+    assert clock.to_dict()["clock_offset_ms"] is not None
+
+
+def test_jitter_quantiles_and_excess() -> None:
+    clock = NodeClock()
+    # Every tenth packet is held up 40 ms in the network.
+    run_link(clock, 20, drift_ppm=0.0, delay=lambda i: 40 if i % 10 == 9 else 2)
+    assert clock.jitter_quantile(0.5) < 0.5
+    assert 25.0 < clock.jitter_quantile(0.99) < 60.0
+    assert clock.stalls == 0
+
+    clock.observe(1_000_000 + 1000 * 20 + 42, 1000 * 20)
+    assert 35.0 < clock.excess_ms < 45.0
+
+
+def test_node_gaps_count_as_stalls_not_jitter() -> None:
+    clock = NodeClock()
+    run_link(clock, 5, drift_ppm=0.0, delay=lambda _i: 2)
+    before = clock.jitter_quantile(0.99)
+    # The firmware stops sampling for 300 ms: both clocks advance together.
+    clock.observe(1_000_000 + 250 * 20 + 300 + 2, 250 * 20 + 300)
+    assert clock.stalls == 1
+    assert clock.jitter_quantile(0.99) == before
+
+
+def test_node_restart_resets_offset() -> None:
+    clock = NodeClock()
+    run_link(clock, 10, drift_ppm=0.0, delay=lambda _i: 2, start_node_ms=50_000)
+    assert abs(clock.offset_at(60_000) - (1_000_000 + 2 - 50_000)) < 0.5
+
+    clock.observe(1_020_000, 10)
+    assert clock.samples == 1
+    assert clock.offset_at(10) == 1_020_000 - 10
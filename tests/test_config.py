@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from server.config import CoordinatorConfig
+
+
+def test_version_bumps_only_on_effective_change() -> None:
+    config = CoordinatorConfig()
+    start = config.version
+
+    assert config.apply_updates({"max_range_m": config.max_range_m}) is False
+    assert config.version == start
+
+    assert config.apply_updates({"max_range_m": 20.0}) is True
+    assert config.version == start + 1
+    assert config.max_range_m == 20.0
+
+
+def test_cached_json_invalidated_on_change() -> None:
+    config = CoordinatorConfig()
+    first = config.to_json()
+    assert config.to_json() is first
+    assert json.loads(first)["cone_half_angle_deg"] == 6.0
+
+    config.apply_updates({"cone_half_angle_deg": 10.0})
+    assert json.loads(config.to_json())["cone_half_angle_deg"] == 10.0
+    assert config.to_dict()["cone_half_angle_deg"] == 10.0
+
+
+def test_rejected_update_changes_nothing() -> None:
+    config = CoordinatorConfig()
+    start = config.version
+    before = config.to_json()
+
+    with pytest.raises(ValueError):
+        config.apply_updates({"max_range_m": 20.0, "quality_threshold": "abc"})
+    with pytest.raises(ValueError):
+        config.apply_updates({"max_range_m": 20.0, "zones": [{"points": [[0, 0]]}]})
+    assert config.max_range_m == 15.0
+    assert config.version == start
+    assert config.to_json() == before
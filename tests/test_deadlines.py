@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from server.deadlines import DeadlineQueue
+
+
+def test_expire_returns_due_keys_in_order() -> None:
+    queue = DeadlineQueue()
+    queue.arm("b", 200)
+    queue.arm("a", 100)
+    queue.arm("c", 300)
+    assert queue.expire(99) == []
+    assert queue.expire(250) == ["a", "b"]
+    assert len(queue) == 1 and "c" in queue
+
+
+def test_refreshing_later_deadline_does_not_grow_heap() -> None:
+    queue = DeadlineQueue()
+    for now_ms in range(0, 1000, 20):
+        queue.arm(7, now_ms + 100)
+    assert len(queue._heap) == 1
+    assert queue.expire(500) == []
+    assert queue.expire(1079) == []
+    assert queue.expire(1080) == [7]
+
+
+def test_earlier_rearm_and_cancel() -> None:
+    queue = DeadlineQueue()
+    queue.arm(1, 500)
+    queue.arm(1, 50)
+    assert queue.expire(60) == [1]
+    # The stale entry at 500 must not fire for a disarmed key.
+    assert queue.expire(600) == []
+
+    queue.arm(2, 100)
+    queue.cancel(2)
+    assert queue.expire(200) == []
+    queue.arm(2, 300)
+    assert queue.deadline(2) == 300
+    assert queue.expire(299) == [] and queue.expire(300) == [2]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+
+from server.config import CoordinatorConfig
+from server.events import EventLog
+from server.packet import TelemetryPacket
+from server.state import PlayerRegistry
+from server.world_sim import WorldSimulator
+
+
+def build_registry(config: CoordinatorConfig, events: EventLog) -> PlayerRegistry:
+    world = WorldSimulator(
+        arena_width_m=config.arena_width_m,
+        arena_height_m=config.arena_height_m,
+        speed_mps=config.sim_speed_mps,
+        update_hz=config.world_update_hz,
+        boundary_behavior=config.boundary_behavior,
+        steering_noise=config.sim_noise,
+        trail_seconds=config.trail_seconds,
+        seed=1234,
+    )
+    return PlayerRegistry(config=config, world=world, events=events)
+
+
+def telemetry(seq: int, battery_mv: int = 3900) -> TelemetryPacket:
+    return TelemetryPacket(
+        player_id=5,
+        seq=seq,
+        timestamp_ms=0,
+        yaw_deg=0.0,
+        pitch_deg=0.0,
+        roll_deg=0.0,
+        quality=90,
+        pos_x_cm=0,
+        pos_y_cm=0,
+        pos_quality=0,
+        battery_mv=battery_mv,
+        flags=0,
+    )
+
+
+def test_event_ring_is_bounded_and_sliced_by_id() -> None:
+    log = EventLog(capacity=4, clock=lambda: 12.5)
+    for index in range(6):
+        log.emit("tick", details={"n": index})
+
+    assert log.last_id == 6
+    assert log.first_id == 3
+    assert [event.id for event in log.after(0)] == [3, 4, 5, 6]
+    assert [event.id for event in log.after(4)] == [5, 6]
+    assert [event.id for event in log.after(2, limit=2)] == [3, 4]
+    assert log.after(6) == []
+
+    decoded = json.loads(log.json_after(5))
+    assert decoded == [{"id": 6, "ts_ms": 12500, "level": "info", "event": "tick", "details": {"n": 5}}]
+
+
+def test_empty_ring_reports_next_id() -> None:
+    log = EventLog()
+    assert log.first_id == 1
+    assert log.json_after(0) == "[]"
+
+
+def test_registry_emits_link_battery_and_alert_events() -> None:
+    config = CoordinatorConfig(default_player_ids=(), offline_timeout_ms=2000, low_battery_mv=3400, seq_drop_burst=10)
+    log = EventLog()
+    seen: list[str] = []
+    log.listeners.append(lambda event: seen.append(event.event))
+    registry = build_registry(config, log)
+
+    registry.ingest_telemetry(telemetry(1), addr=("127.0.0.1", 1), now_ms=1_000)
+    registry.ingest_telemetry(telemetry(3), addr=("127.0.0.1", 1), now_ms=1_050)
+    registry.ingest_telemetry(telemetry(20, battery_mv=3300), addr=("127.0.0.1", 1), now_ms=1_100)
+    registry.ingest_telemetry(telemetry(21, battery_mv=3300), addr=("127.0.0.1", 1), now_ms=1_150)
+    registry.update_alert_hysteresis(5, 1_200, inside_on=True, inside_off=True, intensity=200)
+    registry.update_alert_hysteresis(5, 1_250, inside_on=True, inside_off=True, intensity=180)
+    registry.update_online_flags(now_ms=5_000)
+
+    assert seen == ["player_online", "seq_drop_burst", "low_battery", "alert_on", "player_offline"]
+    burst = log.after(1)[0]
+    assert burst.player_id == 5
+    assert burst.details == {"dropped": 16, "from_seq": 3, "to_seq": 20}
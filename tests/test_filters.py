@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from server.config import CoordinatorConfig
+from server.filters import KalmanBank
+from server.packet import TelemetryPacket
+from server.state import PlayerRegistry
+from server.world_sim import WorldSimulator
+
+
+def circle(t_ms: float) -> tuple[float, float, float]:
+    s = t_ms / 1000.0
+    return 10 + 5 * math.cos(0.3 * s), 10 + 5 * math.sin(0.3 * s), (math.degrees(0.3 * s) + 90.0) % 360.0
+
+
+def test_filtered_prediction_beats_last_raw_sample() -> None:
+    rng = random.Random(7)
+    bank = KalmanBank()
+    raw_err: list[float] = []
+    filtered_err: list[float] = []
+    last = None
+    next_packet = 0.0
+    for tick_ms in range(0, 60_000, 50):
+        while next_packet <= tick_ms:
+            x, y, yaw = circle(next_packet - rng.uniform(20, 100))
+            last = (x + rng.gauss(0, 0.3), y + rng.gauss(0, 0.3), (yaw + rng.gauss(0, 2.0)) % 360)
+            bank.update(1, int(next_packet), last[2], (last[0], last[1]))
+            next_packet += rng.uniform(40, 60)
+        if tick_ms < 5_000:
+            continue
+        x, y, _yaw = circle(tick_ms)
+        fx, fy, _fyaw, has_pos = bank.predict(tick_ms, 250)[1]
+        assert has_pos
+        raw_err.append(math.hypot(last[0] - x, last[1] - y))
+        filtered_err.append(math.hypot(fx - x, fy - y))
+
+    def rms(values: list[float]) -> float:
+        return math.sqrt(sum(v * v for v in values) / len(values))
+
+    assert rms(filtered_err) < 0.7 * rms(raw_err)
+
+
+def test_prediction_horizon_and_yaw_wrap() -> None:
+    bank = KalmanBank()
+    for step in range(40):
+        bank.update(3, step * 50, (350.0 + step * 1.0) % 360.0, (step * 0.05, 0.0))
+    x_m, _y_m, yaw_deg, _ = bank.predict(39 * 50 + 100, 250)[3]
+    assert x_m == pytest.approx(39 * 0.05 + 0.1, abs=0.02)
+    assert yaw_deg == pytest.approx((350.0 + 39 + 2.0) % 360.0, abs=0.5)
+    capped = bank.predict(39 * 50 + 10_000, 250)[3][0]
+    assert capped == pytest.approx(39 * 0.05 + 0.25, abs=0.03)
+
+
+def test_rows_stay_dense_after_removal() -> None:
+    bank = KalmanBank(capacity=2)
+    for player_id in (1, 2, 3):
+        bank.update(player_id, 0, float(player_id), (float(player_id), 0.0))
+    bank.remove(1)
+    assert len(bank) == 2
+    predicted = bank.predict(0, 250)
+    assert sorted(predicted) == [2, 3]
+    assert predicted[3][0] == pytest.approx(3.0)
+    assert predicted[2][2] == pytest.approx(2.0)
+
+
+def test_registry_feeds_alert_logic_from_filters() -> None:
+    config = CoordinatorConfig(default_player_ids=(), alert_filter=True)
+    registry = PlayerRegistry(config=config, world=WorldSimulator(arena_width_m=50.0, arena_height_m=30.0, seed=1))
+    for step in range(20):
+        packet = TelemetryPacket(
+            player_id=6,
+            seq=step,
+            timestamp_ms=step * 50,
+            yaw_deg=step * 2.0,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=step * 5,
+            pos_y_cm=0,
+            pos_quality=100,
+            battery_mv=3700,
+            flags=0,
+        )
+        registry.ingest_telemetry(packet, addr=("127.0.0.1", 1), now_ms=1_000 + step * 50)
+
+    raw = registry.build_logic_players()[6]
+    predicted = registry.build_logic_players(now_ms=1_000 + 19 * 50 + 100)[6]
+    assert raw.yaw_deg == pytest.approx(38.0)
+    assert predicted.yaw_deg == pytest.approx(42.0, abs=1.0)
+    assert predicted.position is not None and predicted.position[0] == pytest.approx(1.05, abs=0.05)
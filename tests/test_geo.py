@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from server.geo import EnuProjection
+
+
+def test_small_offsets_match_local_scale() -> None:
+    projection = EnuProjection(32.0853, 34.7818, alt_m=10.0)
+    # Meridian and parallel arc lengths per degree at this latitude.
+    lat = math.radians(32.0853)
+    m_per_deg_lat = 111132.92 - 559.82 * math.cos(2 * lat) + 1.175 * math.cos(4 * lat)
+    m_per_deg_lon = 111412.84 * math.cos(lat) - 93.5 * math.cos(3 * lat)
+
+    x, y = projection.project_one(32.0863, 34.7818)
+    assert x == pytest.approx(0.0, abs=1e-3)
+    assert y == pytest.approx(0.001 * m_per_deg_lat, abs=0.05)
+    x, y = projection.project_one(32.0853, 34.7838)
+    assert x == pytest.approx(0.002 * m_per_deg_lon, abs=0.05)
+    assert y == pytest.approx(0.0, abs=0.01)
+
+
+def test_rotation_and_batch() -> None:
+    plain = EnuProjection(47.0, 8.0)
+    rotated = EnuProjection(47.0, 8.0, rotation_deg=30.0)
+    lat = np.array([47.0, 47.0005, 46.9990])
+    lon = np.array([8.0, 8.0010, 7.9980])
+    alt = np.zeros(3)
+    east, north = plain.project(lat, lon, alt)
+    x, y = rotated.project(lat, lon, alt)
+    cos_r, sin_r = math.cos(math.radians(30.0)), math.sin(math.radians(30.0))
+    np.testing.assert_allclose(x, cos_r * east + sin_r * north, atol=1e-9)
+    np.testing.assert_allclose(y, -sin_r * east + cos_r * north, atol=1e-9)
+    assert x[0] == pytest.approx(0.0, abs=1e-6) and y[0] == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import logging
+import time
+
+import pytest
+
+from server.metrics import Histogram, LoopStats
+
+
+def test_histogram_quantiles_use_bucket_bounds() -> None:
+    hist = Histogram(bounds=(1.0, 5.0, 10.0))
+    for value in (0.5, 0.7, 3.0, 8.0, 40.0):
+        hist.observe(value)
+
+    assert hist.count == 5
+    assert hist.quantile(0.4) == 1.0
+    assert hist.quantile(0.6) == 5.0
+    assert hist.quantile(1.0) == 40.0
+    assert hist.to_dict()["max"] == 40.0
+
+
+def test_loop_stats_counts_overruns_and_logs_phases(caplog: pytest.LogCaptureFixture) -> None:
+    stats = LoopStats("alert_loop", target_hz=1000.0)
+    stats.slow_tick_log = True
+
+    with caplog.at_level(logging.WARNING, logger="fdw.metrics"):
+        stats.begin()
+        time.sleep(0.003)
+        stats.phase("evaluate_send")
+        stats.end()
+
+    assert stats.ticks == 1
+    assert stats.overruns == 1
+    assert "evaluate_send" in stats.phase_totals_ms
+    assert "evaluate_send=" in caplog.text
@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+import random
+
 import pytest
 
+from server.config import CoordinatorConfig
+from server.main import MatchCoordinator
 from server.packet import (
+    ALERT_SIZE,
+    ALERT_V3_SIZE,
+    ALERT_VERSION,
+    ALERT_VERSION_V3,
     PacketError,
+    RATE_CONTROL_SIZE,
+    TELEMETRY_V3_SIZE,
     TELEMETRY_VERSION_V2,
+    TELEMETRY_VERSION_V3,
+    AlertPacket,
+    BulkFrame,
+    RateControlPacket,
     TelemetryPacket,
+    crc16_ccitt_false,
+    decode_alert,
+    decode_bulk,
+    decode_rate_control,
     decode_telemetry,
+    encode_alert,
+    encode_bulk,
+    encode_rate_control,
     encode_telemetry,
 )
 
@@ -98,3 +119,130 @@ def test_telemetry_crc_rejects_tamper() -> None:
 
     with pytest.raises(PacketError):
         decode_telemetry(bytes(payload))
+
+
+def test_wide_player_ids_use_v3() -> None:
+    src = TelemetryPacket(
+        player_id=4321,
+        seq=7,
+        timestamp_ms=1000,
+        yaw_deg=90.0,
+        pitch_deg=0.0,
+        roll_deg=0.0,
+        quality=80,
+        pos_x_cm=5,
+        pos_y_cm=6,
+        pos_quality=60,
+        battery_mv=3700,
+        flags=0,
+    )
+    payload = encode_telemetry(src)
+    assert len(payload) == TELEMETRY_V3_SIZE
+    out = decode_telemetry(payload)
+    assert out.player_id == 4321 and out.version == TELEMETRY_VERSION_V3
+    assert out.gps_lat_deg is None
+
+    src.player_id = 9
+    src.version = TELEMETRY_VERSION_V3
+    assert decode_telemetry(encode_telemetry(src)).player_id == 9
+
+    src.player_id = 70_000
+    with pytest.raises(PacketError):
+        encode_telemetry(src)
+
+
+def test_alert_versions() -> None:
+    legacy = encode_alert(AlertPacket(player_id=9, alert_on=1, intensity=200, hold_ms=250))
+    assert len(legacy) == ALERT_SIZE
+    assert decode_alert(legacy).version == ALERT_VERSION
+
+    wide = encode_alert(AlertPacket(player_id=9, alert_on=1, intensity=200, hold_ms=250, version=ALERT_VERSION_V3))
+    assert len(wide) == ALERT_V3_SIZE
+    assert decode_alert(wide) == AlertPacket(9, 1, 200, 250, ALERT_VERSION_V3)
+
+    # Ids that do not fit a byte always go out as v3.
+    assert decode_alert(encode_alert(AlertPacket(player_id=300, alert_on=0, intensity=0, hold_ms=0))).player_id == 300
+
+
+
+def test_rate_control_roundtrip() -> None:
+    raw = encode_rate_control(RateControlPacket(player_id=700, rate_hz=4.25, valid_ms=15000))
+    assert len(raw) == RATE_CONTROL_SIZE
+    assert decode_rate_control(raw) == RateControlPacket(player_id=700, rate_hz=4.2, valid_ms=15000)
+
+    # Not mistaken for an alert by nodes that only understand alerts.
+    with pytest.raises(PacketError):
+        decode_alert(raw)
+    with pytest.raises(PacketError):
+        decode_rate_control(raw[:-1] + bytes([raw[-1] ^ 0xFF]))
+
+
+def node_packet(player_id: int, seq: int, with_gps: bool = False) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 50,
+            yaw_deg=0.0,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=100 * player_id,
+            pos_y_cm=0,
+            pos_quality=80,
+            battery_mv=3700,
+            flags=0,
+            gps_lat_deg=32.0 if with_gps else None,
+            gps_lon_deg=34.0 if with_gps else None,
+            gps_alt_m=10.0 if with_gps else None,
+            gps_quality=90 if with_gps else 0,
+        )
+    )
+
+
+def bitwise_crc16_ccitt_false(data: bytes) -> int:
+    # The loop the firmware runs (firmware/main/packet_proto.c).
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def test_crc16_matches_ccitt_false_check_value() -> None:
+    assert crc16_ccitt_false(b"123456789") == 0x29B1
+    assert crc16_ccitt_false(b"") == 0xFFFF
+    rng = random.Random(7)
+    for length in (1, 2, 11, 12, 45, 300):
+        data = bytes(rng.randrange(256) for _ in range(length))
+        assert crc16_ccitt_false(data) == bitwise_crc16_ccitt_false(data)
+
+
+def test_bulk_frame_roundtrip_and_framing_errors() -> None:
+    inner = [node_packet(1, 1), node_packet(2, 1, with_gps=True), node_packet(300, 1)]
+    frame = encode_bulk(7, inner)
+    assert decode_bulk(frame) == BulkFrame(gateway_id=7, packets=inner)
+    assert decode_bulk(encode_bulk(7, [])).packets == []
+
+    for bad in (frame[:-1], frame + b"\x00", frame[:6] + bytes([9, 0]) + frame[8:], b"FD"):
+        with pytest.raises(PacketError):
+            decode_bulk(bad)
+
+
+def test_bulk_ingest_enforces_inner_crc() -> None:
+    coordinator = MatchCoordinator(CoordinatorConfig(default_player_ids=(), blackbox_mb=0.0), clock=lambda: 1_000)
+    corrupt = bytearray(node_packet(2, 1))
+    corrupt[10] ^= 0xFF
+    frame = encode_bulk(7, [node_packet(1, 1), bytes(corrupt), node_packet(3, 1, with_gps=True), node_packet(1, 2)])
+
+    result = coordinator.ingest_bulk(frame, ("127.0.0.1", 4000), now_ms=1_000)
+    assert (result["packets"], result["accepted"], result["invalid"]) == (4, 3, 1)
+    assert result["errors"][0]["index"] == 1
+    assert sorted(coordinator.state.players) == [1, 3]
+    assert coordinator.state.players[1].seq == 2
+    assert coordinator.state.players[3].addr == ("127.0.0.1", 4000)
+
+    # The UDP path takes the same frame.
+    coordinator.handle_udp_packet(encode_bulk(7, [node_packet(4, 1)]), ("127.0.0.1", 4000))
+    assert 4 in coordinator.state.players
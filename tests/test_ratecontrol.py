@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+
+from server.config import CoordinatorConfig
+from server.ratecontrol import (
+    RATE_EVAL_INTERVAL_MS,
+    RATE_TIER_ENGAGED,
+    RATE_TIER_IDLE,
+    RATE_TIER_NEAR,
+    RateController,
+    engagement_tiers,
+)
+from server.state import LogicPlayer
+
+
+def logic_player(player_id: int, position: tuple[float, float] | None, yaw_deg: float = 0.0) -> LogicPlayer:
+    return LogicPlayer(
+        player_id=player_id,
+        yaw_deg=yaw_deg,
+        quality=90,
+        online=True,
+        position=position,
+        addr=("127.0.0.1", 12000 + player_id),
+    )
+
+
+def test_engagement_tiers_cover_both_ends_of_a_cone() -> None:
+    positions = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 25.0], [200.0, 200.0]])
+    yaw_deg = np.array([0.0, 90.0, 180.0, 0.0])
+    tiers = engagement_tiers(positions, yaw_deg, max_range_m=15.0, cone_half_angle_deg=6.0, margin_deg=30.0)
+    # 0 looks at 1; 2 is within twice the range of 0 but nobody looks its way; 3 is alone.
+    assert tiers.tolist() == [RATE_TIER_ENGAGED, RATE_TIER_ENGAGED, RATE_TIER_NEAR, RATE_TIER_IDLE]
+
+
+def test_rates_rise_at_once_and_fall_after_hold() -> None:
+    config = CoordinatorConfig(rate_control=True, rate_hold_ms=1_000, offline_timeout_ms=2_000)
+    controller = RateController()
+    far = {1: logic_player(1, (0.0, 0.0)), 2: logic_player(2, (100.0, 0.0), yaw_deg=90.0)}
+    assert sorted(controller.update(0, far, config)) == [1, 2]
+    assert controller.nodes[1].rate_hz == config.rate_min_hz
+
+    # Evaluations are throttled between ticks.
+    engaged = {1: logic_player(1, (0.0, 0.0)), 2: logic_player(2, (10.0, 0.0), yaw_deg=90.0)}
+    assert controller.update(RATE_EVAL_INTERVAL_MS - 1, engaged, config) == []
+    assert sorted(controller.update(RATE_EVAL_INTERVAL_MS, engaged, config)) == [1, 2]
+    assert controller.nodes[2].rate_hz == config.rate_max_hz
+
+    now_ms = RATE_EVAL_INTERVAL_MS
+    for _ in range(4):
+        now_ms += RATE_EVAL_INTERVAL_MS
+        assert controller.update(now_ms, far, config) == []
+    now_ms += RATE_EVAL_INTERVAL_MS
+    assert sorted(controller.update(now_ms, far, config)) == [1, 2]
+    assert controller.nodes[1].rate_hz == config.rate_min_hz
+
+    # The floor keeps enough packets inside the offline timeout, and unplaced nodes stay at full rate.
+    config.offline_timeout_ms = 500
+    unplaced = {1: logic_player(1, None)}
+    now_ms += RATE_EVAL_INTERVAL_MS
+    controller.update(now_ms, far, config)
+    assert controller.nodes[1].rate_hz == 8.0
+    now_ms += RATE_EVAL_INTERVAL_MS
+    assert controller.update(now_ms, unplaced, config) == [1]
+    assert controller.nodes[1].rate_hz == config.rate_max_hz and 2 not in controller.nodes
+    assert controller.release() == [1] and not controller.nodes
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from server.catalog import SessionCatalog
+from server.packet import TelemetryPacket, encode_telemetry
+from server.recfile import MANIFEST_NAME, REC_ALERT, REC_TELEMETRY, iter_records, read_segment_header
+from server.recorder import SessionRecorder
+
+
+def telemetry_bytes(player_id: int, seq: int) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 50,
+            yaw_deg=1.0,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=0,
+            pos_y_cm=0,
+            pos_quality=0,
+            battery_mv=3700,
+            flags=0,
+        )
+    )
+
+
+def read_all(output_dir: Path) -> list[tuple[int, int, int, bytes]]:
+    out = []
+    for segment in sorted(output_dir.glob("seg-*.fdr")):
+        data = segment.read_bytes()
+        read_segment_header(data)
+        out.extend((rtype, pid, t_us, bytes(payload)) for _, rtype, pid, t_us, payload in iter_records(data))
+    return out
+
+
+def test_recorder_roundtrip_with_segment_rotation(tmp_path: Path) -> None:
+    recorder = SessionRecorder(
+        output_dir=tmp_path / "REC-1",
+        session_id="REC-1",
+        buffer_bytes=4096,
+        buffer_count=64,
+        segment_max_bytes=8192,
+    )
+    for seq in range(600):
+        assert recorder.record(REC_TELEMETRY, 1 + (seq % 3), telemetry_bytes(1 + (seq % 3), seq), t_us=seq * 1000)
+    assert recorder.record(REC_ALERT, 2, b"alert", t_us=600_000)
+
+    manifest = recorder.close()
+    records = read_all(tmp_path / "REC-1")
+
+    assert len(records) == 601
+    assert [t_us for _, _, t_us, _ in records] == sorted(t_us for _, _, t_us, _ in records)
+    assert records[0][3] == telemetry_bytes(1, 0)
+    assert records[-1][:2] == (REC_ALERT, 2)
+    assert len(manifest["segments"]) > 1
+    assert manifest["telemetry_packets"] == 600
+    assert manifest["players"] == {"1": 200, "2": 200, "3": 200}
+    assert json.loads((tmp_path / "REC-1" / MANIFEST_NAME).read_text())["alert_transitions"] == 1
+
+
+def test_recorder_drops_instead_of_blocking_when_buffers_exhausted(tmp_path: Path) -> None:
+    recorder = SessionRecorder(output_dir=tmp_path / "REC-2", session_id="REC-2", buffer_bytes=64, buffer_count=1)
+    assert recorder.record(REC_TELEMETRY, 1, b"x" * 100) is False
+    assert recorder.stats.dropped_records == 1
+    recorder.close()
+
+
+def test_recorder_indexes_closed_session_in_catalog(tmp_path: Path) -> None:
+    catalog = SessionCatalog(tmp_path / "catalog.sqlite3")
+    recorder = SessionRecorder(output_dir=tmp_path / "REC-3", session_id="REC-3", catalog=catalog)
+    recorder.record(REC_TELEMETRY, 4, telemetry_bytes(4, 1))
+    recorder.close()
+
+    listing = catalog.list_sessions(player_id=4)
+    assert [session["session_id"] for session in listing["sessions"]] == ["REC-3"]
+    assert listing["sessions"][0]["player_ids"] == [4]
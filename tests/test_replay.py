@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from server.catalog import SessionCatalog
+from server.config import CoordinatorConfig
+from server.main import MatchCoordinator
+from server.packet import TelemetryPacket, encode_telemetry
+from server.recfile import REC_TELEMETRY
+from server.recorder import SessionRecorder
+from server.replay import ReplayEngine, VirtualClock, parse_speed
+
+
+def facing_packet(player_id: int, seq: int, x_cm: int, yaw_deg: float) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=seq,
+            timestamp_ms=seq * 50,
+            yaw_deg=yaw_deg,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=x_cm,
+            pos_y_cm=0,
+            pos_quality=100,
+            battery_mv=3700,
+            flags=0,
+        )
+    )
+
+
+def record_face_off(tmp_path: Path) -> dict:
+    """Two players 5 m apart looking at each other for two seconds."""
+    catalog = SessionCatalog(tmp_path / "catalog.sqlite3")
+    recorder = SessionRecorder(output_dir=tmp_path / "REC-1", session_id="REC-1", catalog=catalog)
+    for seq in range(40):
+        t_us = seq * 50_000
+        recorder.record(REC_TELEMETRY, 1, facing_packet(1, seq, 0, 0.0), t_us=t_us)
+        recorder.record(REC_TELEMETRY, 2, facing_packet(2, seq, 500, 180.0), t_us=t_us + 1_000)
+    recorder.close()
+    session = catalog.get_session("REC-1")
+    assert session is not None
+    return session
+
+
+def run_replay(session: dict, overrides: dict) -> dict:
+    async def scenario() -> dict:
+        clock = VirtualClock()
+        engine = ReplayEngine(
+            session,
+            MatchCoordinator(CoordinatorConfig(), clock=clock.now_ms),
+            clock,
+            speed=None,
+            overrides=overrides,
+        )
+        engine.start()
+        await engine.wait()
+        return engine.status()
+
+    return asyncio.run(scenario())
+
+
+def test_replay_recomputes_alerts_on_virtual_clock(tmp_path: Path) -> None:
+    session = record_face_off(tmp_path)
+
+    status = run_replay(session, {})
+    assert status["state"] == "finished"
+    assert status["telemetry_packets"] == 80
+    assert status["virtual_ms"] >= 1_950
+    assert status["alert_transitions_by_player"].get("1", 0) >= 1
+    assert status["alert_transitions_by_player"].get("2", 0) >= 1
+
+    out_of_range = run_replay(session, {"max_range_m": 2.0})
+    assert out_of_range["state"] == "finished"
+    assert out_of_range["alert_transitions"] == 0
+    assert out_of_range["overrides"] == {"max_range_m": 2.0}
+
+
+def test_parse_speed_bounds() -> None:
+    assert parse_speed("max") is None
+    assert parse_speed(0) is None
+    assert parse_speed(50) == 50.0
+    with pytest.raises(ValueError):
+        parse_speed(0.1)
+    with pytest.raises(ValueError):
+        parse_speed(51)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import math
+
+from server.series import SERIES_RESOLUTIONS, LinkSeries
+
+
+def test_one_second_buckets_hold_rate_drops_and_stats() -> None:
+    series = LinkSeries()
+    # 10 Hz for two seconds; every packet 5 ms later in transit than the previous one.
+    for index in range(20):
+        now_ms = 10_000 + index * 100
+        dropped = 2 if index == 12 else 0
+        series.ingest(now_ms, node_timestamp_ms=index * 95, dropped=dropped, quality=80 + index, battery_mv=3800 - index)
+    series.advance(12_000)
+
+    data = series.to_dict(1)
+    assert data["t_ms"] == [10_000, 11_000]
+    assert data["packet_rate_hz"]["mean"] == [10.0, 10.0]
+    assert data["drop_rate"]["max"] == [0.0, round(2 / 12, 3)]
+    assert data["jitter_ms"]["min"] == [5.0, 5.0] and data["jitter_ms"]["max"] == [5.0, 5.0]
+    assert data["quality"]["min"] == [80.0, 90.0] and data["quality"]["max"] == [89.0, 99.0]
+    assert data["battery_mv"]["mean"] == [3795.5, 3785.5]
+
+
+def test_silent_seconds_and_rollups() -> None:
+    series = LinkSeries()
+    for second in range(25):
+        if 5 <= second < 15:
+            continue  # link dropped out for ten seconds
+        for index in range(4):
+            now_ms = second * 1000 + index * 250
+            series.ingest(now_ms, node_timestamp_ms=now_ms, dropped=0, quality=90, battery_mv=3700)
+    series.advance(30_000)
+
+    one = series.to_dict(1)
+    assert len(one["t_ms"]) == 30
+    assert one["packet_rate_hz"]["mean"][5:15] == [0.0] * 10
+    assert one["quality"]["mean"][7] is None
+
+    ten = series.to_dict(10)
+    assert ten["t_ms"] == [0, 10_000]
+    assert ten["packet_rate_hz"]["min"] == [0.0, 0.0]
+    assert ten["packet_rate_hz"]["mean"] == [2.0, 2.0]
+    assert ten["packet_rate_hz"]["max"] == [4.0, 4.0]
+    assert ten["quality"]["mean"] == [90.0, 90.0]
+    assert series.to_dict(10, since_ms=5_000)["t_ms"] == [10_000]
+
+
+def test_memory_is_fixed_regardless_of_duration() -> None:
+    series = LinkSeries()
+    for second in range(0, 4 * 3600, 7):
+        series.ingest(second * 1000, node_timestamp_ms=0, dropped=0, quality=90, battery_mv=0)
+    for width, capacity in SERIES_RESOLUTIONS:
+        assert len(series.rings[width]) <= capacity
+    assert len(series.to_dict(1)["t_ms"]) == dict(SERIES_RESOLUTIONS)[1]
+    assert all(value is None or not math.isnan(value) for value in series.to_dict(60)["battery_mv"]["mean"])
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from server.config import CoordinatorConfig
+from server.slots import PlayerSlots
+from server.state import PlayerRegistry
+from server.world_sim import WorldSimulator
+
+
+def test_allocate_lowest_free_id_and_keep_indices_dense() -> None:
+    slots = PlayerSlots(max_id=6)
+    for player_id in (1, 2, 3, 5):
+        slots.add(player_id)
+    assert slots.allocate_id() == 4
+    slots.add(4)
+    assert slots.allocate_id() == 6
+
+    assert slots.remove(2) == (1, 4)
+    assert slots.ids == [1, 4, 3, 5]
+    assert all(slots.index(player_id) == index for index, player_id in enumerate(slots.ids))
+    assert slots.remove(5) == (3, None)
+    assert slots.remove(5) is None
+    assert slots.allocate_id() == 2
+
+    # A node claiming a released id takes it off the free list.
+    slots.add(2)
+    assert slots.allocate_id() == 5
+    slots.add(5)
+    slots.add(6)
+    assert slots.allocate_id() is None
+
+
+def test_registry_holds_thousands_of_sim_players() -> None:
+    config = CoordinatorConfig(default_player_ids=())
+    world = WorldSimulator(arena_width_m=config.arena_width_m, arena_height_m=config.arena_height_m, seed=3)
+    registry = PlayerRegistry(config=config, world=world)
+    added = [registry.add_sim_player() for _ in range(3000)]
+    assert added == list(range(1, 3001))
+    assert registry.remove_sim_player() == 3000
+    assert registry.remove_sim_player() == 2999
+    assert registry.add_sim_player() == 2999
+    assert len(registry.slots) == len(registry.players) == 2999
+    assert len(registry.world_state_message(now_ms=1_000)["players"]) == 2999
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from server.config import CoordinatorConfig
+from server.main import MatchCoordinator
+from server.packet import TelemetryPacket, encode_telemetry
+from server.snapshot import SnapshotStore
+
+
+def test_publish_assigns_generations_and_etags() -> None:
+    store = SnapshotStore("abc")
+    first = store.publish(ts_ms=10, text='{"players":[]}', players_online=0, player_fragments={})
+    second = store.publish(ts_ms=20, text='{"players":[]}', players_online=0, player_fragments={})
+
+    assert (first.generation, second.generation) == (1, 2)
+    assert first.etag != second.etag
+    assert store.latest is second
+    assert second.body == b'{"players":[]}'
+
+
+def test_wait_after_returns_newer_snapshot_or_times_out() -> None:
+    async def scenario() -> tuple[int | None, bool]:
+        store = SnapshotStore("abc")
+        store.publish(ts_ms=10, text="{}", players_online=0, player_fragments={})
+
+        async def publish_later() -> None:
+            await asyncio.sleep(0.01)
+            store.publish(ts_ms=20, text="{}", players_online=0, player_fragments={1: "{}"})
+
+        task = asyncio.create_task(publish_later())
+        newer = await store.wait_after(1, timeout_s=1.0)
+        await task
+        timed_out = await store.wait_after(2, timeout_s=0.01)
+        return (None if newer is None else newer.generation), timed_out is None
+
+    generation, timed_out = asyncio.run(scenario())
+    assert generation == 2
+    assert timed_out is True
+
+
+def test_idle_world_advances_clock_but_keeps_etags() -> None:
+    now = [1_000]
+    coordinator = MatchCoordinator(
+        CoordinatorConfig(default_player_ids=(1, 2), use_sim_positions=False, blackbox_mb=0.0),
+        clock=lambda: now[0],
+    )
+    packet = TelemetryPacket(
+        player_id=2,
+        seq=1,
+        timestamp_ms=0,
+        yaw_deg=90.0,
+        pitch_deg=0.0,
+        roll_deg=0.0,
+        quality=90,
+        pos_x_cm=0,
+        pos_y_cm=0,
+        pos_quality=0,
+        battery_mv=3700,
+        flags=0,
+    )
+    coordinator.handle_udp_packet(encode_telemetry(packet), ("127.0.0.1", 12002))
+    first = coordinator.publish_snapshot()
+    assert first.text.count('"events"') == 1
+
+    # Nothing changes but the clock: the frame moves on, the ETags hold.
+    now[0] = 1_900
+    second = coordinator.publish_snapshot()
+    assert second.generation == first.generation + 1
+    frame = json.loads(second.text)
+    assert frame["server_time_ms"] == 1_900
+    assert next(entry for entry in frame["players"] if entry["id"] == 2)["last_seen_ms_ago"] == 900
+    store = coordinator.snapshots
+    assert second.etag == first.etag
+    assert store.player_etag(second, 2) == store.player_etag(first, 2)
+
+    packet.seq = 2
+    packet.yaw_deg = 180.0
+    coordinator.handle_udp_packet(encode_telemetry(packet), ("127.0.0.1", 12002))
+    third = coordinator.publish_snapshot()
+    assert third.etag != second.etag
+    assert store.player_etag(third, 1) == store.player_etag(second, 1)
+    assert store.player_etag(third, 2) != store.player_etag(second, 2)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 
 from server.config import CoordinatorConfig
 from server.packet import TelemetryPacket
-from server.state import PlayerRegistry
+from server.state import PlayerRegistry, TelemetryHistory
 from server.world_sim import WorldSimulator
 
 
@@ -84,3 +86,290 @@ def test_real_players_still_timeout_with_emulation_enabled() -> None:
     registry.update_online_flags(now_ms=3_500)
     assert player.online is False
     assert player.connected_since_ms is None
+
+
+def test_emulated_sim_players_time_out_once_emulation_stops() -> None:
+    config = CoordinatorConfig(default_player_ids=(1, 2), sim_players_emulate_real=True, offline_timeout_ms=2_000)
+    registry = build_registry(config)
+    for now_ms in range(0, 10_000, 100):
+        registry.update_online_flags(now_ms)
+    # Heartbeats no longer queue a deadline per sim player per tick.
+    assert len(registry.offline_deadlines) == 0
+    assert all(player.online for player in registry.players.values())
+
+    config.apply_updates({"sim_players_emulate_real": False})
+    registry.update_online_flags(now_ms=10_000)
+    assert len(registry.offline_deadlines) == 2
+    registry.update_online_flags(now_ms=11_900)
+    assert registry.players[1].online
+    registry.update_online_flags(now_ms=11_901)
+    assert not any(player.online for player in registry.players.values())
+
+
+def test_fragments_rebuild_only_changed_players() -> None:
+    config = CoordinatorConfig(default_player_ids=(1, 2, 3))
+    registry = build_registry(config)
+    registry.world_state_message(now_ms=1_000)
+    assert registry.refresh_fragments() == 0
+
+    pkt = TelemetryPacket(
+        player_id=2,
+        seq=1,
+        timestamp_ms=0,
+        yaw_deg=45.0,
+        pitch_deg=0.0,
+        roll_deg=0.0,
+        quality=90,
+        pos_x_cm=0,
+        pos_y_cm=0,
+        pos_quality=0,
+        battery_mv=3700,
+        flags=0,
+    )
+    registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12002), now_ms=1_100)
+    assert registry.refresh_fragments() == 1
+
+    message = registry.world_state_message(now_ms=1_200)
+    player = next(entry for entry in message["players"] if entry["id"] == 2)
+    assert player["yaw_deg"] == 45.0
+    assert player["addr"] == "127.0.0.1:12002"
+    assert player["last_seen_ms_ago"] == 100
+
+    registry.world.step(0.1)
+    assert registry.refresh_fragments() == 3
+
+
+def test_sim_steps_rebuild_only_sim_shown_players() -> None:
+    config = CoordinatorConfig(default_player_ids=(1, 2))
+    registry = build_registry(config)
+    # Player 4 is placed by UWB; its sim twin keeps walking but is not what the UI shows.
+    registry.ingest_telemetry(history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0), ("127.0.0.1", 12004), now_ms=0)
+    registry.refresh_fragments()
+    placed = registry.player_fragments_json(now_ms=0)[2]
+
+    for _ in range(3):
+        registry.world.step(0.1)
+        assert registry.refresh_fragments() == 2
+    fragments = [json.loads(text) for text in registry.player_fragments_json(now_ms=0)]
+    assert registry.player_fragments_json(now_ms=0)[2] == placed
+    assert fragments[2]["pos_source"] == "real"
+    assert len(fragments[0]["trail"]) == 4
+    assert fragments[0]["trail"][-1] == [round(fragments[0]["x_m"], 3), round(fragments[0]["y_m"], 3)]
+
+
+def test_fragment_json_matches_message() -> None:
+    config = CoordinatorConfig(default_player_ids=(1, 2))
+    registry = build_registry(config)
+    registry.update_alert_hysteresis(player_id=1, now_ms=500, inside_on=True, inside_off=True, intensity=200)
+
+    message = registry.world_state_message(now_ms=1_000)
+    fragments = [json.loads(text) for text in registry.player_fragments_json(now_ms=1_000)]
+
+    assert fragments == json.loads(json.dumps(message["players"]))
+    assert fragments[0]["alert"] is True
+    assert fragments[0]["alert_intensity"] == 200
+
+
+def history_packet(seq: int, timestamp_ms: int, yaw_deg: float, pos_quality: int = 100) -> TelemetryPacket:
+    return TelemetryPacket(
+        player_id=4,
+        seq=seq,
+        timestamp_ms=timestamp_ms,
+        yaw_deg=yaw_deg,
+        pitch_deg=0.0,
+        roll_deg=0.0,
+        quality=90,
+        pos_x_cm=seq * 100,
+        pos_y_cm=0,
+        pos_quality=pos_quality,
+        battery_mv=3700,
+        flags=0,
+    )
+
+
+def test_telemetry_history_interpolates_on_both_clocks() -> None:
+    history = TelemetryHistory(capacity=8)
+    for seq in range(12):
+        history.append(1_000 + seq * 100, history_packet(seq, 50_000 + seq * 90, yaw_deg=(330.0 + seq * 4) % 360))
+
+    assert len(history) == 8
+    window = history.window()
+    assert window["recv_ms"][0] == 1_400 and window["recv_ms"][-1] == 2_100
+    assert history.interpolate(1_399) is None
+    assert history.interpolate(2_101) is None
+
+    sample = history.interpolate(1_450)
+    assert sample is not None
+    assert sample["x_m"] == pytest.approx(4.5)
+    assert sample["yaw_deg"] == pytest.approx(348.0)
+    by_node = history.interpolate(50_000 + 4.5 * 90, clock="node")
+    assert by_node is not None and by_node["recv_ms"] == pytest.approx(1_450)
+
+    # Crossing north interpolates the short way round.
+    sample = history.interpolate(1_725)
+    assert sample is not None and sample["yaw_deg"] == pytest.approx(359.0)
+    sample = history.interpolate(1_775)
+    assert sample is not None and sample["yaw_deg"] == pytest.approx(1.0)
+
+    assert history.window(1_500, 1_700)["recv_ms"] == [1_500, 1_600, 1_700]
+    assert history.window(50_000 + 9 * 90, None, clock="node")["node_ms"][0] == 50_000 + 9 * 90
+
+
+def test_telemetry_history_restarts_when_node_clock_goes_back() -> None:
+    history = TelemetryHistory(capacity=8)
+    history.append(1_000, history_packet(1, 90_000, 0.0))
+    history.append(1_100, history_packet(2, 90_100, 0.0, pos_quality=0))
+    assert history.window()["x_m"] == [1.0, None]
+    history.append(1_200, history_packet(3, 5, 0.0))
+    assert history.window()["node_ms"] == [5]
+
+
+def test_alert_hold_released_by_deadline() -> None:
+    config = CoordinatorConfig(default_player_ids=(1,), alert_hold_ms=300)
+    registry = build_registry(config)
+    registry.update_alert_hysteresis(player_id=1, now_ms=1_000, inside_on=True, inside_off=True, intensity=200)
+    # In the hysteresis band: held on, refreshed only while inside the on-cone.
+    registry.update_alert_hysteresis(player_id=1, now_ms=1_100, inside_on=False, inside_off=True, intensity=0)
+    registry.update_alert_hysteresis(player_id=1, now_ms=1_200, inside_on=True, inside_off=True, intensity=150)
+    assert registry.expire_alert_holds(1_400) == []
+    registry.update_alert_hysteresis(player_id=1, now_ms=1_450, inside_on=False, inside_off=True, intensity=0)
+    assert registry.players[1].alert_on is True
+    assert registry.expire_alert_holds(1_500) == [1]
+    assert registry.players[1].alert_on is False
+    assert registry.expire_alert_holds(2_000) == []
+
+
+def test_online_flags_only_visit_expired_players() -> None:
+    config = CoordinatorConfig(default_player_ids=(), offline_timeout_ms=1_000)
+    registry = build_registry(config)
+    for player_id in range(1, 51):
+        pkt = history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0)
+        pkt.player_id = player_id
+        registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12000 + player_id), now_ms=player_id * 10)
+    registry.update_online_flags(now_ms=1_200)
+    offline = [pid for pid, player in registry.players.items() if not player.online]
+    assert offline == list(range(1, 20))
+    assert len(registry.offline_deadlines) == 31
+
+
+def test_position_fusion_prefers_uwb_then_gps_then_sim() -> None:
+    config = CoordinatorConfig(default_player_ids=(), arena_origin_lat_deg=32.0853, arena_origin_lon_deg=34.7818)
+    registry = build_registry(config)
+    pkt = history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0, pos_quality=0)
+    pkt.gps_lat_deg, pkt.gps_lon_deg, pkt.gps_quality = 32.0854, 34.7819, 90
+    registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12004), now_ms=1_000)
+
+    message = registry.world_state_message(now_ms=1_000)
+    assert message["players"][0]["pos_source"] == "gps"
+    x_m, y_m = registry.build_logic_players(1_000)[4].position
+    assert x_m == pytest.approx(9.44, abs=0.05) and y_m == pytest.approx(11.09, abs=0.05)
+
+    # A weak fix falls back to the simulator; a valid UWB fix wins over GPS.
+    config.gps_quality_threshold = 95
+    sim = registry.world.ensure_player(4)
+    assert registry.build_logic_players(1_000)[4].position == (sim.x_m, sim.y_m)
+    assert registry.display_position(registry.players[4])[1] == "sim"
+    config.gps_quality_threshold = 50
+    pkt = history_packet(seq=2, timestamp_ms=50, yaw_deg=0.0, pos_quality=100)
+    pkt.gps_lat_deg, pkt.gps_lon_deg, pkt.gps_quality = 32.0854, 34.7819, 90
+    registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12004), now_ms=1_050)
+    assert registry.display_position(registry.players[4])[1] == "real"
+
+    # Moving the origin re-projects existing fixes.
+    config.arena_origin_lat_deg = 32.0854
+    config.arena_origin_lon_deg = 34.7819
+    registry.project_gps()
+    assert registry.players[4].gps_x_m == pytest.approx(0.0, abs=1e-6)
+
+
+def test_long_offline_real_players_are_evicted() -> None:
+    config = CoordinatorConfig(default_player_ids=(1,), offline_timeout_ms=1_000, player_ttl_ms=5_000)
+    registry = build_registry(config)
+    registry.ingest_telemetry(history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0), addr=("127.0.0.1", 12004), now_ms=0)
+    registry.world.step(1.0)
+    before = registry.memory_stats()
+    assert before["world"]["count"] == 2 and before["history"]["count"] == 1
+
+    registry.update_online_flags(now_ms=1_500)
+    assert not registry.players[4].online and 4 in registry.evict_deadlines
+    registry.update_online_flags(now_ms=4_999)
+    assert 4 in registry.players
+    registry.update_online_flags(now_ms=5_000)
+
+    # The never-connected sim player stays; the node and everything it held is gone.
+    assert sorted(registry.players) == [1]
+    assert sorted(registry.world.players) == [1]
+    after = registry.memory_stats()
+    assert after["history"] == {"count": 0, "bytes": 0}
+    assert after["world"]["trail_points"] < before["world"]["trail_points"]
+    assert registry.evicted_total == 1
+    assert 4 not in registry.slots and 4 not in registry.filters.slots
+
+    # A returning node is admitted again from scratch.
+    registry.ingest_telemetry(history_packet(seq=2, timestamp_ms=9_000, yaw_deg=0.0), ("127.0.0.1", 12004), 9_000)
+    assert registry.players[4].online and 4 not in registry.evict_deadlines
+
+
+def test_offline_deadlines_follow_a_changed_timeout() -> None:
+    config = CoordinatorConfig(default_player_ids=(), offline_timeout_ms=10_000)
+    registry = build_registry(config)
+    registry.ingest_telemetry(history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0), addr=("127.0.0.1", 12004), now_ms=0)
+
+    config.apply_updates({"offline_timeout_ms": 1_000})
+    registry.update_online_flags(now_ms=1_001)
+    assert not registry.players[4].online
+
+    registry.ingest_telemetry(history_packet(seq=2, timestamp_ms=2_000, yaw_deg=0.0), ("127.0.0.1", 12004), 2_000)
+    config.apply_updates({"offline_timeout_ms": 5_000})
+    registry.update_online_flags(now_ms=3_500)
+    assert registry.players[4].online
+    registry.update_online_flags(now_ms=7_001)
+    assert not registry.players[4].online
+
+
+def test_eviction_follows_a_changed_ttl() -> None:
+    config = CoordinatorConfig(default_player_ids=(), offline_timeout_ms=1_000, player_ttl_ms=0)
+    registry = build_registry(config)
+    registry.ingest_telemetry(history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0), addr=("127.0.0.1", 12004), now_ms=0)
+    registry.update_online_flags(now_ms=1_500)
+    assert not registry.players[4].online and 4 not in registry.evict_deadlines
+
+    # Enabling the TTL later still evicts a player that went offline while it was 0.
+    config.apply_updates({"player_ttl_ms": 5_000})
+    registry.update_online_flags(now_ms=4_999)
+    assert 4 in registry.players
+    registry.update_online_flags(now_ms=5_000)
+    assert 4 not in registry.players
+
+    # Lowering it moves the eviction earlier; setting it to 0 cancels it.
+    config.apply_updates({"player_ttl_ms": 600_000})
+    registry.ingest_telemetry(history_packet(seq=2, timestamp_ms=9_000, yaw_deg=0.0), ("127.0.0.1", 12004), 9_000)
+    registry.update_online_flags(now_ms=10_500)
+    assert registry.evict_deadlines.deadline(4) == 609_000
+    config.apply_updates({"player_ttl_ms": 5_000})
+    registry.update_online_flags(now_ms=13_999)
+    assert 4 in registry.players
+    registry.update_online_flags(now_ms=14_000)
+    assert 4 not in registry.players
+
+    registry.ingest_telemetry(history_packet(seq=3, timestamp_ms=20_000, yaw_deg=0.0), ("127.0.0.1", 12004), 20_000)
+    registry.update_online_flags(now_ms=21_500)
+    config.apply_updates({"player_ttl_ms": 0})
+    registry.update_online_flags(now_ms=100_000)
+    assert 4 in registry.players and 4 not in registry.evict_deadlines
+
+
+def test_max_players_rejects_new_ids_only() -> None:
+    config = CoordinatorConfig(default_player_ids=(1, 2), max_players=3)
+    registry = build_registry(config)
+    assert registry.add_sim_player() == 3
+    assert registry.add_sim_player() is None
+
+    pkt = history_packet(seq=1, timestamp_ms=0, yaw_deg=0.0)
+    assert registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12004), now_ms=0) is False
+    assert 4 not in registry.players and 4 not in registry.world.players
+    assert registry.rejected_packets == 1
+
+    pkt.player_id = 2
+    assert registry.ingest_telemetry(pkt, addr=("127.0.0.1", 12002), now_ms=0) is True
+    assert registry.players[2].online
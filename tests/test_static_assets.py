@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from server.static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, StaticAssetCache
+
+
+def test_cache_precompresses_and_marks_hashed_assets_immutable(tmp_path: Path) -> None:
+    (tmp_path / "assets").mkdir()
+    script = b"console.log('fdw');\n" * 100
+    (tmp_path / "assets" / "index-3f9aB2c1.js").write_bytes(script)
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>" * 40)
+    (tmp_path / "skip").mkdir()
+    (tmp_path / "skip" / "a.txt").write_bytes(b"x")
+
+    cache = StaticAssetCache(tmp_path, exclude=("skip",), hashed_dir="assets")
+
+    hashed = cache.get("assets/index-3f9aB2c1.js")
+    assert hashed is not None
+    assert hashed.cache_control == IMMUTABLE_CACHE_CONTROL
+    assert gzip.decompress(hashed.variants["gzip"]) == script
+
+    index = cache.get("index.html")
+    assert index is not None
+    assert index.cache_control == REVALIDATE_CACHE_CONTROL
+    assert cache.get("skip/a.txt") is None
+
+
+def test_small_files_are_not_compressed(tmp_path: Path) -> None:
+    (tmp_path / "tiny.css").write_bytes(b"body{margin:0}")
+    cache = StaticAssetCache(tmp_path)
+
+    asset = cache.get("tiny.css")
+    assert asset is not None
+    assert set(asset.variants) == {"identity"}
+    assert asset.content_type == "text/css"
+
+
+@pytest.mark.parametrize(
+    "rel",
+    [
+        "assets/my-component.js",
+        "assets/app-settings.json",
+        "assets/leaflet.markercluster.js",
+        "assets/index.html",
+        "index-3f9aB2c1.js",
+        "lib/assets/index-3f9aB2c1.js",
+    ],
+)
+def test_ordinary_names_are_revalidated(tmp_path: Path, rel: str) -> None:
+    (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+    (tmp_path / rel).write_bytes(b"x")
+    asset = StaticAssetCache(tmp_path, hashed_dir="assets").get(rel)
+    assert asset is not None and asset.cache_control == REVALIDATE_CACHE_CONTROL
+
+
+def test_legacy_assets_are_never_immutable(tmp_path: Path) -> None:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-3f9aB2c1.js").write_bytes(b"x")
+    assert StaticAssetCache(tmp_path).get("assets/index-3f9aB2c1.js").cache_control == REVALIDATE_CACHE_CONTROL
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from server.config import CoordinatorConfig
+from server.main import MatchCoordinator
+from server.packet import TelemetryPacket, encode_telemetry
+from server.zones import ZONE_DOWNGRADE, ZONE_SUPPRESS, ZoneIndex, normalize_zones
+
+
+# A U-shaped briefing area with its notch open to the north, plus a spectator strip.
+U_ZONE = {
+    "id": "briefing",
+    "mode": "suppress",
+    "points": [[0, 0], [30, 0], [30, 20], [20, 20], [20, 8], [10, 8], [10, 20], [0, 20]],
+}
+STRIP = {"id": "strip", "mode": "downgrade", "points": [[-5, 25], [40, 25], [40, 28], [-5, 28]]}
+
+
+def test_grid_index_matches_polygon_test() -> None:
+    index = ZoneIndex(normalize_zones([U_ZONE, STRIP]), cell_m=4.0)
+    rng = random.Random(7)
+    for _ in range(5000):
+        x, y = rng.uniform(-10, 45), rng.uniform(-10, 35)
+        expected = 0
+        for zone in index.zones:
+            if zone.contains(x, y):
+                expected |= ZONE_SUPPRESS if zone.mode == "suppress" else ZONE_DOWNGRADE
+        assert index.classify(x, y) == expected
+    assert index.classify(15.0, 12.0) == 0  # inside the notch
+    assert index.classify(5.0, 5.0) == ZONE_SUPPRESS
+    assert index.zones_at(0.0, 26.0) == ["strip"]
+
+
+def test_random_polygons_and_arena_sized_zone() -> None:
+    rng = random.Random(3)
+    for _ in range(20):
+        points = [[rng.uniform(-50, 50), rng.uniform(-50, 50)] for _ in range(rng.randint(3, 12))]
+        index = ZoneIndex(normalize_zones([{"points": points}]), cell_m=rng.choice([1.0, 3.0, 5.0]))
+        zone = index.zones[0]
+        for _ in range(500):
+            x, y = rng.uniform(-60, 60), rng.uniform(-60, 60)
+            assert bool(index.classify(x, y)) == zone.contains(x, y)
+
+    # The largest zone the limits allow is rasterized row by row, not cell by edge.
+    index = ZoneIndex(normalize_zones([{"points": [[-1000, -1000], [1000, -1000], [0, 1000]]}]))
+    assert index.classify(0.0, 0.0) == ZONE_SUPPRESS
+    assert index.classify(900.0, 900.0) == 0
+
+
+@pytest.mark.parametrize(
+    "zones",
+    [
+        "not a list",
+        [{"points": [[0, 0], [1, 1]]}],
+        [{"mode": "mute", "points": [[0, 0], [1, 0], [1, 1]]}],
+        [{"id": "a", "points": [[0, 0], [1, 0], [1, 1]]}, {"id": "a", "points": [[0, 0], [1, 0], [1, 1]]}],
+        [{"points": [[0, 0], [1, "x"], [1, 1]]}],
+        [{"points": [[0, 0], [20000, 0], [0, 20000]]}],
+        [{"id": f"z{i}", "points": [[-1000, -1000], [1000, -1000], [0, 1000]]} for i in range(2)],
+    ],
+)
+def test_bad_zone_specs_are_rejected(zones) -> None:
+    config = CoordinatorConfig()
+    with pytest.raises(ValueError):
+        config.apply_updates({"max_range_m": 40.0, "zones": zones})
+    assert config.max_range_m == 15.0 and config.version == 1
+
+
+def telemetry(player_id: int, x_cm: int, yaw_deg: float) -> bytes:
+    return encode_telemetry(
+        TelemetryPacket(
+            player_id=player_id,
+            seq=1,
+            timestamp_ms=0,
+            yaw_deg=yaw_deg,
+            pitch_deg=0.0,
+            roll_deg=0.0,
+            quality=90,
+            pos_x_cm=x_cm,
+            pos_y_cm=500,
+            pos_quality=100,
+            battery_mv=3700,
+            flags=0,
+        )
+    )
+
+
+def alert_after_tick(zones: list[dict]) -> tuple[bool, int]:
+    now = [1_000]
+    coordinator = MatchCoordinator(
+        CoordinatorConfig(default_player_ids=(), use_sim_positions=False, blackbox_mb=0.0, zones=zones),
+        clock=lambda: now[0],
+    )
+    # Player 1 at x=2 m looks east at player 2 at x=8 m.
+    coordinator.handle_udp_packet(telemetry(1, 200, 0.0), ("127.0.0.1", 1))
+    coordinator.handle_udp_packet(telemetry(2, 800, 180.0), ("127.0.0.1", 2))
+    coordinator._run_alert_tick(now[0])
+    player = coordinator.state.players[1]
+    return player.alert_on, player.alert_intensity
+
+
+def test_zones_mask_and_cap_alerts() -> None:
+    alert_on, intensity = alert_after_tick([])
+    assert alert_on and intensity > 80
+
+    target_zone = {"id": "t", "mode": "suppress", "points": [[7, 4], [9, 4], [9, 6], [7, 6]]}
+    assert alert_after_tick([target_zone]) == (False, 0)
+    source_zone = {"id": "s", "mode": "downgrade", "points": [[1, 4], [3, 4], [3, 6], [1, 6]]}
+    assert alert_after_tick([source_zone]) == (True, 80)
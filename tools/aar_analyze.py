@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+import numpy as np
+
+# Allow direct script execution: python tools/aar_analyze.py
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.config import CoordinatorConfig
+from server.packet import (
+    ALERT_SIZE,
+    ALERT_V3_SIZE,
+    MSG_TELEMETRY,
+    TELEMETRY_V1_SIZE,
+    TELEMETRY_V2_SIZE,
+    TELEMETRY_V3_SIZE,
+)
+from server.recfile import (
+    ANALYSIS_NAME,
+    MANIFEST_NAME,
+    RECORD_HEADER,
+    REC_ALERT,
+    REC_CONFIG,
+    REC_TELEMETRY,
+    SEGMENT_HEADER,
+    read_segment_header,
+)
+
+
+LOG = logging.getLogger("fdw.aar_analyze")
+
+# Bump whenever the result layout or the math changes; invalidates cached results.
+ANALYZER_VERSION = 1
+# Upper bound on source x target x bin elements evaluated per NumPy block.
+BLOCK_ELEMENTS = 4_000_000
+
+# Packed little-endian layouts of server/packet.py's telemetry and alert formats.
+_TELEMETRY_V1_FIELDS = [
+    ("magic", "S2"),
+    ("version", "u1"),
+    ("msg_type", "u1"),
+    ("player_id", "u1"),
+    ("seq", "<u2"),
+    ("timestamp_ms", "<u4"),
+    ("yaw_cd", "<i2"),
+    ("pitch_cd", "<i2"),
+    ("roll_cd", "<i2"),
+    ("quality", "u1"),
+    ("pos_x_cm", "<i4"),
+    ("pos_y_cm", "<i4"),
+    ("pos_quality", "u1"),
+    ("battery_mv", "<u2"),
+    ("flags", "u1"),
+]
+TELEMETRY_V1_DTYPE = np.dtype([*_TELEMETRY_V1_FIELDS, ("crc", "<u2")])
+TELEMETRY_V2_DTYPE = np.dtype(
+    [
+        *_TELEMETRY_V1_FIELDS,
+        ("gps_lat_e7", "<i4"),
+        ("gps_lon_e7", "<i4"),
+        ("gps_alt_cm", "<i4"),
+        ("gps_quality", "u1"),
+        ("crc", "<u2"),
+    ]
+)
+# v3 only widens player_id to u16.
+TELEMETRY_V3_DTYPE = np.dtype(
+    [(name, "<u2" if name == "player_id" else kind) for name, kind in TELEMETRY_V2_DTYPE.descr]
+)
+_ALERT_FIELDS = [
+    ("magic", "S2"),
+    ("version", "u1"),
+    ("msg_type", "u1"),
+    ("player_id", "u1"),
+    ("alert_on", "u1"),
+    ("intensity", "u1"),
+    ("hold_ms", "<u2"),
+    ("crc", "<u2"),
+]
+ALERT_DTYPE = np.dtype(_ALERT_FIELDS)
+ALERT_V3_DTYPE = np.dtype([(name, "<u2" if name == "player_id" else kind) for name, kind in _ALERT_FIELDS])
+assert TELEMETRY_V1_DTYPE.itemsize == TELEMETRY_V1_SIZE
+assert TELEMETRY_V2_DTYPE.itemsize == TELEMETRY_V2_SIZE
+assert TELEMETRY_V3_DTYPE.itemsize == TELEMETRY_V3_SIZE
+assert ALERT_DTYPE.itemsize == ALERT_SIZE
+assert ALERT_V3_DTYPE.itemsize == ALERT_V3_SIZE
+TELEMETRY_DTYPES = {dtype.itemsize: dtype for dtype in (TELEMETRY_V1_DTYPE, TELEMETRY_V2_DTYPE, TELEMETRY_V3_DTYPE)}
+ALERT_DTYPES = {dtype.itemsize: dtype for dtype in (ALERT_DTYPE, ALERT_V3_DTYPE)}
+
+# Cone parameters taken from the session's recorded config unless overridden.
+PARAM_KEYS = (
+    "max_range_m",
+    "cone_half_angle_deg",
+    "quality_threshold",
+    "pos_quality_threshold",
+    "offline_timeout_ms",
+    "arena_width_m",
+    "arena_height_m",
+)
+
+
+def _gather(raw: np.ndarray, offsets: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Copy fixed-size payloads at `offsets` into one structured array."""
+    if offsets.size == 0:
+        return np.zeros(0, dtype=dtype)
+    rows = raw[offsets[:, None] + np.arange(dtype.itemsize)]
+    return np.ascontiguousarray(rows).view(dtype).reshape(-1)
+
+
+def read_session(session_dir: Path, manifest: dict[str, Any]) -> dict[str, Any]:
+    """Decode a session's telemetry and alert records into column arrays.
+
+    Record headers are walked once per segment; the fixed-size payloads are
+    then decoded in bulk with structured dtypes. CRCs are not re-checked:
+    the recorder only writes datagrams that already passed ingest.
+    """
+    telemetry: dict[str, list[np.ndarray]] = {"t_us": [], "player_id": [], "yaw_cd": [], "quality": []}
+    telemetry.update({"pos_x_cm": [], "pos_y_cm": [], "pos_quality": []})
+    alerts: dict[str, list[np.ndarray]] = {"t_us": [], "player_id": [], "alert_on": [], "intensity": []}
+    config: dict[str, Any] = {}
+    header_size = RECORD_HEADER.size
+    unpack_header = RECORD_HEADER.unpack_from
+
+    for segment in sorted(manifest.get("segments", []), key=lambda item: item["index"]):
+        data = (session_dir / segment["file"]).read_bytes()
+        if len(data) < SEGMENT_HEADER.size:
+            continue
+        read_segment_header(data)
+        by_size: dict[int, tuple[list[int], list[int]]] = {size: ([], []) for size in TELEMETRY_DTYPES}
+        alerts_by_size: dict[int, tuple[list[int], list[int]]] = {size: ([], []) for size in ALERT_DTYPES}
+        offset = SEGMENT_HEADER.size
+        limit = len(data)
+        while offset + header_size <= limit:
+            length, rtype, _flags, _player_id, t_us = unpack_header(data, offset)
+            start = offset + header_size
+            offset = start + length
+            if offset > limit:
+                break
+            if rtype == REC_TELEMETRY:
+                slot = by_size.get(length)
+                if slot is not None and data[start + 3] == MSG_TELEMETRY:
+                    slot[0].append(start)
+                    slot[1].append(t_us)
+            elif rtype == REC_ALERT and length in alerts_by_size:
+                alerts_by_size[length][0].append(start)
+                alerts_by_size[length][1].append(t_us)
+            elif rtype == REC_CONFIG and not config:
+                try:
+                    config = json.loads(data[start:offset]).get("config", {})
+                except ValueError:
+                    LOG.warning("%s: unreadable config record", session_dir.name)
+
+        raw = np.frombuffer(data, dtype=np.uint8)
+        for size, dtype in TELEMETRY_DTYPES.items():
+            offsets, times = by_size[size]
+            packets = _gather(raw, np.asarray(offsets, dtype=np.int64), dtype)
+            telemetry["t_us"].append(np.asarray(times, dtype=np.int64))
+            for name in ("player_id", "yaw_cd", "quality", "pos_x_cm", "pos_y_cm", "pos_quality"):
+                telemetry[name].append(packets[name])
+        for size, dtype in ALERT_DTYPES.items():
+            offsets, times = alerts_by_size[size]
+            packets = _gather(raw, np.asarray(offsets, dtype=np.int64), dtype)
+            alerts["t_us"].append(np.asarray(times, dtype=np.int64))
+            for name in ("player_id", "alert_on", "intensity"):
+                alerts[name].append(packets[name])
+
+    def concat(columns: dict[str, list[np.ndarray]]) -> dict[str, np.ndarray]:
+        out = {name: np.concatenate(parts) if parts else np.zeros(0) for name, parts in columns.items()}
+        order = np.argsort(out["t_us"], kind="stable")
+        return {name: values[order] for name, values in out.items()}
+
+    return {"telemetry": concat(telemetry), "alerts": concat(alerts), "config": config}
+
+
+def _resample(
+    telemetry: dict[str, np.ndarray],
+    player_ids: np.ndarray,
+    grid_us: np.ndarray,
+    params: dict[str, Any],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sample-and-hold every player's last packet onto the time grid.
+
+    Returns (x, y, yaw_rad, source_ok, target_ok), each shaped (bins, players),
+    with the same gating as the live alert loop: a source must be online,
+    above the quality threshold and have a valid position; a target only
+    needs a valid position.
+    """
+    shape = (grid_us.size, player_ids.size)
+    x = np.zeros(shape)
+    y = np.zeros(shape)
+    yaw = np.zeros(shape)
+    source_ok = np.zeros(shape, dtype=bool)
+    target_ok = np.zeros(shape, dtype=bool)
+    timeout_us = int(params["offline_timeout_ms"]) * 1000
+    for col, player_id in enumerate(player_ids):
+        mask = telemetry["player_id"] == player_id
+        t_us = telemetry["t_us"][mask]
+        if t_us.size == 0:
+            continue
+        idx = np.searchsorted(t_us, grid_us, side="right") - 1
+        seen = idx >= 0
+        idx = np.maximum(idx, 0)
+        has_position = seen & (telemetry["pos_quality"][mask][idx] >= params["pos_quality_threshold"])
+        online = seen & ((grid_us - t_us[idx]) <= timeout_us)
+        x[:, col] = telemetry["pos_x_cm"][mask][idx] / 100.0
+        y[:, col] = telemetry["pos_y_cm"][mask][idx] / 100.0
+        yaw[:, col] = np.radians(telemetry["yaw_cd"][mask][idx] / 100.0)
+        target_ok[:, col] = has_position
+        source_ok[:, col] = has_position & online & (telemetry["quality"][mask][idx] >= params["quality_threshold"])
+    return x, y, yaw, source_ok, target_ok
+
+
+def exposure(
+    x: np.ndarray,
+    y: np.ndarray,
+    yaw: np.ndarray,
+    source_ok: np.ndarray,
+    target_ok: np.ndarray,
+    max_range_m: float,
+    cone_half_angle_deg: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `server.logic.evaluate_targets` inside_on test for every (bin, source, target).
+
+    Returns (inside, intensity), shaped (bins, sources, targets); intensity is
+    zero where the target is outside the cone.
+    """
+    cone_half_rad = np.radians(cone_half_angle_deg)
+    dx = x[:, None, :] - x[:, :, None]
+    dy = y[:, None, :] - y[:, :, None]
+    distance = np.hypot(dx, dy)
+    bearing = np.arctan2(dy, dx)
+    dyaw = np.abs((yaw[:, :, None] - bearing + np.pi) % (2.0 * np.pi) - np.pi)
+    inside = (
+        source_ok[:, :, None]
+        & target_ok[:, None, :]
+        & (distance >= 1e-6)
+        & (distance < max_range_m)
+        & (dyaw < cone_half_rad)
+    )
+    range_term = np.clip(1.0 - distance / max_range_m, 0.0, 1.0)
+    angle_term = np.clip(1.0 - dyaw / cone_half_rad, 0.0, 1.0)
+    intensity = np.where(inside, (40 + 215 * (0.55 * range_term + 0.45 * angle_term)).astype(np.int64), 0)
+    return inside, intensity
+
+
+def _alert_onsets(alerts: dict[str, np.ndarray], player_ids: np.ndarray) -> dict[int, int]:
+    onsets: dict[int, int] = {}
+    for player_id in player_ids:
+        on = alerts["alert_on"][alerts["player_id"] == player_id].astype(bool)
+        onsets[int(player_id)] = int(np.count_nonzero(on[1:] & ~on[:-1]) + (1 if on.size and on[0] else 0))
+    return onsets
+
+
+def analyze(
+    decoded: dict[str, Any],
+    params: dict[str, Any],
+    bin_s: float = 0.1,
+    heatmap_cell_m: float = 1.0,
+) -> dict[str, Any]:
+    telemetry = decoded["telemetry"]
+    alerts = decoded["alerts"]
+    player_ids = np.unique(np.concatenate([telemetry["player_id"], alerts["player_id"]]).astype(np.int64))
+    bin_us = int(bin_s * 1_000_000)
+    if telemetry["t_us"].size:
+        grid_us = np.arange(int(telemetry["t_us"][0]), int(telemetry["t_us"][-1]) + 1, bin_us, dtype=np.int64)
+    else:
+        grid_us = np.zeros(0, dtype=np.int64)
+
+    count = player_ids.size
+    pair_bins = np.zeros((count, count), dtype=np.int64)
+    aiming_bins = np.zeros(count, dtype=np.int64)
+    exposed_bins = np.zeros(count, dtype=np.int64)
+    intensity_sum = np.zeros(count, dtype=np.int64)
+    cells_x = max(1, int(np.ceil(params["arena_width_m"] / heatmap_cell_m)))
+    cells_y = max(1, int(np.ceil(params["arena_height_m"] / heatmap_cell_m)))
+    heatmap = np.zeros((cells_y, cells_x), dtype=np.int64)
+
+    x, y, yaw, source_ok, target_ok = _resample(telemetry, player_ids, grid_us, params)
+    block = max(1, BLOCK_ELEMENTS // max(1, count * count))
+    for start in range(0, grid_us.size, block):
+        window = slice(start, start + block)
+        inside, intensity = exposure(
+            x[window],
+            y[window],
+            yaw[window],
+            source_ok[window],
+            target_ok[window],
+            float(params["max_range_m"]),
+            float(params["cone_half_angle_deg"]),
+        )
+        pair_bins += inside.sum(axis=0)
+        aiming = inside.any(axis=2)
+        exposed = inside.any(axis=1)
+        aiming_bins += aiming.sum(axis=0)
+        exposed_bins += exposed.sum(axis=0)
+        intensity_sum += intensity.max(axis=2).sum(axis=0)
+        counts, _, _ = np.histogram2d(
+            y[window][exposed],
+            x[window][exposed],
+            bins=(cells_y, cells_x),
+            range=((0.0, cells_y * heatmap_cell_m), (0.0, cells_x * heatmap_cell_m)),
+        )
+        heatmap += counts.astype(np.int64)
+
+    onsets = _alert_onsets(alerts, player_ids)
+    per_player = {}
+    for col, player_id in enumerate(player_ids.tolist()):
+        per_player[str(player_id)] = {
+            "time_aiming_at_others_s": round(aiming_bins[col] * bin_s, 3),
+            "time_in_others_cones_s": round(exposed_bins[col] * bin_s, 3),
+            "mean_intensity": round(intensity_sum[col] / aiming_bins[col], 1) if aiming_bins[col] else 0.0,
+            "recorded_alerts": onsets[player_id],
+            "telemetry_packets": int(np.count_nonzero(telemetry["player_id"] == player_id)),
+        }
+
+    return {
+        "analyzer_version": ANALYZER_VERSION,
+        "params": params,
+        "bin_s": bin_s,
+        "bins": int(grid_us.size),
+        "duration_s": round(grid_us.size * bin_s, 3),
+        "players": player_ids.tolist(),
+        "per_player": per_player,
+        "exposure_matrix_s": {
+            "rows": "source",
+            "cols": "target",
+            "seconds": np.round(pair_bins * bin_s, 3).tolist(),
+        },
+        "heatmap": {
+            "cell_m": heatmap_cell_m,
+            "width_cells": cells_x,
+            "height_cells": cells_y,
+            "bin_s": bin_s,
+            "counts": heatmap.tolist(),
+        },
+    }
+
+
+def _cache_key(manifest: dict[str, Any], overrides: dict[str, Any], bin_s: float, heatmap_cell_m: float) -> str:
+    basis = {
+        "analyzer_version": ANALYZER_VERSION,
+        "overrides": overrides,
+        "bin_s": bin_s,
+        "heatmap_cell_m": heatmap_cell_m,
+        "records": manifest.get("records"),
+        "bytes": manifest.get("bytes"),
+        "end_unix_ms": manifest.get("end_unix_ms"),
+    }
+    return hashlib.blake2b(json.dumps(basis, sort_keys=True).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def analyze_session(
+    session_dir: Path,
+    overrides: dict[str, Any] | None = None,
+    bin_s: float = 0.1,
+    heatmap_cell_m: float = 1.0,
+    force: bool = False,
+) -> tuple[str, str, float]:
+    """Analyze one session directory, reusing a cached result when valid.
+
+    Returns (session_id, "cached" | "analyzed", seconds spent).
+    """
+    started = time.perf_counter()
+    overrides = overrides or {}
+    manifest = json.loads((session_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    cache_path = session_dir / ANALYSIS_NAME
+    key = _cache_key(manifest, overrides, bin_s, heatmap_cell_m)
+    if not force and cache_path.is_file():
+        try:
+            if json.loads(cache_path.read_text(encoding="utf-8")).get("cache_key") == key:
+                return manifest["session_id"], "cached", time.perf_counter() - started
+        except ValueError:
+            pass
+
+    decoded = read_session(session_dir, manifest)
+    defaults = CoordinatorConfig().to_dict()
+    recorded = decoded["config"]
+    params = {name: overrides.get(name, recorded.get(name, defaults[name])) for name in PARAM_KEYS}
+    result = analyze(decoded, params, bin_s=bin_s, heatmap_cell_m=heatmap_cell_m)
+    result["session_id"] = manifest["session_id"]
+    result["cache_key"] = key
+    result["generated_unix_ms"] = int(time.time() * 1000)
+
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(result, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return manifest["session_id"], "analyzed", time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch exposure analytics over recorded AAR sessions")
+    parser.add_argument("--recordings-dir", default=CoordinatorConfig().recordings_dir)
+    parser.add_argument("--session", action="append", default=[], help="Session id to analyze (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--bin-s", type=float, default=0.1, help="Resampling interval in seconds")
+    parser.add_argument("--heatmap-cell-m", type=float, default=1.0, help="Heatmap cell size in meters")
+    parser.add_argument("--max-range-m", type=float, default=None, help="Override the recorded max_range_m")
+    parser.add_argument(
+        "--cone-half-angle-deg", type=float, default=None, help="Override the recorded cone_half_angle_deg"
+    )
+    parser.add_argument("--force", action="store_true", help="Ignore cached results")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    root = Path(args.recordings_dir)
+    if args.session:
+        session_dirs = [root / session_id for session_id in args.session]
+    else:
+        session_dirs = sorted(path.parent for path in root.glob(f"*/{MANIFEST_NAME}"))
+    overrides = {}
+    if args.max_range_m is not None:
+        overrides["max_range_m"] = args.max_range_m
+    if args.cone_half_angle_deg is not None:
+        overrides["cone_half_angle_deg"] = args.cone_half_angle_deg
+
+    started = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(analyze_session, session_dir, overrides, args.bin_s, args.heatmap_cell_m, args.force): session_dir
+            for session_dir in session_dirs
+        }
+        for future in as_completed(futures):
+            try:
+                session_id, outcome, seconds = future.result()
+            except Exception:
+                failures += 1
+                LOG.exception("Analysis of %s failed", futures[future].name)
+                continue
+            LOG.info("%s %s in %.2f s", session_id, outcome, seconds)
+    LOG.info(
+        "%d sessions in %.1f s (%d failed)",
+        len(session_dirs),
+        time.perf_counter() - started,
+        failures,
+    )
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
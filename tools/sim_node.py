@@ -12,7 +12,16 @@ import time
 if __package__ is None or __package__ == "":
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from server.packet import AlertPacket, PacketError, TelemetryPacket, decode_alert, encode_telemetry
+from server.packet import (
+    MSG_RATE_CONTROL,
+    AlertPacket,
+    PacketError,
+    RateControlPacket,
+    TelemetryPacket,
+    decode_alert,
+    decode_rate_control,
+    encode_telemetry,
+)
 
 
 LOG = logging.getLogger("fdw.sim_node")
@@ -30,13 +39,19 @@ class SimNodeProtocol(asyncio.DatagramProtocol):
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
         try:
-            pkt = decode_alert(data)
+            if len(data) >= 4 and data[3] == MSG_RATE_CONTROL:
+                pkt = decode_rate_control(data)
+            else:
+                pkt = decode_alert(data)
         except PacketError:
             return
 
         if pkt.player_id != self.node.player_id:
             return
-        self.node.on_alert(pkt)
+        if isinstance(pkt, RateControlPacket):
+            self.node.on_rate_control(pkt)
+        else:
+            self.node.on_alert(pkt)
 
 
 class SimNode:
@@ -61,6 +76,10 @@ class SimNode:
         self.seq = 0
         self.transport: asyncio.DatagramTransport | None = None
         self.last_alert_on = 0
+        # Rate commanded by the coordinator and when it lapses (monotonic seconds); None means rate_hz.
+        self.commanded_rate_hz: float | None = None
+        self.commanded_until = 0.0
+        self._rate_changed = asyncio.Event()
 
         self._yaw_phase = (player_id % 7) * 0.4
 
@@ -75,6 +94,23 @@ class SimNode:
             )
             self.last_alert_on = alert.alert_on
 
+    def on_rate_control(self, pkt: RateControlPacket) -> None:
+        rate_hz = pkt.rate_hz if pkt.rate_hz > 0.0 else None
+        if rate_hz != self.commanded_rate_hz:
+            LOG.info("P%s telemetry rate %s", self.player_id, "default" if rate_hz is None else f"{rate_hz:g} Hz")
+            previous_hz = self.rate_hz if self.commanded_rate_hz is None else self.commanded_rate_hz
+            self.commanded_rate_hz = rate_hz
+            if (self.rate_hz if rate_hz is None else rate_hz) > previous_hz:
+                # Wake the send loop so a higher rate applies now, not after the current slow interval.
+                self._rate_changed.set()
+        self.commanded_until = time.monotonic() + pkt.valid_ms / 1000.0 if pkt.valid_ms else math.inf
+
+    def current_rate_hz(self, now: float) -> float:
+        if self.commanded_rate_hz is not None and now >= self.commanded_until:
+            LOG.info("P%s rate command expired, back to %g Hz", self.player_id, self.rate_hz)
+            self.commanded_rate_hz = None
+        return self.rate_hz if self.commanded_rate_hz is None else self.commanded_rate_hz
+
     def _sim_pose(self, t: float) -> tuple[float, float, float]:
         yaw = 80.0 * math.sin(0.35 * t + self._yaw_phase)
         pitch = 6.0 * math.sin(0.21 * t + self._yaw_phase + 0.3)
@@ -112,8 +148,6 @@ class SimNode:
             local_addr=("0.0.0.0", self.local_port),
         )
 
-        interval = 1.0 / self.rate_hz
-
         while True:
             if self.transport is None:
                 await asyncio.sleep(0.1)
@@ -147,7 +181,11 @@ class SimNode:
             self.transport.sendto(payload, (self.server_ip, self.server_port))
             self.seq = (self.seq + 1) & 0xFFFF
 
-            await asyncio.sleep(interval)
+            self._rate_changed.clear()
+            try:
+                await asyncio.wait_for(self._rate_changed.wait(), timeout=1.0 / self.current_rate_hz(now))
+            except asyncio.TimeoutError:
+                pass
 
 
 def parse_args() -> argparse.Namespace:
@@ -156,7 +194,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--server-ip", default="127.0.0.1", help="Coordinator UDP host")
     parser.add_argument("--server-port", type=int, default=9999, help="Coordinator UDP port")
     parser.add_argument("--local-port-base", type=int, default=12000, help="Base local UDP port")
-    parser.add_argument("--rate-hz", type=float, default=20.0, help="Telemetry send rate")
+    parser.add_argument("--rate-hz", type=float, default=20.0, help="Default telemetry send rate")
     parser.add_argument("--send-pos", action="store_true", help="Send synthetic positions")
     parser.add_argument("--send-gps", action="store_true", help="Send synthetic GPS fix")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
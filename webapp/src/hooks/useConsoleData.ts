@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useRef, useState } from "react";
-import { addSimPlayer, getHealth, getStatus, removeSimPlayer, startRecording, stopRecording } from "../lib/api";
+import { addSimPlayer, getEvents, getHealth, getStatus, removeSimPlayer, startRecording, stopRecording } from "../lib/api";
 import { MockWorldStream } from "../lib/mock";
-import { normalizeWorldState } from "../lib/normalize";
+import { normalizeEvent, normalizeWorldState } from "../lib/normalize";
 import { ReconnectingWsClient } from "../lib/wsClient";
 import type { EventItem, PlayerState, WorldStateMessage, WsConnectionState } from "../types";
 
@@ -23,14 +23,17 @@ const EMPTY_WORLD: WorldStateMessage = {
   },
 };
 
+function eventKey(item: EventItem): string {
+  // Server events carry unique ids; locally generated ones are keyed by content.
+  if (item.id != null) {
+    return `#${item.id}`;
+  }
+  return `${item.ts_ms}-${item.level}-${item.event}-${item.player_id ?? "-"}-${item.reason ?? ""}`;
+}
+
 function pushEvent(list: EventItem[], item: EventItem): EventItem[] {
-  const key = `${item.ts_ms}-${item.level}-${item.event}-${item.player_id ?? "-"}-${item.reason ?? ""}`;
-  if (
-    list.some(
-      (existing) =>
-        `${existing.ts_ms}-${existing.level}-${existing.event}-${existing.player_id ?? "-"}-${existing.reason ?? ""}` === key,
-    )
-  ) {
+  const key = eventKey(item);
+  if (list.some((existing) => eventKey(existing) === key)) {
     return list;
   }
 
@@ -74,6 +77,7 @@ export function useConsoleData(): ConsoleDataModel {
   const wsRef = useRef<ReconnectingWsClient | null>(null);
   const mockRef = useRef<MockWorldStream | null>(null);
   const mockTimerRef = useRef<number | null>(null);
+  const lastEventIdRef = useRef<number | null>(null);
 
   const [world, setWorld] = useState<WorldStateMessage>(EMPTY_WORLD);
   const [eventLog, setEventLog] = useState<EventItem[]>([]);
@@ -105,6 +109,32 @@ export function useConsoleData(): ConsoleDataModel {
     if (nextWorld.events.length > 0) {
       setEventLog((prev) => mergeIncomingEvents(prev, nextWorld.events));
     }
+
+    // Each frame carries only the events since the previous one; after a reconnect
+    // or a missed frame, fetch the gap from the server's event ring.
+    const lastEventId = nextWorld.last_event_id;
+    if (lastEventId == null) {
+      return;
+    }
+    const seen = lastEventIdRef.current;
+    const firstIncoming = nextWorld.events.length > 0 ? nextWorld.events[0].id ?? lastEventId + 1 : lastEventId + 1;
+    lastEventIdRef.current = lastEventId;
+    if (seen != null && seen < lastEventId && firstIncoming > seen + 1) {
+      void getEvents(seen)
+        .then((payload) => {
+          const missing: EventItem[] = [];
+          for (const raw of payload.events) {
+            const parsed = normalizeEvent(raw);
+            if (parsed != null) {
+              missing.push(parsed);
+            }
+          }
+          setEventLog((prev) => mergeIncomingEvents(prev, missing).slice().sort((a, b) => b.ts_ms - a.ts_ms));
+        })
+        .catch(() => {
+          // The next frame still carries fresh events.
+        });
+    }
   };
 
   useEffect(() => {
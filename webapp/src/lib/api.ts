@@ -9,6 +9,13 @@ export interface ApiStatus {
   players_total: number;
   ws_clients: number;
   recording: RecordingState;
+  config_version: number;
+}
+
+export interface ConfigMessage {
+  type: "config";
+  config_version: number;
+  config: Record<string, unknown>;
 }
 
 export interface RecordingResponse {
@@ -42,6 +49,10 @@ export function getStatus(): Promise<ApiStatus> {
   return fetchJson("/api/status");
 }
 
+export function getConfig(): Promise<ConfigMessage> {
+  return fetchJson("/api/config");
+}
+
 export function startRecording(): Promise<RecordingResponse> {
   return fetchJson("/api/recording/start", { method: "POST" });
 }
@@ -50,18 +61,280 @@ export function stopRecording(): Promise<RecordingResponse> {
   return fetchJson("/api/recording/stop", { method: "POST" });
 }
 
-export function getAarList(): Promise<{ status: string; sessions: unknown[]; message?: string }> {
-  return fetchJson("/api/aar/list");
+export interface SeriesStats {
+  min: Array<number | null>;
+  mean: Array<number | null>;
+  max: Array<number | null>;
+}
+
+export interface PlayerSeries {
+  status: string;
+  player_id: number;
+  server_time_ms: number;
+  resolution_s: 1 | 10 | 60;
+  t_ms: number[];
+  packet_rate_hz: SeriesStats;
+  drop_rate: SeriesStats;
+  jitter_ms: SeriesStats;
+  quality: SeriesStats;
+  battery_mv: SeriesStats;
+}
+
+export function getPlayerSeries(playerId: number, resolutionS: 1 | 10 | 60 = 1, fromMs?: number): Promise<PlayerSeries> {
+  const params = new URLSearchParams({ resolution: String(resolutionS) });
+  if (fromMs !== undefined) {
+    params.set("from", String(Math.round(fromMs)));
+  }
+  return fetchJson(`/api/players/${playerId}/series?${params.toString()}`);
+}
+
+export interface PlayerHistorySample {
+  recv_ms: number;
+  node_ms: number;
+  yaw_deg: number;
+  pitch_deg: number;
+  roll_deg: number;
+  x_m: number | null;
+  y_m: number | null;
+  quality: number;
+  pos_quality: number;
+}
+
+export interface PlayerHistory {
+  status: string;
+  player_id: number;
+  server_time_ms: number;
+  clock: "server" | "node";
+  capacity: number;
+  recv_ms: number[];
+  node_ms: number[];
+  yaw_deg: number[];
+  pitch_deg: number[];
+  roll_deg: number[];
+  x_m: Array<number | null>;
+  y_m: Array<number | null>;
+  quality: number[];
+  pos_quality: number[];
+}
+
+export function getPlayerHistory(
+  playerId: number,
+  options: { fromMs?: number; toMs?: number; clock?: "server" | "node" } = {},
+): Promise<PlayerHistory> {
+  const params = new URLSearchParams({ clock: options.clock ?? "server" });
+  if (options.fromMs !== undefined) {
+    params.set("from", String(Math.round(options.fromMs)));
+  }
+  if (options.toMs !== undefined) {
+    params.set("to", String(Math.round(options.toMs)));
+  }
+  return fetchJson(`/api/players/${playerId}/history?${params.toString()}`);
+}
+
+export interface EventsResponse {
+  status: string;
+  first_id: number;
+  last_id: number;
+  truncated: boolean;
+  events: unknown[];
+}
+
+export function getEvents(after: number, limit?: number): Promise<EventsResponse> {
+  const params = new URLSearchParams({ after: String(after) });
+  if (limit !== undefined) {
+    params.set("limit", String(limit));
+  }
+  return fetchJson(`/api/events?${params.toString()}`);
+}
+
+export interface AarSessionSummary {
+  session_id: string;
+  start_unix_ms: number;
+  end_unix_ms: number;
+  duration_ms: number;
+  telemetry_packets: number;
+  alert_transitions: number;
+  dropped_records: number;
+  bytes: number;
+  player_ids: number[];
+}
+
+export interface AarListQuery {
+  from?: number;
+  to?: number;
+  player?: number;
+  min_alerts?: number;
+  limit?: number;
+  offset?: number;
+}
+
+export interface AarListResponse {
+  status: string;
+  total: number;
+  limit: number;
+  offset: number;
+  sessions: AarSessionSummary[];
+  message?: string;
+}
+
+export function getAarList(query: AarListQuery = {}): Promise<AarListResponse> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(query)) {
+    if (value !== undefined) {
+      params.set(key, String(value));
+    }
+  }
+  const suffix = params.toString();
+  return fetchJson(suffix === "" ? "/api/aar/list" : `/api/aar/list?${suffix}`);
+}
+
+export interface AarStateResponse {
+  status: string;
+  session_id: string;
+  t_ms: number;
+  keyframe_t_ms: number | null;
+  records_applied: number;
+  seek_ms: number;
+  config_version: number | null;
+  config: Record<string, unknown>;
+  players: Array<Record<string, unknown> & { id: number }>;
+}
+
+export function getAarState(sessionId: string, tMs: number): Promise<AarStateResponse> {
+  return fetchJson(`/api/aar/${encodeURIComponent(sessionId)}/state?t=${Math.max(0, Math.round(tMs))}`);
+}
+
+export interface AarFrame {
+  type: "aar_frame";
+  session_id: string;
+  t_ms: number;
+  duration_ms: number;
+  speed: number;
+  paused: boolean;
+  ended: boolean;
+  config_version: number | null;
+  config: Record<string, unknown>;
+  players: Array<Record<string, unknown> & { id: number }>;
 }
 
-export function startReplay(speed: number): Promise<{ status: string; message?: string }> {
+export type AarPlaybackCommand =
+  | { type: "play" }
+  | { type: "pause" }
+  | { type: "seek"; t_ms: number }
+  | { type: "speed"; value: number };
+
+export function aarPlaybackUrl(sessionId: string, options: { tMs?: number; speed?: number; paused?: boolean } = {}): string {
+  const params = new URLSearchParams();
+  if (options.tMs !== undefined) {
+    params.set("t", String(Math.max(0, Math.round(options.tMs))));
+  }
+  if (options.speed !== undefined) {
+    params.set("speed", String(options.speed));
+  }
+  if (options.paused) {
+    params.set("paused", "1");
+  }
+  const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+  const query = params.toString();
+  return `${protocol}://${window.location.host}/ws/aar/${encodeURIComponent(sessionId)}${query ? `?${query}` : ""}`;
+}
+
+export interface AarPlayerExposure {
+  time_aiming_at_others_s: number;
+  time_in_others_cones_s: number;
+  mean_intensity: number;
+  recorded_alerts: number;
+  telemetry_packets: number;
+}
+
+export interface AarAnalysis {
+  session_id: string;
+  analyzer_version: number;
+  params: Record<string, number>;
+  bin_s: number;
+  duration_s: number;
+  players: number[];
+  per_player: Record<string, AarPlayerExposure>;
+  exposure_matrix_s: { rows: "source"; cols: "target"; seconds: number[][] };
+  heatmap: { cell_m: number; width_cells: number; height_cells: number; bin_s: number; counts: number[][] };
+}
+
+export function getAarAnalysis(sessionId: string): Promise<AarAnalysis> {
+  return fetchJson(`/api/aar/${encodeURIComponent(sessionId)}/analysis`);
+}
+
+export function aarExportUrl(
+  sessionId: string,
+  format: "csv" | "ndjson",
+  options: { players?: number[]; fromMs?: number; toMs?: number } = {},
+): string {
+  const params = new URLSearchParams({ format });
+  if (options.players !== undefined && options.players.length > 0) {
+    params.set("players", options.players.join(","));
+  }
+  if (options.fromMs !== undefined) {
+    params.set("from", String(Math.round(options.fromMs)));
+  }
+  if (options.toMs !== undefined) {
+    params.set("to", String(Math.round(options.toMs)));
+  }
+  return `/api/aar/${encodeURIComponent(sessionId)}/export?${params.toString()}`;
+}
+
+export interface BlackboxDumpResponse {
+  status: string;
+  session_id?: string;
+  files?: string[];
+  summary?: Record<string, unknown>;
+  message?: string;
+}
+
+export function dumpBlackbox(seconds?: number): Promise<BlackboxDumpResponse> {
+  return fetchJson("/api/blackbox/dump", {
+    method: "POST",
+    body: JSON.stringify(seconds === undefined ? {} : { seconds }),
+  });
+}
+
+export interface ReplayStatus {
+  session_id: string;
+  state: "idle" | "running" | "finished" | "stopped" | "failed";
+  speed: number | "max";
+  overrides: Record<string, unknown>;
+  virtual_ms: number;
+  wall_ms: number;
+  effective_speed: number | null;
+  progress: number | null;
+  records: number;
+  telemetry_packets: number;
+  alert_transitions: number;
+  recorded_alert_transitions: number;
+  alert_transitions_by_player: Record<string, number>;
+  generation: number;
+  error: string | null;
+}
+
+export interface ReplayResponse {
+  status: string;
+  replay: ReplayStatus | null;
+  message?: string;
+}
+
+export function startReplay(
+  speed: number | "max",
+  options: { sessionId?: string; overrides?: Record<string, number> } = {},
+): Promise<ReplayResponse> {
   return fetchJson("/api/replay/start", {
     method: "POST",
-    body: JSON.stringify({ speed }),
+    body: JSON.stringify({ speed, session_id: options.sessionId, overrides: options.overrides }),
   });
 }
 
-export function stopReplay(): Promise<{ status: string; message?: string }> {
+export function getReplayStatus(): Promise<ReplayResponse> {
+  return fetchJson("/api/replay/status");
+}
+
+export function stopReplay(): Promise<ReplayResponse> {
   return fetchJson("/api/replay/stop", {
     method: "POST",
   });
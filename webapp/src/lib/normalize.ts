@@ -118,7 +118,7 @@ function normalizePlayer(raw: unknown, serverTimeMs: number): PlayerState | null
   };
 }
 
-function normalizeEvent(raw: unknown): EventItem | null {
+export function normalizeEvent(raw: unknown): EventItem | null {
   if (!isRecord(raw)) {
     return null;
   }
@@ -126,6 +126,7 @@ function normalizeEvent(raw: unknown): EventItem | null {
   const level: EventLevel = LEVELS.includes(levelRaw) ? levelRaw : "info";
 
   return {
+    id: asOptionalNumber(raw.id),
     ts_ms: asNumber(raw.ts_ms, Date.now()),
     level,
     event: asString(raw.event, "event"),
@@ -188,6 +189,8 @@ export function normalizeWorldState(raw: unknown): ParseResult {
     schema_version: asNumber(raw.schema_version, 1),
     server_time_ms: serverTimeMs,
     server_version: raw.server_version == null ? undefined : asString(raw.server_version, ""),
+    config_version: asOptionalNumber(raw.config_version),
+    last_event_id: asOptionalNumber(raw.last_event_id),
     players,
     obstacles,
     events,
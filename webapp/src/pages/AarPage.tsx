@@ -1,11 +1,11 @@
 import { useMemo, useState } from "react";
-import { getAarList, startReplay, stopReplay } from "../lib/api";
+import { getAarList, startReplay, stopReplay, type AarSessionSummary } from "../lib/api";
 
 export function AarPage(): JSX.Element {
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string>("");
-  const [sessions, setSessions] = useState<unknown[]>([]);
-  const [message, setMessage] = useState<string>("AAR listing not enabled in this build");
+  const [sessions, setSessions] = useState<AarSessionSummary[]>([]);
+  const [message, setMessage] = useState<string>("");
   const [speed, setSpeed] = useState<number>(1.0);
   const [uploadedSummary, setUploadedSummary] = useState<string>("");
 
@@ -17,7 +17,7 @@ export function AarPage(): JSX.Element {
     try {
       const payload = await getAarList();
       setSessions(payload.sessions ?? []);
-      setMessage(payload.message ?? "");
+      setMessage(payload.message ?? `${payload.total} recorded sessions`);
     } catch (reason) {
       setError(reason instanceof Error ? reason.message : "Failed to load AAR list");
     } finally {
@@ -28,7 +28,7 @@ export function AarPage(): JSX.Element {
   const handleReplayStart = async (): Promise<void> => {
     try {
       const payload = await startReplay(speed);
-      setMessage(payload.message ?? "Replay started");
+      setMessage(payload.message ?? `Replay of ${payload.replay?.session_id ?? "latest session"} started`);
     } catch (reason) {
       setMessage(reason instanceof Error ? reason.message : "Replay not available");
     }
@@ -37,7 +37,13 @@ export function AarPage(): JSX.Element {
   const handleReplayStop = async (): Promise<void> => {
     try {
       const payload = await stopReplay();
-      setMessage(payload.message ?? "Replay stopped");
+      const replay = payload.replay;
+      setMessage(
+        payload.message ??
+          (replay == null
+            ? "No replay running"
+            : `Replay ${replay.state}: ${replay.alert_transitions} alert transitions (${replay.recorded_alert_transitions} recorded)`),
+      );
     } catch (reason) {
       setMessage(reason instanceof Error ? reason.message : "Replay stop not available");
     }
@@ -75,7 +81,7 @@ export function AarPage(): JSX.Element {
             <input
               type="range"
               min="0.25"
-              max="4"
+              max="50"
               step="0.25"
               value={speed}
               onChange={(event) => setSpeed(Number(event.target.value))}
@@ -96,12 +102,15 @@ export function AarPage(): JSX.Element {
 
         <div className="session-list">
           {sessions.length === 0 ? (
-            <div className="empty-state">No backend AAR sessions are available in this build.</div>
+            <div className="empty-state">No recorded sessions yet.</div>
           ) : (
-            sessions.map((session, index) => (
-              <div key={index} className="session-row">
-                <span className="mono">Session #{index + 1}</span>
-                <span className="dim">{JSON.stringify(session)}</span>
+            sessions.map((session) => (
+              <div key={session.session_id} className="session-row">
+                <span className="mono">{session.session_id}</span>
+                <span className="dim">
+                  {new Date(session.start_unix_ms).toLocaleString()} · {(session.duration_ms / 1000).toFixed(0)} s ·{" "}
+                  {session.player_ids.length} players · {session.alert_transitions} alerts
+                </span>
               </div>
             ))
           )}
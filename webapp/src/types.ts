@@ -39,6 +39,7 @@ export interface Obstacle {
 }
 
 export interface EventItem {
+  id?: number;
   ts_ms: number;
   level: EventLevel;
   event: string;
@@ -59,6 +60,8 @@ export interface WorldStateMessage {
   schema_version: number;
   server_time_ms: number;
   server_version?: string;
+  config_version?: number;
+  last_event_id?: number;
   players: PlayerState[];
   obstacles: Obstacle[];
   events: EventItem[];